@@ -0,0 +1 @@
+"""Performance benchmarks for playground_fantasymanager."""
@@ -0,0 +1,63 @@
+"""Stored benchmark results and regression checks."""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+# name of a case -> metric -> value
+Results = Dict[str, Dict[str, float]]
+
+# Metrics where a bigger value is better, the rest are better when smaller.
+HIGHER_IS_BETTER = frozenset({"ops_per_second", "rps"})
+
+
+def load(name: str) -> Results:
+    """
+    Load stored baseline.
+
+    :param name: name of the benchmark.
+    :return: baseline results, empty if there is no baseline yet.
+    """
+    path = BASELINES_DIR / f"{name}.json"
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save(name: str, results: Results) -> Path:
+    """
+    Store results as the new baseline.
+
+    :param name: name of the benchmark.
+    :param results: results to store.
+    :return: path of the baseline file.
+    """
+    path = BASELINES_DIR / f"{name}.json"
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def regressions(results: Results, baseline: Results, tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline.
+
+    :param results: current results.
+    :param baseline: stored baseline.
+    :param tolerance: allowed relative slowdown, 0.2 means 20%.
+    :return: description of every metric worse than the baseline allows.
+    """
+    found = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            expected = baseline.get(case, {}).get(metric)
+            if not expected:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                regressed = value < expected * (1 - tolerance)
+            else:
+                regressed = value > expected * (1 + tolerance)
+            if regressed:
+                found.append(f"{case}.{metric}: {value:.4g} (baseline {expected:.4g})")
+    return found
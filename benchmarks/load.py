@@ -0,0 +1,223 @@
+"""
+HTTP load test of the fTeams API.
+
+Run it with ``python -m benchmarks.load``. It starts the application
+with uvicorn on a free local port, seeds fantasy teams in memory and
+reports latency percentiles and throughput of every endpoint. Pass
+``--save`` to store results as the baseline and ``--check`` to fail
+on regressions.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks import baseline
+
+NAME = "load"
+BASE = "/api/fTeams"
+
+ENDPOINTS: Dict[str, str] = {
+    "health": "/api/health",
+    "default_teams": f"{BASE}/matches/m1?limit=10",
+    "default_teams_fields": f"{BASE}/matches/m1?limit=10&fields=player_id",
+    "user_teams": f"{BASE}/user/u1/matches/m1?limit=10",
+    "user_teams_fields": (
+        f"{BASE}/user/u1/matches/m1?limit=10&fields=player_id,points_earned"
+    ),
+    "single_team": f"{BASE}/user/u1/matches/m1/fTeams/f0001",
+    "single_team_not_modified": f"{BASE}/user/u1/matches/m1/fTeams/f0001",
+    "missing_team": f"{BASE}/user/u1/matches/m1/fTeams/missing",
+}
+
+
+def free_port() -> int:
+    """
+    Find a free local port.
+
+    :return: port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def start_server(port: int, verbose: bool) -> "subprocess.Popen[bytes]":
+    """
+    Start the application server.
+
+    :param port: port to listen on.
+    :param verbose: keep output of the server.
+    :return: server process.
+    """
+    env = {
+        **os.environ,
+        "PLAYGROUND_FANTASYMANAGER_PORT": str(port),
+        "PLAYGROUND_FANTASYMANAGER_WORKERS_COUNT": "1",
+        "PLAYGROUND_FANTASYMANAGER_RELOAD": "False",
+        "PLAYGROUND_FANTASYMANAGER_LOG_LEVEL": "WARNING",
+        "PLAYGROUND_FANTASYMANAGER_STORE_BACKEND": "memory",
+    }
+    return subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "benchmarks.server"],
+        env=env,
+        stdout=None if verbose else subprocess.DEVNULL,
+        stderr=None if verbose else subprocess.DEVNULL,
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient, timeout: float) -> None:
+    """
+    Wait until the server answers health checks.
+
+    :param client: client of the server.
+    :param timeout: seconds to wait.
+    :raises TimeoutError: if the server doesn't start in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/api/health")).status_code == httpx.codes.OK:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise TimeoutError("Server did not start")
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Get percentile of sorted values.
+
+    :param sorted_values: values in ascending order.
+    :param fraction: percentile as a fraction, 0.99 for p99.
+    :return: value at the percentile.
+    """
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient,
+    path: str,
+    headers: Dict[str, str],
+    concurrency: int,
+    duration: float,
+) -> Dict[str, float]:
+    """
+    Load a single endpoint.
+
+    :param client: client of the server.
+    :param path: path with query of the endpoint.
+    :param headers: headers of every request.
+    :param concurrency: number of requests in flight.
+    :param duration: seconds to run.
+    :return: latency percentiles in milliseconds, throughput and errors.
+    """
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= httpx.codes.INTERNAL_SERVER_ERROR:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "rps": len(latencies) / elapsed,
+        "errors": errors,
+    }
+
+
+async def run(
+    port: int,
+    concurrency: int,
+    duration: float,
+    only: Optional[List[str]],
+) -> baseline.Results:
+    """
+    Load every endpoint one after another.
+
+    :param port: port of the server.
+    :param concurrency: number of requests in flight.
+    :param duration: seconds to load every endpoint.
+    :param only: names of endpoints to load or None for all of them.
+    :return: results by endpoint name.
+    """
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}",
+        limits=limits,
+        timeout=30,
+    ) as client:
+        await wait_ready(client, timeout=30)
+        etag = (await client.get(ENDPOINTS["single_team"])).headers.get("ETag", "")
+        results = {}
+        for name, path in ENDPOINTS.items():
+            if only and name not in only:
+                continue
+            headers = {"If-None-Match": etag} if name.endswith("not_modified") else {}
+            results[name] = await run_endpoint(
+                client,
+                path,
+                headers,
+                concurrency,
+                duration,
+            )
+            print(  # noqa: T201
+                f"{name:<26} p50 {results[name]['p50_ms']:>7.2f} ms"
+                f"  p99 {results[name]['p99_ms']:>7.2f} ms"
+                f"  {results[name]['rps']:>8,.0f} rps",
+            )
+        return results
+
+
+def main() -> None:
+    """Run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--only", nargs="*", choices=sorted(ENDPOINTS))
+    parser.add_argument("--verbose", action="store_true", help="show server logs")
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = start_server(port, args.verbose)
+    try:
+        results = asyncio.run(run(port, args.concurrency, args.duration, args.only))
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.save:
+        print(f"saved {baseline.save(NAME, results)}")  # noqa: T201
+    if args.check:
+        found = baseline.regressions(results, baseline.load(NAME), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")  # noqa: T201
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Micro-benchmarks of building and serializing fantasy teams and errors.
+
+Run it with ``python -m benchmarks.micro``. Pass ``--save`` to store
+results as the baseline and ``--check`` to fail on regressions.
+"""
+
+import argparse
+import asyncio
+import sys
+import timeit
+from functools import partial
+from typing import Any, Callable, Dict
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, UJSONResponse
+from loguru import logger
+from starlette.types import Message
+
+from benchmarks import baseline
+from benchmarks.server import MATCH_ID, seeded_store
+from playground_fantasymanager.exceptions.base import NotFoundError
+from playground_fantasymanager.exceptions.handlers import error_response
+from playground_fantasymanager.services.compression import ENCODINGS, compress
+from playground_fantasymanager.services.generator import TeamSolver, generate_teams
+from playground_fantasymanager.services.generator.engine import player_pool
+from playground_fantasymanager.services.store.base import (
+    FantasyTeamStore,
+    project_players,
+)
+from playground_fantasymanager.services.store.dependency import get_fantasy_team_store
+from playground_fantasymanager.web.api.fantasy_teams.schema import (
+    FantasyTeam,
+    FantasyTeamResponse,
+)
+from playground_fantasymanager.web.api.fantasy_teams.serialization import dump_teams
+from playground_fantasymanager.web.application import get_app
+
+NAME = "micro"
+
+
+def measure(func: Callable[[], Any], repeat: int = 5) -> Dict[str, float]:
+    """
+    Measure a function.
+
+    :param func: function to call.
+    :param repeat: number of timing rounds, the best one is reported.
+    :return: microseconds per call and calls per second.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {"us_per_op": best * 1e6, "ops_per_second": 1 / best}
+
+
+def asgi_get(app: FastAPI, path: str) -> Callable[[], Any]:
+    """
+    Build a function serving a GET request in process.
+
+    :param app: application.
+    :param path: path of the request.
+    :return: function running the request through every middleware.
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        """Drop the response."""
+
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(app(dict(scope), receive, send))
+
+
+def cases() -> Dict[str, Callable[[], Any]]:
+    """
+    Build benchmarked functions.
+
+    :return: functions by case name.
+    """
+    document = generate_teams("m1", 1)[0]
+    team = FantasyTeam.model_validate(document)
+    response = FantasyTeamResponse(fantasy_teams=[team] * 10)
+    documents = [document] * 10
+    projected = [project_players(document, ("player_id", "points_earned"))] * 10
+    not_found = NotFoundError(
+        "Fantasy team not found",
+        description="Fantasy team missing does not exist",
+    )
+    app = get_app()
+    store = seeded_store(users=1, teams_per_user=1)
+
+    # Every run_until_complete is a new anyio root task, which would start
+    # a worker thread for a sync dependency on every request.
+    async def get_store() -> FantasyTeamStore:
+        return store
+
+    app.dependency_overrides[get_fantasy_team_store] = get_store
+    # Records still pass through logging, but nothing is written.
+    logger.remove()
+    teams_url = f"/api/fTeams/user/u0/matches/{MATCH_ID}/fTeams"
+    body = dump_teams(documents)
+    compression = {
+        f"{encoding}_compress_10_teams": partial(compress, body, encoding)
+        for encoding in ENCODINGS
+    }
+    return {
+        **compression,
+        "generate_10_teams": lambda: generate_teams("m1", 10),
+        "generate_10000_teams": lambda: generate_teams("m1", 10000),
+        "solve_best_team": lambda: TeamSolver(player_pool("m1")).suggest(1),
+        "solve_5_diverse_teams": lambda: TeamSolver(player_pool("m1")).suggest(5),
+        "fantasy_team_validate": lambda: FantasyTeam.model_validate(document),
+        "ujson_response_10_teams": lambda: UJSONResponse(
+            response.model_dump(mode="json"),
+        ),
+        "model_validate_dump_10_teams": lambda: FantasyTeamResponse(
+            fantasy_teams=[FantasyTeam.model_validate(doc) for doc in documents],
+        ).model_dump_json(),
+        "orjson_dump_10_teams": lambda: dump_teams(documents),
+        "orjson_projected_dump_10_teams": lambda: dump_teams(projected),
+        "jsonresponse_error_404": lambda: JSONResponse(
+            {
+                "status_code": not_found.status_code,
+                "code": not_found.code,
+                "error": "NotFoundError",
+                "message": not_found.message,
+                "description": not_found.description,
+            },
+            status_code=not_found.status_code,
+        ),
+        "error_response_404": lambda: error_response(not_found),
+        "asgi_single_team_200": asgi_get(app, f"{teams_url}/f0000"),
+        "asgi_missing_team_404": asgi_get(app, f"{teams_url}/missing"),
+    }
+
+
+def main() -> None:
+    """Run micro-benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    for name, func in cases().items():
+        results[name] = measure(func)
+        print(  # noqa: T201
+            f"{name:<32} {results[name]['us_per_op']:>10.2f} us/op"
+            f" {results[name]['ops_per_second']:>12,.0f} ops/s",
+        )
+
+    if args.save:
+        print(f"saved {baseline.save(NAME, results)}")  # noqa: T201
+    if args.check:
+        found = baseline.regressions(results, baseline.load(NAME), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")  # noqa: T201
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Benchmark of live rescoring of fantasy teams.
+
+Run it with ``python -m benchmarks.scoring``.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from playground_fantasymanager.services.scoring import MatchScorer
+
+PLAYERS = 22
+
+
+def main() -> None:
+    """Measure how many fantasy teams are rescored per second."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--teams", type=int, default=1_000_000)
+    parser.add_argument("--events", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scorer = MatchScorer(capacity=args.teams)
+    for player in range(PLAYERS):
+        scorer.player_index(f"p{player}")
+    players = np.argsort(rng.random((args.teams, PLAYERS)), axis=1)[:, :11]
+    scorer.load_teams(
+        range(args.teams),
+        players,
+        np.zeros(args.teams, dtype=np.int64),
+        np.ones(args.teams, dtype=np.int64),
+    )
+
+    started = time.perf_counter()
+    for _ in range(args.events):
+        scorer.apply_events({f"p{rng.integers(PLAYERS)}": float(rng.integers(1, 7))})
+        scorer.totals()
+    elapsed = time.perf_counter() - started
+
+    per_event = elapsed / args.events
+    print(f"teams:            {args.teams}")  # noqa: T201
+    print(f"rescore per ball: {per_event * 1000:.2f} ms")  # noqa: T201
+    print(f"teams per second: {args.teams / per_event:,.0f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Application server with seeded in-memory fantasy teams.
+
+It is started by ``benchmarks.load`` and runs the regular
+entrypoint, so requests go through a real uvicorn server.
+"""
+
+import asyncio
+import os
+
+from playground_fantasymanager.__main__ import main as run_server
+from playground_fantasymanager.services.generator import generate_teams
+from playground_fantasymanager.services.store import lifespan
+from playground_fantasymanager.services.store.memory import InMemoryFantasyTeamStore
+
+MATCH_ID = "m1"
+
+
+def seeded_store(users: int, teams_per_user: int) -> InMemoryFantasyTeamStore:
+    """
+    Create store with random fantasy teams.
+
+    :param users: number of users.
+    :param teams_per_user: number of teams of every user.
+    :return: seeded store.
+    """
+    store = InMemoryFantasyTeamStore()
+    for user in range(users):
+        documents = generate_teams(
+            MATCH_ID,
+            teams_per_user,
+            offset=user * teams_per_user,
+        )
+        for team, document in enumerate(documents):
+            document.update(
+                userId=f"u{user}",
+                matchId=MATCH_ID,
+                fantasyTeamId=f"f{team:04d}",
+            )
+            asyncio.run(store.insert_team(document))
+    return store
+
+
+def main() -> None:
+    """Start the server."""
+    store = seeded_store(
+        users=int(os.environ.get("BENCHMARK_USERS", "100")),
+        teams_per_user=int(os.environ.get("BENCHMARK_TEAMS_PER_USER", "20")),
+    )
+    lifespan.create_store = lambda: store  # type: ignore[assignment]
+    run_server()
+
+
+if __name__ == "__main__":
+    main()
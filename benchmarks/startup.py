@@ -0,0 +1,184 @@
+"""
+Startup time of the application.
+
+Run it with ``python -m benchmarks.startup``. It reports where import
+time of the application goes, then starts the regular entrypoint
+several times and measures the time from starting the process to the
+first answered request and to the first OpenAPI document. Pass
+``--openapi`` to serve a document built ahead of time, ``--save`` to
+store results as the baseline and ``--check`` to fail on regressions
+or when the first request takes longer than ``--budget-ms``.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks import baseline
+from benchmarks.load import free_port
+
+NAME = "startup"
+APPLICATION = "playground_fantasymanager.web.application"
+
+
+def import_profile(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Profile imports of a module in a fresh interpreter.
+
+    :param module: module to import.
+    :return: total import time and import time of every top-level package,
+        slowest first, in milliseconds.
+    """
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0.0
+    packages: Counter[str] = Counter()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        packages[name.strip().split(".")[0]] += int(own) / 1000
+        if not name.startswith("  "):
+            # Imports at the top level include everything below them.
+            total += int(cumulative) / 1000
+    return total, packages.most_common()
+
+
+def start_to_first_request(port: int, openapi_file: Optional[Path]) -> Dict[str, float]:
+    """
+    Start the application and wait for its first answers.
+
+    :param port: port to listen on.
+    :param openapi_file: OpenAPI document built ahead of time, if any.
+    :return: milliseconds to the first health check and the first
+        OpenAPI document.
+    """
+    env = {
+        **os.environ,
+        "PLAYGROUND_FANTASYMANAGER_PORT": str(port),
+        "PLAYGROUND_FANTASYMANAGER_WORKERS_COUNT": "1",
+        "PLAYGROUND_FANTASYMANAGER_RELOAD": "False",
+        "PLAYGROUND_FANTASYMANAGER_LOG_LEVEL": "WARNING",
+        "PLAYGROUND_FANTASYMANAGER_STORE_BACKEND": "memory",
+    }
+    if openapi_file is not None:
+        env["PLAYGROUND_FANTASYMANAGER_OPENAPI_FILE"] = str(openapi_file)
+    started = time.perf_counter()
+    server = subprocess.Popen(  # noqa: S603
+        [sys.executable, "-m", "playground_fantasymanager"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            first_request = _wait_ready(client, started, timeout=30)
+            client.get("/api/openapi.json").raise_for_status()
+            openapi = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    return {"first_request_ms": first_request * 1000, "openapi_ms": openapi * 1000}
+
+
+def _wait_ready(client: httpx.Client, started: float, timeout: float) -> float:
+    while time.perf_counter() - started < timeout:
+        try:
+            if client.get("/api/health").status_code == httpx.codes.OK:
+                return time.perf_counter() - started
+        except httpx.TransportError:
+            time.sleep(0.005)
+    raise TimeoutError("Server did not start")
+
+
+def build_openapi(directory: Path) -> Path:
+    """
+    Build the OpenAPI document like a container build would.
+
+    :param directory: directory of the document.
+    :return: path of the document.
+    """
+    path = directory / "openapi.json"
+    subprocess.run(  # noqa: S603
+        [sys.executable, "-m", "playground_fantasymanager.web.openapi", str(path)],
+        check=True,
+    )
+    return path
+
+
+def run(rounds: int, openapi: bool) -> baseline.Results:
+    """
+    Measure imports and starts of the application.
+
+    :param rounds: number of starts, medians are reported.
+    :param openapi: serve an OpenAPI document built ahead of time.
+    :return: results by case name.
+    """
+    total, packages = import_profile(APPLICATION)
+    print(f"imports of {APPLICATION}: {total:.0f} ms")  # noqa: T201
+    for package, milliseconds in packages[:15]:
+        print(f"  {package:<30} {milliseconds:>8.1f} ms")  # noqa: T201
+
+    with tempfile.TemporaryDirectory() as directory:
+        openapi_file = build_openapi(Path(directory)) if openapi else None
+        starts = [
+            start_to_first_request(free_port(), openapi_file) for _ in range(rounds)
+        ]
+    results = {
+        "imports": {"total_ms": total},
+        "start": {
+            metric: statistics.median(start[metric] for start in starts)
+            for metric in starts[0]
+        },
+    }
+    print(  # noqa: T201
+        f"start to first request {results['start']['first_request_ms']:.0f} ms,"
+        f" to OpenAPI document {results['start']['openapi_ms']:.0f} ms",
+    )
+    return results
+
+
+def main() -> None:
+    """Run the startup benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--openapi", action="store_true", help="prebuilt OpenAPI")
+    parser.add_argument("--budget-ms", type=float, default=2000.0)
+    parser.add_argument("--save", action="store_true", help="store as baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args.rounds, args.openapi)
+
+    if args.save:
+        print(f"saved {baseline.save(NAME, results)}")  # noqa: T201
+    if args.check:
+        found = baseline.regressions(results, baseline.load(NAME), args.tolerance)
+        first_request = results["start"]["first_request_ms"]
+        if first_request > args.budget_ms:
+            found.append(
+                f"start.first_request_ms: {first_request:.4g}"
+                f" (budget {args.budget_ms:.4g})",
+            )
+        for regression in found:
+            print(f"REGRESSION {regression}")  # noqa: T201
+        if found:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
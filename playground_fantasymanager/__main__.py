@@ -1,10 +1,57 @@
+import os
+import tempfile
+from pathlib import Path
+
 import uvicorn
 
 from playground_fantasymanager.settings import settings
 
 
+def prepare_metrics_dir() -> None:
+    """
+    Prepare the directory where workers share metrics.
+
+    Several workers need a directory, so a temporary one is created
+    when none is configured. Files of previous runs are removed,
+    since their workers are gone.
+    """
+    directory = settings.metrics_dir
+    if directory is None:
+        if settings.workers_count <= 1:
+            return
+        directory = Path(tempfile.mkdtemp(prefix="playground_fantasymanager_metrics_"))
+        # Workers read settings from the environment they inherit.
+        os.environ["PLAYGROUND_FANTASYMANAGER_METRICS_DIR"] = str(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+def prepare_shared_dir() -> None:
+    """
+    Prepare the directory where workers share points of live matches.
+
+    Workers map tables of this directory, so they keep one copy of
+    the points of a match and follow events applied by each other.
+    A temporary directory is created for several workers when none
+    is configured. Tables of previous runs are removed, points are
+    loaded again from the store.
+    """
+    directory = settings.live_shared_dir
+    if directory is None:
+        if settings.workers_count <= 1:
+            return
+        directory = Path(tempfile.mkdtemp(prefix="playground_fantasymanager_shared_"))
+        os.environ["PLAYGROUND_FANTASYMANAGER_LIVE_SHARED_DIR"] = str(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob("*.points"):
+        path.unlink(missing_ok=True)
+
+
 def main() -> None:
     """Entrypoint of the application."""
+    prepare_metrics_dir()
+    prepare_shared_dir()
     uvicorn.run(
         "playground_fantasymanager.web.application:get_app",
         workers=settings.workers_count,
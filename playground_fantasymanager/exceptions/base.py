@@ -1,11 +1,21 @@
 """Base exception classes."""
 
-from typing import Any, Optional
+import math
+from typing import Any, Dict, Optional
+
+
+def _retry_after(seconds: Optional[float]) -> Optional[Dict[str, str]]:
+    if seconds is None:
+        return None
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
 
 
 class AppError(Exception):
     """Base application exception."""
 
+    # Extra headers of the error response.
+    headers: Optional[Dict[str, str]] = None
+
     def __init__(
         self,
         code: str,
@@ -108,3 +118,39 @@ class AuthorizationError(AppError):
             message=message,
             description=description,
         )
+
+
+class TooManyRequestsError(AppError):
+    """Too many requests exception."""
+
+    def __init__(
+        self,
+        message: str = "Too many requests",
+        description: str = "Too many requests were made, retry later",
+        retry_after: Optional[float] = None,
+    ) -> None:
+        self.headers = _retry_after(retry_after)
+        super().__init__(
+            code="TOO_MANY_REQUESTS",
+            status_code=429,
+            message=message,
+            description=description,
+        )
+
+
+class ServiceUnavailableError(AppError):
+    """Service unavailable exception."""
+
+    def __init__(
+        self,
+        message: str = "Service is overloaded",
+        description: str = "The service can't take more requests now, retry later",
+        retry_after: Optional[float] = None,
+    ) -> None:
+        self.headers = _retry_after(retry_after)
+        super().__init__(
+            code="SERVICE_UNAVAILABLE",
+            status_code=503,
+            message=message,
+            description=description,
+        )
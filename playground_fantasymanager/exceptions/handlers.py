@@ -1,9 +1,10 @@
 """Exception handlers for the application."""
 
 import logging
+from functools import lru_cache
 
+import orjson
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
 from starlette.responses import Response
 from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
 
@@ -11,6 +12,80 @@ from playground_fantasymanager.exceptions.base import AppError
 
 logger = logging.getLogger(__name__)
 
+# Body of unexpected errors, the same for every one of them.
+INTERNAL_ERROR_BODY = orjson.dumps(
+    {
+        "status_code": HTTP_500_INTERNAL_SERVER_ERROR,
+        "code": "INTERNAL_SERVER_ERROR",
+        "error": "InternalServerError",
+        "message": "An unexpected error occurred",
+        "description": "Please contact support if this error persists",
+    },
+)
+
+
+@lru_cache(maxsize=1024)
+def _body_prefix(status_code: int, code: str, error: str, message: str) -> bytes:
+    # Everything before the description, which often names a resource id.
+    body = orjson.dumps(
+        {
+            "status_code": status_code,
+            "code": code,
+            "error": error,
+            "message": message,
+            "description": None,
+        },
+    )
+    return body[: -len(b"null}")]
+
+
+def error_body(exc: AppError) -> bytes:
+    """
+    Encode the JSON body of an application error.
+
+    The part of the body shared by errors of the same class, code
+    and message is encoded once, so only the description is encoded
+    for every error.
+
+    :param exc: application error.
+    :return: JSON body.
+    """
+    prefix = _body_prefix(
+        exc.status_code,
+        exc.code,
+        exc.__class__.__name__,
+        exc.message,
+    )
+    return prefix + orjson.dumps(exc.description or exc.message) + b"}"
+
+
+def error_response(exc: AppError) -> Response:
+    """
+    Build the response to an application error.
+
+    :param exc: application error.
+    :return: JSON response with error details.
+    """
+    return Response(
+        error_body(exc),
+        status_code=exc.status_code,
+        headers=exc.headers,
+        media_type="application/json",
+    )
+
+
+def count_exception(request: Request, code: str) -> None:
+    """
+    Count an error response in metrics of the application.
+
+    :param request: request answered with the error.
+    :param code: code of the error.
+    """
+    # Metrics are optional, the app may be built without them.
+    metrics = getattr(request.app.state, "metrics", None)
+    if metrics is not None:
+        metrics.exception_raised(code)
+
 
 async def app_exception_handler(
     request: Request,
@@ -28,27 +103,22 @@ async def app_exception_handler(
         logger.error("Non-AppError passed to app_exception_handler: %s", type(exc))
         return await general_exception_handler(request, exc)
 
-    logger.warning(
-        "Application exception occurred: %s",
-        exc.message,
-        extra={
-            "status_code": exc.status_code,
-            "description": exc.description,
-            "path": request.url.path,
-            "method": request.method,
-        },
-    )
+    count_exception(request, exc.code)
 
-    return JSONResponse(
-        status_code=exc.status_code,
-        content={
-            "status_code": exc.status_code,
-            "code": exc.code,
-            "error": exc.__class__.__name__,
-            "message": exc.message,
-            "description": exc.description if exc.description else exc.message,
-        },
-    )
+    # Raw scope values are logged, building request.url would parse it.
+    if logger.isEnabledFor(logging.WARNING):
+        logger.warning(
+            "Application exception occurred: %s",
+            exc.message,
+            extra={
+                "status_code": exc.status_code,
+                "description": exc.description,
+                "path": request.scope["path"],
+                "method": request.scope["method"],
+            },
+        )
+
+    return error_response(exc)
 
 
 async def general_exception_handler(
@@ -62,25 +132,21 @@ async def general_exception_handler(
     :param exc: General exception
     :return: JSON response with generic error message
     """
+    count_exception(request, "INTERNAL_SERVER_ERROR")
     logger.error(
         "Unexpected exception occurred: %s",
         str(exc),
         exc_info=True,
         extra={
-            "path": request.url.path,
-            "method": request.method,
+            "path": request.scope["path"],
+            "method": request.scope["method"],
         },
     )
 
-    return JSONResponse(
+    return Response(
+        INTERNAL_ERROR_BODY,
         status_code=HTTP_500_INTERNAL_SERVER_ERROR,
-        content={
-            "status_code": HTTP_500_INTERNAL_SERVER_ERROR,
-            "code": "INTERNAL_SERVER_ERROR",
-            "error": "InternalServerError",
-            "message": "An unexpected error occurred",
-            "description": "Please contact support if this error persists",
-        },
+        media_type="application/json",
     )
 
 
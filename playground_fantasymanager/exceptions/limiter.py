@@ -0,0 +1,109 @@
+"""Limit of client errors caused by a single client."""
+
+import time
+from typing import Callable, Dict
+
+from starlette.requests import Request
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from playground_fantasymanager.exceptions.base import TooManyRequestsError
+from playground_fantasymanager.exceptions.handlers import (
+    count_exception,
+    error_response,
+)
+
+
+class ErrorRateLimiter:
+    """
+    Counts client errors of every client within a time window.
+
+    Counts are kept for the current window only, so memory is
+    bounded by the number of clients that failed in the window.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limit = limit
+        self.window = window
+        self._clock = clock
+        self._started = clock()
+        self._errors: Dict[str, int] = {}
+
+    def retry_after(self, client: str) -> float:
+        """
+        Check whether a client reached the limit.
+
+        :param client: address of the client.
+        :return: seconds until the client may retry, 0 if it may now.
+        """
+        now = self._clock()
+        if now - self._started >= self.window:
+            self._errors = {}
+            self._started = now
+        if self._errors.get(client, 0) < self.limit:
+            return 0.0
+        return self._started + self.window - now
+
+    def record(self, client: str) -> None:
+        """
+        Count a client error.
+
+        :param client: address of the client.
+        """
+        self._errors[client] = self._errors.get(client, 0) + 1
+
+
+class ErrorRateLimitMiddleware:
+    """
+    Rejects requests of clients that caused too many client errors.
+
+    Responses with 4xx statuses other than 429 count against the client, and once
+    it reaches the limit its requests get a pre-encoded 429 response
+    without reaching routing, the store or the exception handlers.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: ErrorRateLimiter) -> None:
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request unless its client is limited.
+
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        address = client[0] if client else ""
+        retry_after = self.limiter.retry_after(address)
+        if retry_after:
+            exc = TooManyRequestsError(
+                "Too many failed requests",
+                description="Too many requests of the client failed, retry later",
+                retry_after=retry_after,
+            )
+            count_exception(Request(scope), exc.code)
+            await error_response(exc)(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if (
+                message["type"] == "http.response.start"
+                and 400 <= message["status"] < 500
+                # Rate limited requests aren't failures of the client.
+                and message["status"] != HTTP_429_TOO_MANY_REQUESTS
+            ):
+                self.limiter.record(address)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,11 +1,40 @@
+import atexit
 import logging
+import queue
 import sys
-from typing import Union
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+import orjson
 from loguru import logger
 
 from playground_fantasymanager.settings import settings
 
+if TYPE_CHECKING:
+    from loguru import Message, Record
+
+# Extra key carrying the stdlib record through loguru.
+STDLIB_RECORD = "_stdlib_record"
+# Attributes of every stdlib record, the rest come from ``extra``.
+_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", None, None)),
+) | {"message", "asctime"}
+# Loguru records are told apart by logger, function, line and message.
+RepeatKey = Tuple[Optional[str], str, int, str]
+
 
 class InterceptHandler(logging.Handler):
     """
@@ -18,10 +47,13 @@ class InterceptHandler(logging.Handler):
     https://loguru.readthedocs.io/en/stable/overview.html#entirely-compatible-with-standard-logging
     """
 
-    def emit(self, record: logging.LogRecord) -> None:  # pragma: no cover
+    def emit(self, record: logging.LogRecord) -> None:
         """
         Propagates logs to loguru.
 
+        The stdlib record already knows where it was logged,
+        so ``use_stdlib_caller`` copies that instead of walking frames.
+
         :param record: record to log.
         """
         try:
@@ -29,18 +61,232 @@ class InterceptHandler(logging.Handler):
         except ValueError:
             level = record.levelno
 
-        # Find caller from where originated the logged message
-        frame, depth = logging.currentframe(), 2
-        while frame.f_code.co_filename == logging.__file__:
-            frame = frame.f_back  # type: ignore
-            depth += 1
-
-        logger.opt(depth=depth, exception=record.exc_info).log(
+        logger.bind(**{STDLIB_RECORD: record}).opt(exception=record.exc_info).log(
             level,
             record.getMessage(),
         )
 
 
+def use_stdlib_caller(record: "Record") -> None:
+    """
+    Describe loguru records of stdlib logs with the stdlib caller.
+
+    Fields passed with ``extra`` to stdlib loggers become loguru extras.
+
+    :param record: loguru record being logged.
+    """
+    stdlib = record["extra"].pop(STDLIB_RECORD, None)
+    if stdlib is None:
+        return
+    record["name"] = stdlib.name
+    record["module"] = stdlib.module
+    record["function"] = stdlib.funcName
+    record["line"] = stdlib.lineno
+    for key, value in vars(stdlib).items():
+        if key not in _RECORD_ATTRS:
+            record["extra"].setdefault(key, value)
+
+
+class RepeatLimiter:
+    """
+    Limits identical records logged within a time window.
+
+    Counts are kept for the current window only, so memory is bounded
+    by the number of distinct records of a window.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limit = limit
+        self.window = window
+        self._clock = clock
+        self._started = clock()
+        self._counts: Dict[RepeatKey, int] = {}
+
+    def allow(self, key: RepeatKey) -> bool:
+        """
+        Count a record.
+
+        :param key: what makes records identical.
+        :return: whether the record should be logged.
+        """
+        count = self._counts.get(key, 0) + 1
+        self._counts[key] = count
+        return count <= self.limit
+
+    def roll(self, force: bool = False) -> List[Tuple[RepeatKey, int]]:
+        """
+        Start a new window once the current one is over.
+
+        :param force: start a new window even if the current isn't over.
+        :return: keys suppressed in the finished window with their counts.
+        """
+        now = self._clock()
+        if not force and now - self._started < self.window:
+            return []
+        suppressed = [
+            (key, count - self.limit)
+            for key, count in self._counts.items()
+            if count > self.limit
+        ]
+        self._counts = {}
+        self._started = now
+        return suppressed
+
+
+class QueuedJsonSink:
+    """
+    Loguru sink writing JSON lines in batches from a background thread.
+
+    Logging only puts a record on a bounded queue, so callers on the
+    event loop never wait for the stream. Records that don't fit are
+    dropped and counted, and the count is logged by the writer.
+    Identical warnings and errors beyond the rate limit are suppressed
+    and summarized when their window ends.
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        queue_size: int,
+        batch_size: int,
+        limiter: RepeatLimiter,
+    ) -> None:
+        self.stream = stream
+        self.batch_size = batch_size
+        self.limiter = limiter
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(queue_size)
+        self._thread = threading.Thread(
+            target=self._run,
+            name="log-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def write(self, message: "Message") -> None:
+        """
+        Queue a record, called by loguru under its handler lock.
+
+        :param message: formatted message with its record.
+        """
+        record = message.record
+        for key, count in self.limiter.roll():
+            self._put(_suppressed_entry(key, count))
+        if record["level"].no >= logging.WARNING:
+            key = (
+                record["name"],
+                record["function"],
+                record["line"],
+                record["message"],
+            )
+            if not self.limiter.allow(key):
+                return
+        entry = {
+            **record["extra"],
+            "time": record["time"],
+            "level": record["level"].name,
+            "logger": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+            "message": record["message"],
+        }
+        if record["exception"] is not None:
+            # Tracebacks are formatted by the writer.
+            entry["exception"] = record["exception"]
+        self._put(entry)
+
+    def close(self) -> None:
+        """Write queued records and stop the writer."""
+        for key, count in self.limiter.roll(force=True):
+            self._put(_suppressed_entry(key, count))
+        self._queue.put(None)
+        self._thread.join()
+
+    def _put(self, entry: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        closing = False
+        while not closing:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            lines = []
+            for entry in batch:
+                if entry is None:
+                    closing = True
+                else:
+                    lines.append(_encode(entry))
+            dropped = self.dropped
+            if dropped != self._reported_dropped:
+                lines.append(_encode(_dropped_entry(dropped - self._reported_dropped)))
+                self._reported_dropped = dropped
+            self.stream.write(b"".join(lines))
+            self.stream.flush()
+
+
+def _encode(entry: Dict[str, Any]) -> bytes:
+    exception = entry.get("exception")
+    if exception is not None and not isinstance(exception, str):
+        entry["exception"] = "".join(traceback.format_exception(*exception))
+    return orjson.dumps(entry, default=_default, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _default(value: Any) -> str:
+    # Loguru times subclass datetime, which orjson only handles exactly.
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _suppressed_entry(key: RepeatKey, count: int) -> Dict[str, Any]:
+    name, function, line, message = key
+    return {
+        "time": datetime.now().astimezone(),
+        "level": "WARNING",
+        "logger": name,
+        "function": function,
+        "line": line,
+        "message": f"Suppressed {count} more records: {message}",
+        "suppressed": count,
+    }
+
+
+def _dropped_entry(count: int) -> Dict[str, Any]:
+    return {
+        "time": datetime.now().astimezone(),
+        "level": "WARNING",
+        "logger": __name__,
+        "message": f"Dropped {count} records, the log queue was full",
+        "dropped": count,
+    }
+
+
+# Sink of the queued mode, replaced every time logging is configured.
+_queued_sinks: List[QueuedJsonSink] = []
+
+
+def close_queued_sink() -> None:
+    """Write remaining records of the queued mode and stop its writer."""
+    while _queued_sinks:
+        _queued_sinks.pop().close()
+
+
+atexit.register(close_queued_sink)
+
+
 def configure_logging() -> None:  # pragma: no cover
     """Configures logging."""
     intercept_handler = InterceptHandler()
@@ -57,7 +303,19 @@ def configure_logging() -> None:  # pragma: no cover
 
     # set logs output, level and format
     logger.remove()
-    logger.add(
-        sys.stdout,
-        level=settings.log_level.value,
+    close_queued_sink()
+    logger.configure(patcher=use_stdlib_caller)
+    if not settings.log_queued:
+        logger.add(
+            sys.stdout,
+            level=settings.log_level.value,
+        )
+        return
+    sink = QueuedJsonSink(
+        sys.stdout.buffer,
+        queue_size=settings.log_queue_size,
+        batch_size=settings.log_batch_size,
+        limiter=RepeatLimiter(settings.log_repeat_limit, settings.log_repeat_window),
     )
+    _queued_sinks.append(sink)
+    logger.add(sink.write, level=settings.log_level.value, format="{message}")
@@ -0,0 +1,21 @@
+"""Rate limits and admission control of requests."""
+
+from playground_fantasymanager.services.admission.buckets import (
+    RateLimiter,
+    TokenBuckets,
+)
+from playground_fantasymanager.services.admission.controller import (
+    AdmissionController,
+    Priority,
+)
+from playground_fantasymanager.services.admission.middleware import (
+    AdmissionMiddleware,
+)
+
+__all__ = [
+    "AdmissionController",
+    "AdmissionMiddleware",
+    "Priority",
+    "RateLimiter",
+    "TokenBuckets",
+]
@@ -0,0 +1,96 @@
+"""Token bucket rate limits of users and routes."""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, List, Optional, Tuple
+
+
+class TokenBuckets:
+    """
+    Token buckets filled at ``rate`` tokens per second up to ``burst``.
+
+    Buckets are refilled lazily when they are used. When there are
+    more than ``max_keys`` of them, the least recently used bucket is
+    dropped: it is the likeliest to be full again, like a new bucket.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        max_keys: int = 100_000,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._clock = clock
+        # Tokens and time of the last update of every bucket,
+        # from the least to the most recently used.
+        self._buckets: "OrderedDict[Hashable, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: Hashable) -> float:
+        """
+        Take a token from a bucket.
+
+        :param key: key of the bucket.
+        :return: 0 if a token was taken, else seconds until one is available.
+        """
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = [float(self.burst), now]
+        else:
+            self._buckets.move_to_end(key)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Rate limits of every user on a route and of every route as a whole.
+
+    A limit with a zero rate isn't enforced. Limits are kept by each
+    worker, so with several workers a client gets a budget per worker.
+    """
+
+    def __init__(
+        self,
+        user_rate: float,
+        user_burst: int,
+        route_rate: float,
+        route_burst: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.users: Optional[TokenBuckets] = None
+        self.routes: Optional[TokenBuckets] = None
+        if user_rate > 0:
+            self.users = TokenBuckets(user_rate, user_burst, clock)
+        if route_rate > 0:
+            self.routes = TokenBuckets(route_rate, route_burst, clock)
+
+    def retry_after(self, route: Tuple[str, str], user_id: Optional[str]) -> float:
+        """
+        Take a token for a request.
+
+        :param route: method and path template of the route.
+        :param user_id: id of the user the request is about, if any.
+        :return: 0 if the request may proceed, else seconds to wait.
+        """
+        if self.users is not None and user_id is not None:
+            wait = self.users.take((route, user_id))
+            if wait:
+                return wait
+        if self.routes is not None:
+            return self.routes.take(route)
+        return 0.0
@@ -0,0 +1,49 @@
+"""Admission of concurrent requests by priority."""
+
+import enum
+from typing import Dict
+
+
+class Priority(str, enum.Enum):
+    """Priority classes of requests."""
+
+    # Always admitted and not counted, such as health checks.
+    EXEMPT = "exempt"
+    READ = "read"
+    WRITE = "write"
+
+
+class AdmissionController:
+    """
+    Limits requests served by a worker at once.
+
+    Reads are admitted while fewer than ``max_in_flight`` requests
+    are being served, writes only while fewer than ``write_share``
+    of that. When load grows, writes are shed first and reads keep
+    being served.
+    """
+
+    def __init__(self, max_in_flight: int, write_share: float) -> None:
+        self.limits = {
+            Priority.READ: max_in_flight,
+            Priority.WRITE: max(1, int(max_in_flight * write_share)),
+        }
+        self.in_flight = 0
+        self.shed: Dict[Priority, int] = {Priority.READ: 0, Priority.WRITE: 0}
+
+    def admit(self, priority: Priority) -> bool:
+        """
+        Admit a request if there is room for its priority.
+
+        :param priority: priority of the request, not ``EXEMPT``.
+        :return: whether the request was admitted and must be released.
+        """
+        if self.in_flight >= self.limits[priority]:
+            self.shed[priority] += 1
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        """Count an admitted request that finished."""
+        self.in_flight -= 1
@@ -0,0 +1,22 @@
+from starlette.requests import Request
+
+from playground_fantasymanager.exceptions.base import TooManyRequestsError
+from playground_fantasymanager.services.admission.buckets import RateLimiter
+
+
+async def enforce_rate_limits(request: Request) -> None:
+    """
+    Rejects requests over the rate limits of their user and route.
+
+    It is async, so checking limits never waits for a worker thread.
+
+    :param request: current request.
+    :raises TooManyRequestsError: if a limit is exceeded.
+    """
+    limiter: RateLimiter = request.app.state.rate_limiter
+    if limiter.users is None and limiter.routes is None:
+        return
+    route = (request.scope["method"], request.scope["route"].path_format)
+    retry_after = limiter.retry_after(route, request.path_params.get("userId"))
+    if retry_after:
+        raise TooManyRequestsError(retry_after=retry_after)
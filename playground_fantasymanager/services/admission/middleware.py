@@ -0,0 +1,76 @@
+"""ASGI middleware shedding requests above the admission limits."""
+
+from typing import Sequence
+
+from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from playground_fantasymanager.exceptions.base import ServiceUnavailableError
+from playground_fantasymanager.exceptions.handlers import (
+    count_exception,
+    error_response,
+)
+from playground_fantasymanager.services.admission.controller import (
+    AdmissionController,
+    Priority,
+)
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdmissionMiddleware:
+    """
+    Answers requests that can't be admitted with 503 at once.
+
+    Requests are shed before routing, so an overloaded worker spends
+    almost nothing on them. Paths starting with an exempt prefix,
+    such as health checks and live streams, are never shed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        exempt_paths: Sequence[str],
+    ) -> None:
+        self.app = app
+        self.controller = controller
+        self.exempt_paths = tuple(exempt_paths)
+
+    def priority(self, scope: Scope) -> Priority:
+        """
+        Get the priority class of a request.
+
+        :param scope: ASGI connection scope.
+        :return: priority of the request.
+        """
+        if scope["path"].startswith(self.exempt_paths):
+            return Priority.EXEMPT
+        if scope["method"] in READ_METHODS:
+            return Priority.READ
+        return Priority.WRITE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request if it is admitted.
+
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.priority(scope)
+        if priority == Priority.EXEMPT:
+            await self.app(scope, receive, send)
+            return
+        if not self.controller.admit(priority):
+            exc = ServiceUnavailableError(retry_after=1)
+            count_exception(Request(scope), exc.code)
+            await error_response(exc)(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
@@ -0,0 +1,12 @@
+"""Negotiated compression of responses."""
+
+from playground_fantasymanager.services.compression.codecs import (
+    ENCODINGS,
+    compress,
+    negotiate,
+)
+from playground_fantasymanager.services.compression.middleware import (
+    CompressionMiddleware,
+)
+
+__all__ = ["ENCODINGS", "CompressionMiddleware", "compress", "negotiate"]
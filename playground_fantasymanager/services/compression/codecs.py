@@ -0,0 +1,121 @@
+"""Content codings offered to clients."""
+
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None  # type: ignore[assignment]
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore[assignment]
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+
+class StreamCompressor:
+    """
+    Compresses a response body sent in chunks.
+
+    Every chunk is flushed, so clients can decode what was sent
+    without waiting for the end of the body.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        self._compressor: Any
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zstandard.ZstdCompressor(
+                level=ZSTD_LEVEL,
+            ).compressobj()
+
+    def compress(self, chunk: bytes, more: bool) -> bytes:
+        """
+        Compress a chunk of the body.
+
+        :param chunk: bytes of the body.
+        :param more: whether more chunks follow.
+        :return: compressed bytes to send.
+        """
+        compressor = self._compressor
+        if self.encoding == "br":
+            data = compressor.process(chunk)
+            return data + (compressor.flush() if more else compressor.finish())
+        data = compressor.compress(chunk)
+        if not more:
+            return data + compressor.flush()
+        if self.encoding == "gzip":
+            return data + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return data + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """
+    Get codings that can be used, the preferred one first.
+
+    :return: names of content codings.
+    """
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+ENCODINGS = available_encodings()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress a whole body.
+
+    :param data: bytes of the body.
+    :param encoding: name of the content coding.
+    :return: compressed bytes.
+    """
+    return StreamCompressor(encoding).compress(data, more=False)
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Choose the coding of a response.
+
+    Clients send few distinct headers, so choices are cached.
+
+    :param accept_encoding: value of the Accept-Encoding header.
+    :return: best coding accepted by the client or None to send it as is.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    wildcard = weights.get("*", 0.0)
+    best: Optional[str] = None
+    best_weight = 0.0
+    for encoding in ENCODINGS:
+        weight = weights.get(encoding, wildcard)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
@@ -0,0 +1,144 @@
+"""ASGI middleware compressing responses."""
+
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from playground_fantasymanager.services.compression.codecs import (
+    StreamCompressor,
+    compress,
+    negotiate,
+)
+
+# Types sent as is, either already compressed or flushed event by event.
+SKIPPED_TYPES = ("text/event-stream", "image/", "video/", "application/zip")
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the best coding accepted by the client.
+
+    Bodies sent at once are compressed only from ``minimum_size``
+    bytes. Streamed bodies are compressed chunk by chunk with a flush
+    after every chunk. Responses that already have a Content-Encoding,
+    such as cached precompressed ones, are sent as is. Strong ETags
+    of compressed responses, and of 304 responses to clients that
+    accept a coding, are made weak, since compressed bytes differ
+    from those of the identity body.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request, compressing its response if possible.
+
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(send, encoding, self.minimum_size).run(
+            self.app,
+            scope,
+            receive,
+        )
+
+
+class _CompressedResponse:
+    """State of compressing a single response."""
+
+    def __init__(self, send: Send, encoding: str, minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        """
+        Run the application, compressing what it sends.
+
+        :param app: wrapped application.
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        """
+        await app(scope, receive, self.send_message)
+
+    async def send_message(self, message: Message) -> None:
+        """
+        Compress a message of the application and send it.
+
+        :param message: ASGI message.
+        """
+        if self.passthrough:
+            await self.send(message)
+        elif message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in {204, 304}
+                or content_type.startswith(SKIPPED_TYPES)
+            )
+            if self.passthrough:
+                if message["status"] == 304:
+                    # Validators match those of the compressed body.
+                    _weaken_etag(MutableHeaders(scope=message))
+                await self.send(message)
+            else:
+                # Headers depend on the body, which isn't known yet.
+                self.start = message
+        elif message["type"] == "http.response.body":
+            await self._send_body(message)
+        else:
+            await self.send(message)
+
+    async def _send_body(self, message: Message) -> None:
+        body: bytes = message.get("body", b"")
+        more: bool = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers = MutableHeaders(scope=start)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            _weaken_etag(headers)
+            if not more:
+                body = compress(body, self.encoding)
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            # The size of a streamed body is known only at its end.
+            del headers["Content-Length"]
+            self.compressor = StreamCompressor(self.encoding)
+            await self.send(start)
+        if self.compressor is not None:
+            await self.send(
+                {
+                    "type": "http.response.body",
+                    "body": self.compressor.compress(body, more),
+                    "more_body": more,
+                },
+            )
+
+
+def _weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag is not None and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
@@ -0,0 +1,12 @@
+"""Generation of default fantasy teams."""
+
+from playground_fantasymanager.services.generator.engine import (
+    PlayerPool,
+    generate_teams,
+)
+from playground_fantasymanager.services.generator.solver import (
+    TeamSolver,
+    suggest_teams,
+)
+
+__all__ = ["PlayerPool", "TeamSolver", "generate_teams", "suggest_teams"]
@@ -0,0 +1,247 @@
+"""Batch generation of default fantasy teams."""
+
+import hashlib
+from functools import lru_cache
+from itertools import product
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from playground_fantasymanager.services.store.base import POSITIONS, TEAM_SIZE
+
+# Minimum and maximum number of players of every position in a fantasy team.
+POSITION_LIMITS = ((1, 4), (3, 6), (1, 4), (3, 6))
+# Maximum number of players picked from one real team.
+MAX_PLAYERS_PER_TEAM = 7
+# Teams are generated in blocks, so a team doesn't depend on the page size.
+BLOCK_SIZE = 16
+
+# Real teams of a match with squads listed by position.
+SQUADS = (
+    (
+        {
+            "team_id": "t1",
+            "name": "Chennai Super Kings",
+            "team_image_url": "https://example.com/csk.png",
+        },
+        (
+            ("MS Dhoni", "Devon Conway"),
+            ("Ruturaj Gaikwad", "Ajinkya Rahane", "Shivam Dube", "Rachin Ravindra"),
+            ("Ravindra Jadeja", "Moeen Ali"),
+            ("Deepak Chahar", "Tushar Deshpande", "Matheesha Pathirana"),
+        ),
+    ),
+    (
+        {
+            "team_id": "t2",
+            "name": "Mumbai Indians",
+            "team_image_url": "https://example.com/mi.png",
+        },
+        (
+            ("Ishan Kishan", "Vishnu Vinod"),
+            ("Rohit Sharma", "Suryakumar Yadav", "Tilak Varma", "Tim David"),
+            ("Hardik Pandya", "Romario Shepherd"),
+            ("Jasprit Bumrah", "Gerald Coetzee", "Piyush Chawla"),
+        ),
+    ),
+)
+
+Picks = Tuple[npt.NDArray[np.intp], npt.NDArray[np.intp], npt.NDArray[np.intp]]
+
+
+def match_seed(match_id: str, seed: int = 0) -> int:
+    """
+    Derive the seed of a match.
+
+    :param match_id: id of the match.
+    :param seed: global seed of the generator.
+    :return: seed of the random generators of the match.
+    """
+    digest = hashlib.blake2b(f"{seed}:{match_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class PlayerPool:
+    """
+    Players of a match and the valid ways to pick them.
+
+    The pool is built once per match: every player becomes a position,
+    a real team and a prebuilt document, and every allowed number of
+    players per position is listed up front. Teams are then sampled
+    for many rows at once with array operations.
+    """
+
+    def __init__(self, match_id: str, seed: int = 0) -> None:
+        self.seed = match_seed(match_id, seed)
+        rng = np.random.default_rng(self.seed)
+        positions: List[int] = []
+        teams: List[int] = []
+        self.players: List[Dict[str, Any]] = []
+        for team_index, (team, squad) in enumerate(SQUADS):
+            for position, names in enumerate(squad):
+                for name in names:
+                    positions.append(position)
+                    teams.append(team_index)
+                    self.players.append(
+                        {
+                            "player_id": f"p{len(self.players) + 1}",
+                            "player_name": name,
+                            "player_image_url": "https://example.com/player.png",
+                            "is_captain": False,
+                            "is_vice_captain": False,
+                            "credits": round(float(rng.uniform(8, 11)), 1),
+                            "points_earned": int(rng.integers(50, 151)),
+                            "position": POSITIONS[position],
+                            "team_id": team["team_id"],
+                        },
+                    )
+        self.positions = np.array(positions, dtype=np.intp)
+        self.teams = np.array(teams, dtype=np.intp)
+        self.credits = np.array([player["credits"] for player in self.players])
+        # Points earned so far are the projection of the players' points.
+        self.projected = np.array(
+            [player["points_earned"] for player in self.players],
+            dtype=np.float64,
+        )
+        self.projection_version = hashlib.blake2b(
+            self.credits.tobytes() + self.projected.tobytes(),
+            digest_size=8,
+        ).hexdigest()
+        available = np.bincount(self.positions, minlength=len(POSITIONS))
+        # Rank of the first player of every position when sorted by position.
+        self._first_rank = (np.cumsum(available) - available)[self.positions]
+        self.compositions = np.array(
+            [
+                counts
+                for counts in product(
+                    *(range(low, high + 1) for low, high in POSITION_LIMITS),
+                )
+                if sum(counts) == TEAM_SIZE
+                and all(
+                    count <= limit
+                    for count, limit in zip(counts, available, strict=True)
+                )
+            ],
+            dtype=np.intp,
+        )
+
+    def pick(self, rng: np.random.Generator, count: int) -> Picks:
+        """
+        Pick players, captains and vice captains of many teams.
+
+        :param rng: random generator.
+        :param count: number of teams.
+        :return: player indices of shape (count, 11) and
+            slots of captains and vice captains in every row.
+        """
+        masks = []
+        missing = count
+        while missing > 0:
+            # A few teams take too many players of one real team and
+            # are dropped, so more are drawn than needed.
+            mask = self._select(rng, missing + missing // 4 + 4)
+            from_first = mask[:, self.teams == 0].sum(axis=1)
+            valid = mask[
+                (from_first <= MAX_PLAYERS_PER_TEAM)
+                & (TEAM_SIZE - from_first <= MAX_PLAYERS_PER_TEAM)
+            ][:missing]
+            masks.append(valid)
+            missing -= len(valid)
+        rows = np.nonzero(np.concatenate(masks))[1].reshape(count, TEAM_SIZE)
+        captains = rng.integers(0, TEAM_SIZE, size=count)
+        vice_captains = (captains + rng.integers(1, TEAM_SIZE, size=count)) % TEAM_SIZE
+        return rows, captains, vice_captains
+
+    def documents(self, picks: Picks) -> List[Dict[str, Any]]:
+        """
+        Build fantasy team documents from picked players.
+
+        :param picks: result of ``pick``.
+        :return: documents in the shape of ``FantasyTeam``.
+        """
+        rows, captains, vice_captains = picks
+        sizes = np.stack(
+            [(self.teams[rows] == team).sum(axis=1) for team in range(len(SQUADS))],
+            axis=1,
+        )
+        documents = []
+        for row, captain, vice_captain, row_sizes in zip(
+            rows.tolist(),
+            captains.tolist(),
+            vice_captains.tolist(),
+            sizes.tolist(),
+            strict=True,
+        ):
+            players = []
+            for slot, index in enumerate(row):
+                player = dict(self.players[index])
+                player["is_captain"] = slot == captain
+                player["is_vice_captain"] = slot == vice_captain
+                players.append(player)
+            teams = [
+                {**team, "number_of_players": size}
+                for (team, _), size in zip(SQUADS, row_sizes, strict=True)
+            ]
+            documents.append({"teams": teams, "players": players})
+        return documents
+
+    def _select(self, rng: np.random.Generator, count: int) -> npt.NDArray[np.bool_]:
+        # Random keys offset by position sort players by position and
+        # randomly within it, the lowest ranked ones of every position
+        # are picked up to the counts of a random composition.
+        compositions = self.compositions[
+            rng.integers(0, len(self.compositions), size=count)
+        ]
+        keys = rng.random((count, len(self.players))) + self.positions
+        ranks = keys.argsort(axis=1).argsort(axis=1)
+        picked: npt.NDArray[np.bool_] = (
+            ranks - self._first_rank < compositions[:, self.positions]
+        )
+        return picked
+
+
+@lru_cache(maxsize=1024)
+def player_pool(match_id: str, seed: int = 0) -> PlayerPool:
+    """
+    Get the player pool of a match.
+
+    :param match_id: id of the match.
+    :param seed: global seed of the generator.
+    :return: player pool.
+    """
+    return PlayerPool(match_id, seed)
+
+
+def generate_teams(
+    match_id: str,
+    count: int,
+    offset: int = 0,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Generate default fantasy teams of a match.
+
+    Teams of a match form an endless deterministic sequence,
+    so the same offset always gives the same team.
+
+    :param match_id: id of the match.
+    :param count: number of teams.
+    :param offset: position of the first team in the sequence.
+    :param seed: global seed of the generator.
+    :return: documents in the shape of ``FantasyTeam``.
+    """
+    if count <= 0:
+        return []
+    pool = player_pool(match_id, seed)
+    first_block = offset // BLOCK_SIZE
+    last_block = (offset + count - 1) // BLOCK_SIZE
+    blocks = [
+        pool.pick(np.random.default_rng([pool.seed, block]), BLOCK_SIZE)
+        for block in range(first_block, last_block + 1)
+    ]
+    start = offset - first_block * BLOCK_SIZE
+    rows, captains, vice_captains = (
+        np.concatenate(arrays)[start : start + count] for arrays in zip(*blocks)
+    )
+    return pool.documents((rows, captains, vice_captains))
@@ -0,0 +1,280 @@
+"""Suggestion of the best projected fantasy teams."""
+
+import threading
+from collections import defaultdict, deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from playground_fantasymanager.services.generator.engine import (
+    MAX_PLAYERS_PER_TEAM,
+    POSITION_LIMITS,
+    PlayerPool,
+    player_pool,
+)
+from playground_fantasymanager.services.scoring.engine import (
+    CAPTAIN_MULTIPLIER,
+    VICE_CAPTAIN_MULTIPLIER,
+)
+from playground_fantasymanager.services.store.base import TEAM_SIZE
+
+# Credits every fantasy team can spend.
+CREDIT_BUDGET = 100.0
+# Players every suggested team has that no better suggested team has.
+MIN_DIFFERENT_PLAYERS = 3
+# Multipliers of the first and second picked players.
+MULTIPLIERS = (CAPTAIN_MULTIPLIER, VICE_CAPTAIN_MULTIPLIER)
+# Complete teams met by earlier searches that seed the next ones.
+SEEN_TEAMS = 256
+
+# Projected points and pool indices of players, captain first.
+Suggestion = Tuple[float, Tuple[int, ...]]
+
+
+class _Search:
+    """State of a single branch and bound search."""
+
+    def __init__(self, previous: List[Set[int]]) -> None:
+        self.previous = previous
+        self.best_points = -1.0
+        self.best: Optional[Tuple[int, ...]] = None
+        self.chosen: List[int] = []
+        self.position_counts = [0] * len(POSITION_LIMITS)
+        self.team_counts: Dict[int, int] = defaultdict(int)
+        self.common = [0] * len(previous)
+
+    def pick(self, index: int, player: int, position: int, team: int) -> List[bool]:
+        """
+        Add a player to the team being built.
+
+        :param index: position of the player in the search order.
+        :param player: pool index of the player.
+        :param position: position of the player.
+        :param team: real team of the player.
+        :return: whether each previous suggestion has the player.
+        """
+        self.chosen.append(index)
+        self.position_counts[position] += 1
+        self.team_counts[team] += 1
+        shared = [player in players for players in self.previous]
+        for i, is_shared in enumerate(shared):
+            self.common[i] += is_shared
+        return shared
+
+    def unpick(self, shared: List[bool], position: int, team: int) -> None:
+        """
+        Remove the last added player.
+
+        :param shared: result of ``pick``.
+        :param position: position of the player.
+        :param team: real team of the player.
+        """
+        for i, is_shared in enumerate(shared):
+            self.common[i] -= is_shared
+        self.team_counts[team] -= 1
+        self.position_counts[position] -= 1
+        self.chosen.pop()
+
+
+class TeamSolver:
+    """
+    Finds fantasy teams with the most projected points.
+
+    Teams are searched with branch and bound over players sorted by
+    projected points, so the first picked player is the captain and
+    the second one is the vice captain. A branch is cut when even the
+    next best players can't beat the best team found, or when it can
+    no longer meet position minimums or the credit budget.
+
+    Suggestions are found one by one, every next team being the best
+    one that differs enough from all previous suggestions. Complete
+    teams met by earlier searches give later ones a starting best team.
+    """
+
+    def __init__(
+        self,
+        pool: PlayerPool,
+        budget: float = CREDIT_BUDGET,
+        min_different: int = MIN_DIFFERENT_PLAYERS,
+    ) -> None:
+        self._pool = pool
+        self._order: List[int] = np.argsort(-pool.projected, kind="stable").tolist()
+        self._points = [float(pool.projected[i]) for i in self._order]
+        # Credits are counted in tenths to avoid rounding errors.
+        self._credits = [round(float(pool.credits[i]) * 10) for i in self._order]
+        self._positions = [int(pool.positions[i]) for i in self._order]
+        self._teams = [int(pool.teams[i]) for i in self._order]
+        self._budget = round(budget * 10)
+        self._max_common = TEAM_SIZE - min_different
+        size = len(self._order)
+        self._prefix = [0.0, *np.cumsum(self._points).tolist()]
+        # Credits of the cheapest players after every position.
+        self._cheapest = [
+            [0, *np.cumsum(sorted(self._credits[i:])).tolist()] for i in range(size + 1)
+        ]
+        self._left = [
+            [
+                self._positions[i:].count(position)
+                for position in range(len(POSITION_LIMITS))
+            ]
+            for i in range(size + 1)
+        ]
+        self._lock = threading.Lock()
+        self._suggestions: List[Suggestion] = []
+        # Only the latest teams are kept, a search meets better teams as it goes.
+        self._seen: Deque[Suggestion] = deque(maxlen=SEEN_TEAMS)
+
+    def suggest(self, count: int) -> List[Suggestion]:
+        """
+        Get the best suggested teams.
+
+        :param count: number of teams.
+        :return: projected points and pool indices of players of every
+            team, captain first and vice captain second, best team first.
+            There are fewer teams if no more valid ones exist.
+        """
+        with self._lock:
+            while len(self._suggestions) < count:
+                found = self._solve()
+                if found is None:
+                    break
+                self._suggestions.append(found)
+            return self._suggestions[:count]
+
+    def _solve(self) -> Optional[Suggestion]:
+        search = _Search([set(players) for _, players in self._suggestions])
+        for points, team in self._seen:
+            if points > search.best_points and self._differs(search, team):
+                search.best_points, search.best = points, team
+        self._search(search, 0, 0.0, 0)
+        if search.best is None:
+            return None
+        return search.best_points, search.best
+
+    def _search(
+        self,
+        search: _Search,
+        index: int,
+        points: float,
+        credits: int,
+    ) -> None:
+        remaining = TEAM_SIZE - len(search.chosen)
+        if not self._can_complete(search, index, remaining):
+            return
+        if remaining == 0:
+            team = tuple(self._order[i] for i in search.chosen)
+            self._seen.append((points, team))
+            if points > search.best_points:
+                search.best_points, search.best = points, team
+            return
+        if self._bound(search, index, points, remaining) <= search.best_points:
+            return
+        if credits + self._cheapest[index][remaining] > self._budget:
+            return
+        if self._can_pick(search, index, credits):
+            slot = len(search.chosen)
+            multiplier = MULTIPLIERS[slot] if slot < len(MULTIPLIERS) else 1.0
+            shared = search.pick(
+                index,
+                self._order[index],
+                self._positions[index],
+                self._teams[index],
+            )
+            self._search(
+                search,
+                index + 1,
+                points + multiplier * self._points[index],
+                credits + self._credits[index],
+            )
+            search.unpick(shared, self._positions[index], self._teams[index])
+        self._search(search, index + 1, points, credits)
+
+    def _can_complete(self, search: _Search, index: int, remaining: int) -> bool:
+        # Every position must still be able to reach its minimum.
+        needed = 0
+        for position, (low, _) in enumerate(POSITION_LIMITS):
+            missing = low - search.position_counts[position]
+            if missing > self._left[index][position]:
+                return False
+            needed += max(missing, 0)
+        return needed <= remaining and len(self._order) - index >= remaining
+
+    def _bound(
+        self,
+        search: _Search,
+        index: int,
+        points: float,
+        remaining: int,
+    ) -> float:
+        # Players are sorted by points, so the next ones are the best
+        # that can still be picked, including as captain or vice captain.
+        bound = points + self._prefix[index + remaining] - self._prefix[index]
+        picked = len(search.chosen)
+        for slot in range(picked, len(MULTIPLIERS)):
+            bound += (MULTIPLIERS[slot] - 1) * self._points[index + slot - picked]
+        return bound
+
+    def _can_pick(self, search: _Search, index: int, credits: int) -> bool:
+        position = self._positions[index]
+        return (
+            search.position_counts[position] < POSITION_LIMITS[position][1]
+            and search.team_counts[self._teams[index]] < MAX_PLAYERS_PER_TEAM
+            and credits + self._credits[index] <= self._budget
+            and all(
+                common < self._max_common or self._order[index] not in players
+                for common, players in zip(search.common, search.previous, strict=True)
+            )
+        )
+
+    def _differs(self, search: _Search, team: Tuple[int, ...]) -> bool:
+        return all(
+            len(players.intersection(team)) <= self._max_common
+            for players in search.previous
+        )
+
+    def documents(self, count: int, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        Build documents of suggested teams.
+
+        :param count: number of teams.
+        :param offset: number of best teams to skip.
+        :return: documents in the shape of ``FantasyTeam``.
+        """
+        teams = self.suggest(offset + count)[offset:]
+        if not teams:
+            return []
+        rows = np.array([players for _, players in teams], dtype=np.intp)
+        captains = np.zeros(len(teams), dtype=np.intp)
+        return self._pool.documents((rows, captains, captains + 1))
+
+
+@lru_cache(maxsize=1024)
+def _team_solver(match_id: str, seed: int, projection_version: str) -> TeamSolver:
+    # The projection version is part of the key, so suggestions
+    # are never reused after projections of a match change.
+    return TeamSolver(player_pool(match_id, seed))
+
+
+def suggest_teams(
+    match_id: str,
+    count: int,
+    offset: int = 0,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Suggest fantasy teams of a match with the most projected points.
+
+    Teams spend at most ``CREDIT_BUDGET`` credits, follow position
+    limits, take at most 7 players of one real team and differ from
+    each other by at least ``MIN_DIFFERENT_PLAYERS`` players.
+
+    :param match_id: id of the match.
+    :param count: number of teams.
+    :param offset: number of best teams to skip.
+    :param seed: global seed of the generator.
+    :return: documents in the shape of ``FantasyTeam``, best team first.
+    """
+    pool = player_pool(match_id, seed)
+    solver = _team_solver(match_id, seed, pool.projection_version)
+    return solver.documents(count, offset)
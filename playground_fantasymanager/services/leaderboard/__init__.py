@@ -0,0 +1,7 @@
+"""Leaderboards of fantasy teams."""
+
+from playground_fantasymanager.services.leaderboard.board import Leaderboard
+from playground_fantasymanager.services.leaderboard.live import LiveMatch, LiveMatches
+from playground_fantasymanager.services.leaderboard.snapshot import LiveSnapshots
+
+__all__ = ["Leaderboard", "LiveMatch", "LiveMatches", "LiveSnapshots"]
@@ -0,0 +1,101 @@
+"""Ranked index of fantasy team scores."""
+
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from sortedcontainers import SortedList
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+
+
+class Leaderboard(Generic[KeyT]):
+    """
+    Fantasy teams ordered by score.
+
+    Scores are kept in a sorted list, so changing the score of a team,
+    finding its rank and reading the top of the board take logarithmic
+    time and never re-sort the whole board.
+
+    Teams with equal scores share a rank.
+    """
+
+    def __init__(self) -> None:
+        self._scores: Dict[KeyT, float] = {}
+        self._ranked: SortedList = SortedList()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._scores
+
+    def update(self, key: KeyT, score: float) -> None:
+        """
+        Set score of a team.
+
+        :param key: key identifying the team.
+        :param score: new score of the team.
+        """
+        previous = self._scores.get(key)
+        if previous == score:
+            return
+        if previous is not None:
+            self._ranked.remove((-previous, key))
+        self._scores[key] = score
+        self._ranked.add((-score, key))
+
+    def update_many(self, entries: Iterable[Tuple[KeyT, float]]) -> None:
+        """
+        Set scores of many teams.
+
+        :param entries: keys and new scores of teams.
+        """
+        for key, score in entries:
+            self.update(key, score)
+
+    def remove(self, key: KeyT) -> None:
+        """
+        Remove a team from the board.
+
+        :param key: key identifying the team.
+        """
+        score = self._scores.pop(key, None)
+        if score is not None:
+            self._ranked.remove((-score, key))
+
+    def score(self, key: KeyT) -> Optional[float]:
+        """
+        Get score of a team.
+
+        :param key: key identifying the team.
+        :return: score or None if the team isn't on the board.
+        """
+        return self._scores.get(key)
+
+    def rank(self, key: KeyT) -> Optional[int]:
+        """
+        Get rank of a team.
+
+        :param key: key identifying the team.
+        :return: rank starting from 1 or None if the team isn't on the board.
+        """
+        score = self._scores.get(key)
+        if score is None:
+            return None
+        return self._rank_of(score)
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, KeyT, float]]:
+        """
+        Get the best teams.
+
+        :param limit: number of teams to return.
+        :param offset: number of best teams to skip.
+        :return: rank, key and score of every team.
+        """
+        return [
+            (self._rank_of(-negated), key, -negated)
+            for negated, key in self._ranked.islice(offset, offset + limit)
+        ]
+
+    def _rank_of(self, score: float) -> int:
+        # Number of teams with a strictly greater score.
+        return int(self._ranked.bisect_left((-score,))) + 1
@@ -0,0 +1,13 @@
+from starlette.requests import Request
+
+from playground_fantasymanager.services.leaderboard.live import LiveMatches
+
+
+def get_live_matches(request: Request) -> LiveMatches:  # pragma: no cover
+    """
+    Returns live matches of the application.
+
+    :param request: current request.
+    :return: live matches.
+    """
+    return request.app.state.live_matches
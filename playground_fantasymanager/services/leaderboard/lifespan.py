@@ -0,0 +1,99 @@
+import asyncio
+import contextlib
+
+from fastapi import FastAPI
+
+from playground_fantasymanager.services.leaderboard.live import LiveMatches
+from playground_fantasymanager.services.push import LiveHub
+from playground_fantasymanager.services.store.base import FantasyTeamStore
+from playground_fantasymanager.settings import settings
+
+
+async def save_snapshots(live_matches: LiveMatches) -> None:
+    """
+    Write snapshots of live matches that changed.
+
+    Snapshots are encoded on the event loop, so they see matches
+    between updates, and written to files from a thread.
+
+    :param live_matches: live matches of the worker.
+    """
+    snapshots = live_matches.snapshots
+    if snapshots is None:
+        return
+    for match_id, snapshot in live_matches.dump_changed():
+        await asyncio.to_thread(snapshots.save, match_id, snapshot)
+
+
+async def _save_periodically(live_matches: LiveMatches) -> None:
+    while True:
+        await asyncio.sleep(settings.live_snapshot_seconds)
+        await save_snapshots(live_matches)
+
+
+async def _refresh_periodically(
+    live_matches: LiveMatches,
+    store: FantasyTeamStore,
+    hub: LiveHub,
+) -> None:
+    while True:
+        await asyncio.sleep(settings.live_refresh_seconds)
+        for match_id, changed in await live_matches.refresh(store):
+            hub.publish(match_id, changed)
+
+
+async def init_refresh(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Starts reloading live matches whose fantasy teams changed in the store.
+
+    :param app: current fastapi application.
+    """
+    app.state.live_refresher = asyncio.create_task(
+        _refresh_periodically(
+            app.state.live_matches,
+            app.state.fantasy_team_store,
+            app.state.live_hub,
+        ),
+    )
+
+
+async def shutdown_refresh(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stops reloading live matches.
+
+    :param app: current fastapi application.
+    """
+    refresher = app.state.live_refresher
+    refresher.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await refresher
+
+
+async def init_snapshots(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Restores live matches from snapshots and starts taking snapshots.
+
+    :param app: current fastapi application.
+    """
+    live_matches: LiveMatches = app.state.live_matches
+    app.state.snapshot_writer = None
+    if live_matches.snapshots is not None:
+        live_matches.snapshots.directory.mkdir(parents=True, exist_ok=True)
+        await live_matches.restore_all(app.state.fantasy_team_store)
+        app.state.snapshot_writer = asyncio.create_task(
+            _save_periodically(live_matches),
+        )
+
+
+async def shutdown_snapshots(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stops taking snapshots and writes the last ones.
+
+    :param app: current fastapi application.
+    """
+    writer = app.state.snapshot_writer
+    if writer is not None:
+        writer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await writer
+        await save_snapshots(app.state.live_matches)
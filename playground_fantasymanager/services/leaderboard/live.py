@@ -0,0 +1,398 @@
+"""Live scores and leaderboards of matches."""
+
+import asyncio
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, cast
+
+import numpy as np
+import numpy.typing as npt
+
+from playground_fantasymanager.services.leaderboard.board import Leaderboard
+from playground_fantasymanager.services.leaderboard.snapshot import (
+    LiveSnapshots,
+    dump_snapshot,
+)
+from playground_fantasymanager.services.scoring import MatchScorer
+from playground_fantasymanager.services.shared import SharedMatches, SharedPoints
+from playground_fantasymanager.services.store.base import (
+    FantasyTeamStore,
+    MatchWatermark,
+)
+
+# userId and fantasyTeamId of a fantasy team.
+TeamKey = Tuple[str, str]
+# Changed points of players and all points of a shared table.
+Changes = Tuple[Dict[str, float], npt.NDArray[np.float64]]
+
+
+class LiveMatch:
+    """
+    Scores and leaderboard of all fantasy teams of a match.
+
+    With a shared table, points of players live in the table and the
+    scorer follows it, so events applied by any worker reach
+    leaderboards of every worker.
+    """
+
+    def __init__(
+        self,
+        match_id: str,
+        shared: Optional[SharedPoints] = None,
+        scorer: Optional[MatchScorer] = None,
+    ) -> None:
+        self.match_id = match_id
+        self.shared = shared
+        self.scorer = MatchScorer() if scorer is None else scorer
+        self.leaderboard: Leaderboard[TeamKey] = Leaderboard()
+        # Number of times scores changed, tells when to take a snapshot.
+        self.changes = 0
+        # Watermark of the store the teams were loaded at.
+        self.watermark: MatchWatermark = (0, 0)
+        # Sequence and points of the shared table last followed.
+        self._sequence = -1
+        self._seen: npt.NDArray[np.float64] = np.zeros(0, dtype=np.float64)
+
+    async def load(self, store: FantasyTeamStore, batch_size: int) -> None:
+        """
+        Load all fantasy teams of the match from the store.
+
+        Loaded teams are put on the leaderboard by ``rank_all``.
+
+        :param store: fantasy team store.
+        :param batch_size: number of teams fetched at once.
+        """
+        # Taken first, so changes made during the load change it.
+        self.watermark = await store.match_watermark(self.match_id)
+        async for document in store.iter_match_teams(self.match_id, batch_size):
+            key = (document["userId"], document["fantasyTeamId"])
+            self.scorer.add_document(key, document)
+
+    def rank_all(self) -> None:
+        """Score every team of the scorer and put it on the leaderboard."""
+        if self.shared is not None:
+            self.shared.setdefault(self.scorer.player_points())
+            for player_id, points in self._pull(self.shared).items():
+                self.scorer.set_points(player_id, points)
+        self.leaderboard.update_many(zip(self._keys, self.scorer.totals().tolist()))
+        self.changes += 1
+
+    def update_team(
+        self,
+        key: TeamKey,
+        players: Sequence[Mapping[str, Any]],
+    ) -> List[Tuple[TeamKey, float]]:
+        """
+        Score a new or changed fantasy team and move it on the leaderboard.
+
+        Players keep the points they earned in the match so far.
+
+        :param key: userId and fantasyTeamId of the team.
+        :param players: players of the team.
+        :return: key and new total of the team.
+        """
+        self.scorer.add_document(key, {"players": players})
+        total = self.scorer.team_total(key)
+        self.leaderboard.update(key, total)
+        self.changes += 1
+        return [(key, total)]
+
+    def remove_team(self, key: TeamKey) -> None:
+        """
+        Remove a deleted fantasy team from the scorer and the leaderboard.
+
+        :param key: userId and fantasyTeamId of the team.
+        """
+        if key in self.scorer:
+            self.scorer.remove_team(key)
+            self.leaderboard.remove(key)
+            self.changes += 1
+
+    def apply_points(self, deltas: Mapping[str, float]) -> List[Tuple[TeamKey, float]]:
+        """
+        Apply point deltas of players and rerank affected teams.
+
+        Only teams with one of the players are rescored
+        and moved on the leaderboard.
+
+        :param deltas: points gained or lost by every player.
+        :return: keys and new totals of affected teams.
+        """
+        if self.shared is None:
+            self.scorer.apply_events(deltas)
+            return self._rerank(list(deltas))
+        self.shared.add(deltas)
+        return self.sync()
+
+    def sync(self) -> List[Tuple[TeamKey, float]]:
+        """
+        Follow points of players changed in the shared table.
+
+        Checking an unchanged table only reads its sequence number.
+
+        :return: keys and new totals of affected teams.
+        """
+        if self.shared is None or self.shared.sequence == self._sequence:
+            return []
+        changed = self._pull(self.shared)
+        for player_id, points in changed.items():
+            self.scorer.set_points(player_id, points)
+        return self._rerank(list(changed)) if changed else []
+
+    def _rerank(self, player_ids: List[str]) -> List[Tuple[TeamKey, float]]:
+        rows = np.flatnonzero(self.scorer.teams_with_players(player_ids))
+        totals = self.scorer.totals(rows).tolist()
+        keys = self._keys
+        changed = [(keys[row], total) for row, total in zip(rows.tolist(), totals)]
+        self.leaderboard.update_many(changed)
+        self.changes += 1
+        return changed
+
+    def _pull(self, shared: SharedPoints) -> Dict[str, float]:
+        self._sequence, (changed, self._seen) = shared.read(self._changes)
+        return changed
+
+    def _changes(
+        self,
+        ids: npt.NDArray[np.bytes_],
+        points: npt.NDArray[np.float64],
+    ) -> Changes:
+        # Called with views of the shared table, maybe more than once.
+        known = min(len(self._seen), len(points))
+        rows = np.flatnonzero(points[:known] != self._seen[:known]).tolist()
+        rows += range(known, len(points))
+        changed = {ids[row].decode(): float(points[row]) for row in rows}
+        return changed, points.copy()
+
+    @property
+    def _keys(self) -> Sequence[TeamKey]:
+        return cast(Sequence[TeamKey], self.scorer.team_keys)
+
+
+class LiveMatches:
+    """
+    Live matches of the worker, loaded on first use.
+
+    With snapshots, a match is restored from its snapshot if there is
+    a usable one taken at the current watermark of the store. Otherwise
+    it is loaded from the store, keeping points of players from a
+    snapshot of older teams. Matches without
+    fantasy teams aren't kept. Changes of teams made by this worker
+    are applied as they happen, and ``refresh`` reloads matches whose
+    teams were changed by other workers.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        shared: Optional[SharedMatches] = None,
+        snapshots: Optional[LiveSnapshots] = None,
+    ) -> None:
+        self.batch_size = batch_size
+        self.shared = shared
+        self.snapshots = snapshots
+        self._matches: Dict[str, LiveMatch] = {}
+        self._loading: Dict[str, asyncio.Lock] = {}
+        # Changes of every match when its snapshot was taken.
+        self._snapshot_changes: Dict[str, int] = {}
+
+    async def get(self, match_id: str, store: FantasyTeamStore) -> LiveMatch:
+        """
+        Get live match, loading it on first use.
+
+        :param match_id: id of the match.
+        :param store: fantasy team store.
+        :return: live match.
+        """
+        match = self._matches.get(match_id)
+        if match is not None:
+            return match
+        lock = self._loading.setdefault(match_id, asyncio.Lock())
+        async with lock:
+            match = self._matches.get(match_id)
+            if match is None:
+                try:
+                    match = await self._open(match_id, store)
+                finally:
+                    # Empty matches aren't kept, so every waiter opens them again.
+                    self._loading.pop(match_id, None)
+        return match
+
+    def restore(
+        self,
+        match_id: str,
+        scorer: MatchScorer,
+        watermark: MatchWatermark,
+    ) -> LiveMatch:
+        """
+        Add a live match restored from a snapshot.
+
+        :param match_id: id of the match.
+        :param scorer: scorer of the match from its snapshot.
+        :param watermark: watermark of the store the snapshot was taken at.
+        :return: live match.
+        """
+        match = LiveMatch(match_id, self._shared(match_id), scorer)
+        match.watermark = watermark
+        match.rank_all()
+        self._matches[match_id] = match
+        # The snapshot is up to date until the match changes.
+        self._snapshot_changes[match_id] = match.changes
+        return match
+
+    async def restore_all(self, store: FantasyTeamStore) -> int:
+        """
+        Restore every match with a usable snapshot.
+
+        Matches whose teams changed in the store since their snapshot
+        are left to be loaded on first use.
+
+        :param store: fantasy team store.
+        :return: number of restored matches.
+        """
+        if self.snapshots is None:
+            return 0
+        restored = 0
+        for match_id, scorer, watermark in self.snapshots.load_all():
+            if match_id in self._matches:
+                continue
+            if watermark == await store.match_watermark(match_id):
+                self.restore(match_id, scorer, watermark)
+                restored += 1
+        return restored
+
+    def update_team(
+        self,
+        match_id: str,
+        key: TeamKey,
+        players: Sequence[Mapping[str, Any]],
+    ) -> List[Tuple[TeamKey, float]]:
+        """
+        Score a new or changed fantasy team of a loaded match.
+
+        Matches that aren't loaded get the team when they are.
+
+        :param match_id: id of the match.
+        :param key: userId and fantasyTeamId of the team.
+        :param players: players of the team.
+        :return: key and new total of the team if the match is loaded.
+        """
+        match = self._matches.get(match_id)
+        if match is None:
+            return []
+        return match.update_team(key, players)
+
+    def remove_team(self, match_id: str, key: TeamKey) -> None:
+        """
+        Remove a deleted fantasy team from a loaded match.
+
+        :param match_id: id of the match.
+        :param key: userId and fantasyTeamId of the team.
+        """
+        match = self._matches.get(match_id)
+        if match is not None:
+            match.remove_team(key)
+
+    async def refresh(
+        self,
+        store: FantasyTeamStore,
+    ) -> List[Tuple[str, List[Tuple[TeamKey, float]]]]:
+        """
+        Reload matches whose fantasy teams changed in the store.
+
+        Only the watermark of a match is read when it didn't change.
+        Reloaded matches keep points their players earned, and matches
+        left without teams are dropped.
+
+        :param store: fantasy team store.
+        :return: ids of matches with keys and new totals of changed teams.
+        """
+        refreshed = []
+        for match_id, match in list(self._matches.items()):
+            if await store.match_watermark(match_id) == match.watermark:
+                continue
+            fresh = await self._load(match_id, store, match.scorer)
+            if self._matches.get(match_id) is not match:
+                continue
+            if not len(fresh.scorer):
+                del self._matches[match_id]
+                continue
+            refreshed.append((match_id, self._replace(match, fresh)))
+        return [(match_id, changed) for match_id, changed in refreshed if changed]
+
+    def dump_changed(self) -> List[Tuple[str, bytes]]:
+        """
+        Take snapshots of matches that changed since their last snapshot.
+
+        Matches without teams aren't worth a snapshot.
+
+        :return: ids of matches with their snapshots.
+        """
+        snapshots = []
+        for match_id, match in self._matches.items():
+            unchanged = match.changes == self._snapshot_changes.get(match_id)
+            if unchanged or not len(match.scorer):
+                continue
+            snapshot = dump_snapshot(match_id, match.scorer, match.watermark)
+            snapshots.append((match_id, snapshot))
+            self._snapshot_changes[match_id] = match.changes
+        return snapshots
+
+    def sync(self) -> List[Tuple[str, List[Tuple[TeamKey, float]]]]:
+        """
+        Follow shared tables of all loaded matches.
+
+        :return: ids of matches with keys and new totals of affected teams.
+        """
+        synced = [(match_id, match.sync()) for match_id, match in self._matches.items()]
+        return [(match_id, changed) for match_id, changed in synced if changed]
+
+    async def _open(self, match_id: str, store: FantasyTeamStore) -> LiveMatch:
+        loaded = None if self.snapshots is None else self.snapshots.load(match_id)
+        if loaded is None:
+            match = await self._load(match_id, store)
+        else:
+            _, scorer, watermark = loaded
+            if watermark == await store.match_watermark(match_id):
+                return self.restore(match_id, scorer, watermark)
+            match = await self._load(match_id, store, scorer)
+        if len(match.scorer):
+            self._add(match)
+        return match
+
+    async def _load(
+        self,
+        match_id: str,
+        store: FantasyTeamStore,
+        previous: Optional[MatchScorer] = None,
+    ) -> LiveMatch:
+        # Teams come from the store and players keep points
+        # of the scorer the match replaces, including points
+        # applied while the teams were loading.
+        match = LiveMatch(match_id)
+        await match.load(store, self.batch_size)
+        if previous is not None:
+            for player_id, points in previous.player_points().items():
+                match.scorer.set_points(player_id, points)
+        return match
+
+    def _add(self, match: LiveMatch) -> None:
+        match.shared = self._shared(match.match_id)
+        match.rank_all()
+        self._matches[match.match_id] = match
+
+    def _replace(
+        self,
+        match: LiveMatch,
+        fresh: LiveMatch,
+    ) -> List[Tuple[TeamKey, float]]:
+        self._add(fresh)
+        fresh.changes = match.changes + 1
+        keys = cast(Sequence[TeamKey], fresh.scorer.team_keys)
+        totals = fresh.scorer.totals().tolist()
+        return [
+            (key, total)
+            for key, total in zip(keys, totals)
+            if match.leaderboard.score(key) != total
+        ]
+
+    def _shared(self, match_id: str) -> Optional[SharedPoints]:
+        return None if self.shared is None else self.shared.get(match_id)
@@ -0,0 +1,207 @@
+"""Snapshots of live matches in a binary format loaded with mmap."""
+
+import hashlib
+import logging
+import mmap
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Tuple, cast
+
+import numpy as np
+import orjson
+
+from playground_fantasymanager.services.scoring import MatchScorer
+from playground_fantasymanager.services.store.base import TEAM_SIZE, MatchWatermark
+
+logger = logging.getLogger(__name__)
+
+# userId and fantasyTeamId of a fantasy team.
+TeamKey = Tuple[str, str]
+# Id of a match, its scorer and the watermark of the store it follows.
+Snapshot = Tuple[str, MatchScorer, MatchWatermark]
+
+MAGIC = b"PFMSNAP"
+# Version of the layout, snapshots of other versions are ignored.
+FORMAT_VERSION = 2
+HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("teams", "<u4"),
+        ("players", "<u4"),
+        ("checksum", "<u4"),
+        ("created", "<f8"),
+        ("store_teams", "<u8"),
+        ("store_versions", "<u8"),
+    ],
+)
+SUFFIX = ".snapshot"
+
+
+def dump_snapshot(
+    match_id: str,
+    scorer: MatchScorer,
+    watermark: MatchWatermark,
+) -> bytes:
+    """
+    Encode a snapshot of the scorer of a match.
+
+    After the header come rows of player indices of every team,
+    their multipliers and points of players, laid out so they can be
+    mapped as arrays, followed by JSON with the match id, ids of users
+    and fantasy teams of every row and player ids. The header has
+    a CRC32 of everything after it and the watermark of the store
+    the teams were loaded at.
+
+    :param match_id: id of the match.
+    :param scorer: scorer of the match.
+    :param watermark: watermark of the store the teams were loaded at.
+    :return: snapshot.
+    """
+    team_keys, players, multipliers, player_ids, points = scorer.state()
+    # Flat lists of ids decode faster than a list of pairs.
+    user_ids = [user_id for user_id, _ in cast(Sequence[TeamKey], team_keys)]
+    team_ids = [team_id for _, team_id in cast(Sequence[TeamKey], team_keys)]
+    meta = orjson.dumps(
+        {
+            "matchId": match_id,
+            "userIds": user_ids,
+            "fantasyTeamIds": team_ids,
+            "playerIds": player_ids,
+        },
+    )
+    body = b"".join(
+        [
+            players.astype("<i4", copy=False).tobytes(),
+            multipliers.astype("<f4", copy=False).tobytes(),
+            points.astype("<f8", copy=False).tobytes(),
+            meta,
+        ],
+    )
+    header = np.zeros(1, HEADER)
+    header["magic"] = MAGIC
+    header["version"] = FORMAT_VERSION
+    header["teams"] = len(team_keys)
+    header["players"] = len(player_ids)
+    header["checksum"] = zlib.crc32(body)
+    header["created"] = time.time()
+    header["store_teams"], header["store_versions"] = watermark
+    return header.tobytes() + body
+
+
+def load_snapshot(path: Path, max_age: float) -> Snapshot:
+    """
+    Map a snapshot and build the scorer it describes.
+
+    The file is mapped copy-on-write, so arrays of the scorer are
+    read from the page cache and only pages the scorer changes are
+    copied into the worker.
+
+    :param path: path of the snapshot.
+    :param max_age: seconds after which a snapshot is too old to use.
+    :return: id of the match, its scorer and the watermark of the store.
+    :raises ValueError: if the snapshot is too old, corrupt or of another format.
+    """
+    with path.open("rb") as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    if len(data) < HEADER.itemsize:
+        raise ValueError("Snapshot is truncated")
+    header = np.frombuffer(data, HEADER, count=1)[0]
+    if header["magic"] != MAGIC or header["version"] != FORMAT_VERSION:
+        raise ValueError("Snapshot has an unknown format")
+    if time.time() - float(header["created"]) > max_age:
+        raise ValueError("Snapshot is too old")
+    if zlib.crc32(memoryview(data)[HEADER.itemsize :]) != header["checksum"]:
+        raise ValueError("Snapshot checksum doesn't match")
+
+    teams = int(header["teams"])
+    offset = HEADER.itemsize
+    players = np.frombuffer(data, "<i4", teams * TEAM_SIZE, offset)
+    offset += players.nbytes
+    multipliers = np.frombuffer(data, "<f4", teams * TEAM_SIZE, offset)
+    offset += multipliers.nbytes
+    points = np.frombuffer(data, "<f8", int(header["players"]), offset)
+    meta = orjson.loads(memoryview(data)[offset + points.nbytes :])
+    team_keys = list(zip(meta["userIds"], meta["fantasyTeamIds"]))
+    if len(team_keys) != teams or len(meta["playerIds"]) != len(points):
+        raise ValueError("Snapshot sections don't match its header")
+    scorer = MatchScorer(capacity=0)
+    scorer.load_state(
+        (
+            team_keys,
+            players.reshape(teams, TEAM_SIZE),
+            multipliers.reshape(teams, TEAM_SIZE),
+            meta["playerIds"],
+            points,
+        ),
+    )
+    watermark = (int(header["store_teams"]), int(header["store_versions"]))
+    return cast(str, meta["matchId"]), scorer, watermark
+
+
+class LiveSnapshots:
+    """Snapshots of live matches in a directory, one file per match."""
+
+    def __init__(self, directory: Path, max_age: float) -> None:
+        self.directory = directory
+        self.max_age = max_age
+
+    def path(self, match_id: str) -> Path:
+        """
+        Get path of the snapshot of a match.
+
+        :param match_id: id of the match.
+        :return: path of the snapshot.
+        """
+        # Match ids come from URLs, so they aren't used as file names.
+        name = hashlib.blake2b(match_id.encode(), digest_size=16).hexdigest()
+        return self.directory / f"{name}{SUFFIX}"
+
+    def load(self, match_id: str) -> Optional[Snapshot]:
+        """
+        Load the snapshot of a match.
+
+        :param match_id: id of the match.
+        :return: id of the match, its scorer and the watermark of the store,
+            or None if there is no usable snapshot.
+        """
+        loaded = self._load(self.path(match_id))
+        if loaded is None or loaded[0] != match_id:
+            return None
+        return loaded
+
+    def load_all(self) -> Iterator[Snapshot]:
+        """
+        Load snapshots of all matches.
+
+        :yield: ids of matches with their scorers and watermarks of the store.
+        """
+        for path in sorted(self.directory.glob(f"*{SUFFIX}")):
+            loaded = self._load(path)
+            if loaded is not None:
+                yield loaded
+
+    def save(self, match_id: str, snapshot: bytes) -> None:
+        """
+        Write the snapshot of a match.
+
+        :param match_id: id of the match.
+        :param snapshot: result of ``dump_snapshot``.
+        """
+        path = self.path(match_id)
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_bytes(snapshot)
+        # Readers see either the previous or the new snapshot.
+        temporary.replace(path)
+
+    def _load(self, path: Path) -> Optional[Snapshot]:
+        try:
+            return load_snapshot(path, self.max_age)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            # The match is loaded from the store instead.
+            logger.warning("Snapshot %s is not used: %s", path, exc)
+            return None
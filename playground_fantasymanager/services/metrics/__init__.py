@@ -0,0 +1,6 @@
+"""Request metrics exposed to Prometheus."""
+
+from playground_fantasymanager.services.metrics.middleware import MetricsMiddleware
+from playground_fantasymanager.services.metrics.registry import MetricsRegistry
+
+__all__ = ["MetricsMiddleware", "MetricsRegistry"]
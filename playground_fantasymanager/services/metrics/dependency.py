@@ -0,0 +1,13 @@
+from starlette.requests import Request
+
+from playground_fantasymanager.services.metrics.registry import MetricsRegistry
+
+
+def get_metrics(request: Request) -> MetricsRegistry:  # pragma: no cover
+    """
+    Returns request metrics of the worker.
+
+    :param request: current request.
+    :return: metrics registry.
+    """
+    return request.app.state.metrics
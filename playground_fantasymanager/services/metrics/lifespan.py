@@ -0,0 +1,45 @@
+import asyncio
+import contextlib
+
+from fastapi import FastAPI
+
+from playground_fantasymanager.services.metrics.registry import MetricsRegistry
+from playground_fantasymanager.settings import settings
+
+
+async def _flush_periodically(registry: MetricsRegistry) -> None:
+    while True:
+        await asyncio.sleep(settings.metrics_flush_seconds)
+        registry.flush()
+
+
+async def init_metrics(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Starts sharing metrics of the worker with other workers.
+
+    :param app: current fastapi application.
+    """
+    registry: MetricsRegistry = app.state.metrics
+    app.state.metrics_flusher = None
+    if registry.directory is not None:
+        registry.directory.mkdir(parents=True, exist_ok=True)
+        app.state.metrics_flusher = asyncio.create_task(
+            _flush_periodically(registry),
+        )
+
+
+async def shutdown_metrics(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stops sharing metrics and writes the last snapshot.
+
+    Counters of a stopped worker stay in its file,
+    so totals of all workers never go down.
+
+    :param app: current fastapi application.
+    """
+    flusher = app.state.metrics_flusher
+    if flusher is not None:
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+        app.state.metrics.flush()
@@ -0,0 +1,62 @@
+"""ASGI middleware recording request metrics."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from playground_fantasymanager.services.metrics.registry import MetricsRegistry
+
+# Route label of requests that didn't match any route.
+UNMATCHED_ROUTE = "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Records duration, status and size of every HTTP request.
+
+    It is a plain ASGI middleware, so responses are streamed through
+    without extra tasks or buffering. Requests are labeled with
+    the path template of the matched route, not the raw path.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request and record its metrics.
+
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        self.registry.request_started()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router sets the matched route on the scope it shares with us.
+            route = scope.get("route")
+            self.registry.request_finished(
+                scope["method"],
+                getattr(route, "path_format", None) or UNMATCHED_ROUTE,
+                status,
+                time.perf_counter() - started,
+                size,
+            )
@@ -0,0 +1,261 @@
+"""Request metrics of a worker and their Prometheus exposition."""
+
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+
+# Upper bounds of request duration buckets in seconds.
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Upper bounds of response size buckets in bytes.
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+RouteKey = Tuple[str, str]
+# Counts of every bucket, the +Inf bucket last, followed by the sum.
+HistogramValue = List[float]
+
+
+class Histogram:
+    """Histogram with a series for every route."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.series: Dict[RouteKey, HistogramValue] = {}
+
+    def observe(self, key: RouteKey, value: float) -> None:
+        """
+        Record a value.
+
+        :param key: method and route.
+        :param value: observed value.
+        """
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0.0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def merge(self, series: Iterable[Tuple[RouteKey, HistogramValue]]) -> None:
+        """
+        Add series of another worker.
+
+        :param series: route keys with bucket counts and sums.
+        """
+        for key, values in series:
+            current = self.series.setdefault(key, [0.0] * len(values))
+            for i, value in enumerate(values):
+                current[i] += value
+
+
+class MetricsRegistry:
+    """
+    Metrics of requests served by a worker.
+
+    Updates are plain increments on the event loop thread, so
+    recording takes no locks. Workers share metrics by writing
+    snapshots to their own file in ``directory``, and a scrape
+    sums the snapshots of every worker with its own live metrics.
+    Counters of workers that stopped keep being summed, but their
+    requests aren't in flight anymore.
+    """
+
+    def __init__(self, directory: Optional[Path] = None) -> None:
+        self.directory = directory
+        self.requests: Dict[Tuple[str, str, int], float] = {}
+        self.exceptions: Dict[str, float] = {}
+        self.in_flight = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.sizes = Histogram(SIZE_BUCKETS)
+
+    def request_started(self) -> None:
+        """Count a request that started."""
+        self.in_flight += 1
+
+    def request_finished(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        size: int,
+    ) -> None:
+        """
+        Record a request that finished.
+
+        :param method: HTTP method.
+        :param route: path template of the route.
+        :param status: response status code.
+        :param seconds: time spent on the request.
+        :param size: bytes of the response body.
+        """
+        self.in_flight -= 1
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.latency.observe((method, route), seconds)
+        self.sizes.observe((method, route), size)
+
+    def exception_raised(self, code: str) -> None:
+        """
+        Count an exception answered with an error response.
+
+        :param code: code of the error.
+        """
+        self.exceptions[code] = self.exceptions.get(code, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get metrics in a JSON-serializable form.
+
+        :return: snapshot of the metrics.
+        """
+        return {
+            "requests": [[*key, value] for key, value in self.requests.items()],
+            "exceptions": list(self.exceptions.items()),
+            "in_flight": self.in_flight,
+            "latency": [[*key, values] for key, values in self.latency.series.items()],
+            "sizes": [[*key, values] for key, values in self.sizes.series.items()],
+        }
+
+    def flush(self) -> None:
+        """Write the snapshot of this worker to its file."""
+        if self.directory is None:
+            return
+        path = _worker_file(self.directory, os.getpid())
+        temporary = path.with_suffix(".tmp")
+        temporary.write_bytes(orjson.dumps(self.snapshot()))
+        # Readers see either the previous or the new snapshot.
+        temporary.replace(path)
+
+    def collect(self) -> "MetricsRegistry":
+        """
+        Sum metrics of every worker.
+
+        :return: registry with metrics of all workers.
+        """
+        total = MetricsRegistry()
+        total.merge(self.snapshot())
+        if self.directory is not None:
+            own = _worker_file(self.directory, os.getpid())
+            for path in self.directory.glob("*.json"):
+                if path == own:
+                    continue
+                try:
+                    snapshot = orjson.loads(path.read_bytes())
+                    if not _is_running(int(path.stem)):
+                        snapshot["in_flight"] = 0
+                except (OSError, ValueError):
+                    continue
+                total.merge(snapshot)
+        return total
+
+    def merge(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Add a snapshot to the metrics.
+
+        :param snapshot: result of ``snapshot``.
+        """
+        for method, route, status, value in snapshot["requests"]:
+            key = (method, route, status)
+            self.requests[key] = self.requests.get(key, 0) + value
+        for code, value in snapshot["exceptions"]:
+            self.exceptions[code] = self.exceptions.get(code, 0) + value
+        self.in_flight += snapshot["in_flight"]
+        self.latency.merge(
+            ((method, route), values) for method, route, values in snapshot["latency"]
+        )
+        self.sizes.merge(
+            ((method, route), values) for method, route, values in snapshot["sizes"]
+        )
+
+    def render(self) -> str:
+        """
+        Render metrics in the Prometheus text format.
+
+        :return: exposition of the metrics.
+        """
+        lines = [
+            "# HELP http_requests_total Requests by method, route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), value in sorted(self.requests.items()):
+            labels = _labels(method=method, route=route, status=str(status))
+            lines.append(f"http_requests_total{labels} {_number(value)}")
+        lines += [
+            "# HELP http_requests_in_flight Requests being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP app_exceptions_total Error responses by error code.",
+            "# TYPE app_exceptions_total counter",
+        ]
+        for code, value in sorted(self.exceptions.items()):
+            lines.append(f"app_exceptions_total{_labels(code=code)} {_number(value)}")
+        lines += _render_histogram(
+            "http_request_duration_seconds",
+            "Request duration by method and route.",
+            self.latency,
+        )
+        lines += _render_histogram(
+            "http_response_size_bytes",
+            "Response body size by method and route.",
+            self.sizes,
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _worker_file(directory: Path, pid: int) -> Path:
+    return directory / f"{pid}.json"
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user.
+        return True
+    return True
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _render_histogram(name: str, description: str, histogram: Histogram) -> List[str]:
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for (method, route), values in sorted(histogram.series.items()):
+        cumulative = 0.0
+        bounds = [_number(bound) for bound in histogram.buckets] + ["+Inf"]
+        for bound, count in zip(bounds, values[:-1], strict=True):
+            cumulative += count
+            labels = _labels(method=method, route=route, le=bound)
+            lines.append(f"{name}_bucket{labels} {_number(cumulative)}")
+        labels = _labels(method=method, route=route)
+        lines.append(f"{name}_sum{labels} {_number(values[-1])}")
+        lines.append(f"{name}_count{labels} {_number(cumulative)}")
+    return lines
@@ -0,0 +1,8 @@
+"""Opt-in sampling profiler of a worker."""
+
+from playground_fantasymanager.services.profiling.middleware import (
+    ProfilingMiddleware,
+)
+from playground_fantasymanager.services.profiling.sampler import Profiler, StackProfile
+
+__all__ = ["Profiler", "ProfilingMiddleware", "StackProfile"]
@@ -0,0 +1,34 @@
+import secrets
+from typing import Optional
+
+from fastapi import Header
+from starlette.requests import Request
+
+from playground_fantasymanager.exceptions.base import (
+    AuthenticationError,
+    NotFoundError,
+)
+from playground_fantasymanager.services.profiling.sampler import Profiler
+from playground_fantasymanager.settings import settings
+
+
+def get_profiler(
+    request: Request,
+    profiler_token: Optional[str] = Header(None, alias="X-Profiler-Token"),
+) -> Profiler:
+    """
+    Returns the profiler of the worker to its admin routes.
+
+    :param request: current request.
+    :param profiler_token: token of the caller.
+    :raises NotFoundError: if profiling is disabled.
+    :raises AuthenticationError: if the token is wrong.
+    :return: profiler.
+    """
+    profiler: Optional[Profiler] = getattr(request.app.state, "profiler", None)
+    if profiler is None:
+        raise NotFoundError("Profiling is disabled")
+    token = settings.profiling_token
+    if token is not None and not secrets.compare_digest(profiler_token or "", token):
+        raise AuthenticationError
+    return profiler
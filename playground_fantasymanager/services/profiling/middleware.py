@@ -0,0 +1,64 @@
+"""ASGI middleware profiling requests that ask for it."""
+
+import secrets
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from playground_fantasymanager.services.profiling.sampler import Profiler
+
+# Response header with the id of the request profile.
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that carry the debug header.
+
+    The id of the profile is sent in the ``X-Profile-Id`` response
+    header, and collapsed stacks are served by the profiler routes.
+    When a token is configured, the header must carry it.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        profiler: Profiler,
+        header: str,
+        token: Optional[str] = None,
+    ) -> None:
+        self.app = app
+        self.profiler = profiler
+        self.header = header
+        self.token = token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Serve a request, profiling it if asked to.
+
+        :param scope: ASGI connection scope.
+        :param receive: ASGI receive channel.
+        :param send: ASGI send channel.
+        """
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.profiler.start_request()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profiler.stop_request(profile_id)
+
+    def _wants_profile(self, scope: Scope) -> bool:
+        value = Headers(scope=scope).get(self.header)
+        if value is None:
+            return False
+        return self.token is None or secrets.compare_digest(value, self.token)
@@ -0,0 +1,169 @@
+"""Stack sampling profiler of a worker."""
+
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Set
+
+
+class StackProfile:
+    """Stacks sampled while a profile was active."""
+
+    def __init__(self) -> None:
+        self.samples = 0
+        self.stacks: "Counter[str]" = Counter()
+
+    def add(self, stacks: List[str]) -> None:
+        """
+        Record stacks of one sample.
+
+        :param stacks: collapsed stack of every sampled thread.
+        """
+        self.samples += 1
+        self.stacks.update(stacks)
+
+    def collapsed(self) -> str:
+        """
+        Render stacks in the collapsed format read by flamegraph tools.
+
+        :return: one ``frame;frame;frame count`` line per distinct stack.
+        """
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.stacks.items())
+        )
+
+
+class Profiler:
+    """
+    Samples stacks of every thread of the worker.
+
+    A daemon thread reads ``sys._current_frames`` every interval
+    while at least one profile is active, so nothing runs when
+    profiling is idle. Each sample is added to every active profile,
+    and thread names are the roots of collapsed stacks.
+
+    Profiles of single requests are kept by id, oldest dropped first.
+    A request profile includes whatever else the worker did meanwhile.
+    """
+
+    def __init__(self, interval: float, max_requests: int) -> None:
+        self.interval = interval
+        self.max_requests = max_requests
+        self.profile: Optional[StackProfile] = None
+        self.requests: "OrderedDict[str, StackProfile]" = OrderedDict()
+        self._active: Set[StackProfile] = set()
+        self._lock = threading.Lock()
+        # Stop event of the running sampling thread, each thread has its own.
+        self._stop: Optional[threading.Event] = None
+        self._labels: Dict[CodeType, str] = {}
+
+    def start(self) -> StackProfile:
+        """
+        Start the profile of the whole worker.
+
+        :return: the started profile.
+        """
+        self.profile = StackProfile()
+        self.activate(self.profile)
+        return self.profile
+
+    def stop(self) -> Optional[StackProfile]:
+        """
+        Stop the profile of the whole worker.
+
+        :return: the stopped profile or None if it wasn't started.
+        """
+        profile, self.profile = self.profile, None
+        if profile is not None:
+            self.deactivate(profile)
+        return profile
+
+    def start_request(self) -> str:
+        """
+        Start the profile of a request.
+
+        :return: id of the profile.
+        """
+        profile_id = uuid.uuid4().hex
+        profile = StackProfile()
+        self.requests[profile_id] = profile
+        while len(self.requests) > self.max_requests:
+            self.requests.popitem(last=False)
+        self.activate(profile)
+        return profile_id
+
+    def stop_request(self, profile_id: str) -> None:
+        """
+        Stop the profile of a request.
+
+        :param profile_id: result of ``start_request``.
+        """
+        profile = self.requests.get(profile_id)
+        if profile is not None:
+            self.deactivate(profile)
+
+    def activate(self, profile: StackProfile) -> None:
+        """
+        Add samples to a profile, starting sampling if needed.
+
+        :param profile: profile to fill.
+        """
+        with self._lock:
+            self._active.add(profile)
+            if self._stop is None:
+                self._stop = threading.Event()
+                threading.Thread(
+                    target=self._run,
+                    args=(self._stop,),
+                    name="stack-sampler",
+                    daemon=True,
+                ).start()
+
+    def deactivate(self, profile: StackProfile) -> None:
+        """
+        Stop adding samples to a profile, stopping sampling if none is left.
+
+        :param profile: profile to stop.
+        """
+        with self._lock:
+            self._active.discard(profile)
+            if not self._active and self._stop is not None:
+                self._stop.set()
+                self._stop = None
+
+    def sample(self) -> List[str]:
+        """
+        Take collapsed stacks of all threads except the calling one.
+
+        :return: collapsed stack of every thread.
+        """
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        return [
+            self._collapse(names.get(ident, str(ident)), frame)
+            for ident, frame in sys._current_frames().items()  # noqa: SLF001
+            if ident != own
+        ]
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            stacks = self.sample()
+            with self._lock:
+                for profile in self._active:
+                    profile.add(stacks)
+
+    def _collapse(self, thread_name: str, frame: Optional[FrameType]) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+                # Semicolons separate frames of collapsed stacks.
+                label = self._labels[code] = label.replace(";", ":")
+            labels.append(label)
+            frame = frame.f_back
+        labels.append(thread_name)
+        return ";".join(reversed(labels))
@@ -0,0 +1,5 @@
+"""Push of live updates to clients."""
+
+from playground_fantasymanager.services.push.hub import LiveHub, Subscription
+
+__all__ = ["LiveHub", "Subscription"]
@@ -0,0 +1,13 @@
+from starlette.requests import Request
+
+from playground_fantasymanager.services.push.hub import LiveHub
+
+
+def get_live_hub(request: Request) -> LiveHub:  # pragma: no cover
+    """
+    Returns live updates hub of the application.
+
+    :param request: current request.
+    :return: live updates hub.
+    """
+    return request.app.state.live_hub
@@ -0,0 +1,193 @@
+"""In-process fan-out of live fantasy team points."""
+
+import asyncio
+from collections import defaultdict
+from typing import (
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+)
+
+TeamKey = Hashable
+
+
+class Subscription:
+    """
+    Points updates waiting to be sent to one client.
+
+    Only the latest total of every team is kept, so a client that
+    reads less often than updates arrive gets coalesced updates
+    instead of a growing backlog.
+    """
+
+    def __init__(
+        self,
+        match_id: str,
+        team_keys: Optional[FrozenSet[TeamKey]],
+        max_lag: int,
+    ) -> None:
+        self.match_id = match_id
+        self.team_keys = team_keys
+        self.max_lag = max_lag
+        self.closed = False
+        self._pending: Dict[TeamKey, float] = {}
+        self._lag = 0
+        self._ready = asyncio.Event()
+
+    async def next_batch(self) -> Dict[TeamKey, float]:
+        """
+        Wait for updates.
+
+        :return: latest totals of teams changed since the previous batch,
+            empty if the subscription was closed.
+        """
+        await self._ready.wait()
+        self._ready.clear()
+        batch, self._pending = self._pending, {}
+        self._lag = 0
+        return batch
+
+    def close(self) -> None:
+        """Stop the subscription and wake up its reader."""
+        self.closed = True
+        self._pending = {}
+        self._ready.set()
+
+    def offer(self, key: TeamKey, total: float) -> None:
+        """
+        Queue the latest total of a team.
+
+        :param key: key identifying the team.
+        :param total: new total of the team.
+        """
+        self._pending[key] = total
+
+    def offer_many(self, totals: Dict[TeamKey, float]) -> None:
+        """
+        Queue the latest totals of many teams.
+
+        :param totals: new totals by team key.
+        """
+        self._pending.update(totals)
+
+    def notify(self) -> bool:
+        """
+        Wake up the reader after updates were offered.
+
+        :return: False if the reader missed too many publishes
+            and should be dropped.
+        """
+        if self._ready.is_set():
+            self._lag += 1
+            if self._lag > self.max_lag:
+                return False
+        self._ready.set()
+        return True
+
+
+class LiveHub:
+    """
+    Publishes fantasy team totals to subscribed clients.
+
+    Subscriptions are indexed by the teams they watch, so a publish
+    touches only clients interested in the changed teams and takes
+    one pass over the changes, whatever the number of clients.
+    """
+
+    def __init__(self, max_lag: int) -> None:
+        self.max_lag = max_lag
+        self.dropped = 0
+        self._by_team: Dict[str, Dict[TeamKey, Set[Subscription]]] = defaultdict(
+            lambda: defaultdict(set),
+        )
+        self._by_match: Dict[str, Set[Subscription]] = defaultdict(set)
+
+    def subscribe(
+        self,
+        match_id: str,
+        team_keys: Optional[Iterable[TeamKey]] = None,
+    ) -> Subscription:
+        """
+        Subscribe to totals of teams of a match.
+
+        :param match_id: id of the match.
+        :param team_keys: teams to watch or None for every team of the match.
+        :return: new subscription.
+        """
+        keys = None if team_keys is None else frozenset(team_keys)
+        subscription = Subscription(match_id, keys, self.max_lag)
+        if keys is None:
+            self._by_match[match_id].add(subscription)
+        else:
+            for key in keys:
+                self._by_team[match_id][key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscription.
+
+        :param subscription: subscription returned by ``subscribe``.
+        """
+        match_id = subscription.match_id
+        if subscription.team_keys is None:
+            self._by_match[match_id].discard(subscription)
+            if not self._by_match[match_id]:
+                del self._by_match[match_id]
+            return
+        teams = self._by_team[match_id]
+        for key in subscription.team_keys:
+            teams[key].discard(subscription)
+            if not teams[key]:
+                del teams[key]
+        if not teams:
+            del self._by_team[match_id]
+
+    def publish(self, match_id: str, totals: Iterable[Tuple[TeamKey, float]]) -> None:
+        """
+        Send new totals of teams to their subscribers.
+
+        :param match_id: id of the match.
+        :param totals: keys and new totals of changed teams.
+        """
+        watchers = self._by_match.get(match_id, set())
+        teams = self._by_team.get(match_id, {})
+        if not watchers and not teams:
+            return
+        batch = dict(totals)
+        if not batch:
+            return
+        touched: Set[Subscription] = set(watchers)
+        for subscription in watchers:
+            subscription.offer_many(batch)
+        # Walk whichever side is smaller: changed teams or watched teams.
+        keys = batch.keys() & teams.keys() if len(teams) < len(batch) else batch
+        for key in keys:
+            for subscription in teams.get(key, ()):
+                subscription.offer(key, batch[key])
+                touched.add(subscription)
+        for subscription in touched:
+            if not subscription.notify():
+                self.dropped += 1
+                self.unsubscribe(subscription)
+                subscription.close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get hub counters.
+
+        :return: counters by name.
+        """
+        subscriptions = {
+            subscription
+            for teams in self._by_team.values()
+            for subscribers in teams.values()
+            for subscription in subscribers
+        }
+        for watchers in self._by_match.values():
+            subscriptions.update(watchers)
+        return {"subscriptions": len(subscriptions), "dropped": self.dropped}
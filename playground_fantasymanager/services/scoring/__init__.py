@@ -0,0 +1,5 @@
+"""Live scoring of fantasy teams."""
+
+from playground_fantasymanager.services.scoring.engine import MatchScorer
+
+__all__ = ["MatchScorer"]
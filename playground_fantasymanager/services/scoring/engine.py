@@ -0,0 +1,300 @@
+"""Vectorized scoring of fantasy teams."""
+
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from playground_fantasymanager.services.store.base import TEAM_SIZE
+
+CAPTAIN_MULTIPLIER = 2.0
+VICE_CAPTAIN_MULTIPLIER = 1.5
+
+# Team keys, player rows, multipliers, player ids and points of a scorer.
+ScorerState = Tuple[
+    Sequence[Hashable],
+    npt.NDArray[np.int32],
+    npt.NDArray[np.float32],
+    Sequence[str],
+    npt.NDArray[np.float64],
+]
+
+
+class MatchScorer:
+    """
+    Scores every fantasy team of a match at once.
+
+    Points of players live in one array, and each fantasy team is a row
+    of player indices with a row of multipliers for captain and vice
+    captain. Totals of all teams are then a single gather, multiply
+    and sum over the arrays instead of a loop over teams.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._player_index: Dict[str, int] = {}
+        self._points: npt.NDArray[np.float64] = np.zeros(64, dtype=np.float64)
+        self._players: npt.NDArray[np.int32] = np.zeros(
+            (capacity, TEAM_SIZE),
+            dtype=np.int32,
+        )
+        self._multipliers: npt.NDArray[np.float32] = np.ones(
+            (capacity, TEAM_SIZE),
+            dtype=np.float32,
+        )
+        self._team_index: Dict[Hashable, int] = {}
+        self._team_keys: List[Hashable] = []
+
+    def __len__(self) -> int:
+        return len(self._team_keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._team_index
+
+    def load_state(self, state: ScorerState) -> None:
+        """
+        Replace all teams and players with those of another scorer.
+
+        Arrays are used as they are, so they may be views
+        of a mapped file.
+
+        :param state: result of ``state``.
+        """
+        team_keys, players, multipliers, player_ids, points = state
+        self._players = players
+        self._multipliers = multipliers
+        self._points = points
+        self._team_keys = list(team_keys)
+        self._team_index = dict(zip(self._team_keys, range(len(team_keys))))
+        self._player_index = dict(zip(player_ids, range(len(player_ids))))
+
+    def state(self) -> ScorerState:
+        """
+        Get arrays of teams and players.
+
+        :return: views of the arrays trimmed to the known teams and players.
+        """
+        size = len(self._team_keys)
+        return (
+            self._team_keys,
+            self._players[:size],
+            self._multipliers[:size],
+            list(self._player_index),
+            self._points[: len(self._player_index)],
+        )
+
+    @property
+    def team_keys(self) -> Sequence[Hashable]:
+        """
+        Keys of teams in the order of ``totals``.
+
+        :return: team keys.
+        """
+        return self._team_keys
+
+    def player_index(self, player_id: str) -> int:
+        """
+        Get index of a player, registering new players.
+
+        :param player_id: id of the player.
+        :return: index of the player in the points array.
+        """
+        index = self._player_index.get(player_id)
+        if index is None:
+            index = len(self._player_index)
+            if index == len(self._points):
+                self._points = np.concatenate(
+                    [self._points, np.zeros(max(index, 64), dtype=np.float64)],
+                )
+            self._player_index[player_id] = index
+        return index
+
+    def add_team(
+        self,
+        key: Hashable,
+        player_ids: Sequence[str],
+        captain_id: Optional[str] = None,
+        vice_captain_id: Optional[str] = None,
+    ) -> None:
+        """
+        Add a fantasy team or replace it if the key is known.
+
+        :param key: key identifying the team.
+        :param player_ids: ids of the 11 players of the team.
+        :param captain_id: id of the captain.
+        :param vice_captain_id: id of the vice captain.
+        :raises ValueError: if the team doesn't have 11 players.
+        """
+        if len(player_ids) != TEAM_SIZE:
+            raise ValueError(f"Fantasy team must have {TEAM_SIZE} players")
+        row = self._team_index.get(key)
+        if row is None:
+            row = len(self._team_keys)
+            if row == len(self._players):
+                self._grow()
+            self._team_index[key] = row
+            self._team_keys.append(key)
+        self._players[row] = [self.player_index(player_id) for player_id in player_ids]
+        self._multipliers[row] = [
+            (
+                CAPTAIN_MULTIPLIER
+                if player_id == captain_id
+                else VICE_CAPTAIN_MULTIPLIER if player_id == vice_captain_id else 1.0
+            )
+            for player_id in player_ids
+        ]
+
+    def load_teams(
+        self,
+        keys: Sequence[Hashable],
+        players: npt.NDArray[np.integer[Any]],
+        captain_slots: npt.NDArray[np.integer[Any]],
+        vice_captain_slots: npt.NDArray[np.integer[Any]],
+    ) -> None:
+        """
+        Add many new fantasy teams at once.
+
+        :param keys: keys identifying the teams.
+        :param players: indices of players of every team, one row per team.
+        :param captain_slots: position of the captain in every row.
+        :param vice_captain_slots: position of the vice captain in every row.
+        :raises ValueError: if a team is already known.
+        """
+        if any(key in self._team_index for key in keys):
+            raise ValueError("Fantasy team is already scored")
+        start = len(self._team_keys)
+        end = start + len(keys)
+        while end > len(self._players):
+            self._grow()
+        rows = np.arange(len(keys))
+        multipliers = np.ones((len(keys), TEAM_SIZE), dtype=np.float32)
+        multipliers[rows, captain_slots] = CAPTAIN_MULTIPLIER
+        multipliers[rows, vice_captain_slots] = VICE_CAPTAIN_MULTIPLIER
+        self._players[start:end] = players
+        self._multipliers[start:end] = multipliers
+        self._team_index.update(zip(keys, range(start, end)))
+        self._team_keys.extend(keys)
+
+    def add_document(self, key: Hashable, document: Mapping[str, Any]) -> None:
+        """
+        Add a fantasy team from a stored document.
+
+        :param key: key identifying the team.
+        :param document: fantasy team document.
+        """
+        players = document["players"]
+        captain = next((p["player_id"] for p in players if p["is_captain"]), None)
+        vice_captain = next(
+            (p["player_id"] for p in players if p["is_vice_captain"]),
+            None,
+        )
+        self.add_team(
+            key,
+            [player["player_id"] for player in players],
+            captain,
+            vice_captain,
+        )
+        for player in players:
+            if player.get("points_earned") is not None:
+                self.set_points(player["player_id"], player["points_earned"])
+
+    def remove_team(self, key: Hashable) -> None:
+        """
+        Remove a fantasy team.
+
+        The last team takes the place of the removed one,
+        so arrays stay dense.
+
+        :param key: key identifying the team.
+        """
+        row = self._team_index.pop(key)
+        last = len(self._team_keys) - 1
+        last_key = self._team_keys.pop()
+        if row != last:
+            self._players[row] = self._players[last]
+            self._multipliers[row] = self._multipliers[last]
+            self._team_keys[row] = last_key
+            self._team_index[last_key] = row
+
+    def set_points(self, player_id: str, points: float) -> None:
+        """
+        Set points earned by a player.
+
+        :param player_id: id of the player.
+        :param points: total points of the player.
+        """
+        self._points[self.player_index(player_id)] = points
+
+    def player_points(self) -> Dict[str, float]:
+        """
+        Get points of every known player.
+
+        :return: points by player id.
+        """
+        points = self._points[: len(self._player_index)].tolist()
+        return dict(zip(self._player_index, points, strict=True))
+
+    def apply_events(self, deltas: Mapping[str, float]) -> None:
+        """
+        Add point deltas of a ball event.
+
+        :param deltas: points gained or lost by every player.
+        """
+        indices = np.fromiter(
+            (self.player_index(player_id) for player_id in deltas),
+            dtype=np.int64,
+            count=len(deltas),
+        )
+        np.add.at(self._points, indices, np.fromiter(deltas.values(), np.float64))
+
+    def totals(
+        self,
+        rows: Optional[npt.NDArray[np.intp]] = None,
+    ) -> npt.NDArray[np.float64]:
+        """
+        Compute totals of teams.
+
+        :param rows: positions of teams in ``team_keys`` or None for all teams.
+        :return: total of every requested team.
+        """
+        size = len(self._team_keys)
+        players = self._players[:size]
+        multipliers = self._multipliers[:size]
+        if rows is not None:
+            players = players[rows]
+            multipliers = multipliers[rows]
+        return (self._points[players] * multipliers).sum(axis=1)
+
+    def team_total(self, key: Hashable) -> float:
+        """
+        Compute total of a single team.
+
+        :param key: key identifying the team.
+        :return: total points of the team.
+        """
+        row = self._team_index[key]
+        return float(self._points[self._players[row]] @ self._multipliers[row])
+
+    def teams_with_players(self, player_ids: Sequence[str]) -> npt.NDArray[np.bool_]:
+        """
+        Find teams that include any of the players.
+
+        :param player_ids: ids of players.
+        :return: mask over teams in the order of ``team_keys``.
+        """
+        indices = [
+            self._player_index[player_id]
+            for player_id in player_ids
+            if player_id in self._player_index
+        ]
+        size = len(self._team_keys)
+        mask = np.isin(self._players[:size], indices).any(axis=1)
+        return np.asarray(mask, dtype=np.bool_)
+
+    def _grow(self) -> None:
+        extra = max(len(self._players), 64)
+        self._players = np.concatenate(
+            [self._players, np.zeros((extra, TEAM_SIZE), dtype=np.int32)],
+        )
+        self._multipliers = np.concatenate(
+            [self._multipliers, np.ones((extra, TEAM_SIZE), dtype=np.float32)],
+        )
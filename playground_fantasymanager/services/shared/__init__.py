@@ -0,0 +1,8 @@
+"""Match state shared by workers of one host."""
+
+from playground_fantasymanager.services.shared.points import (
+    SharedMatches,
+    SharedPoints,
+)
+
+__all__ = ["SharedMatches", "SharedPoints"]
@@ -0,0 +1,44 @@
+import asyncio
+import contextlib
+
+from fastapi import FastAPI
+
+from playground_fantasymanager.services.leaderboard import LiveMatches
+from playground_fantasymanager.services.push import LiveHub
+from playground_fantasymanager.settings import settings
+
+
+async def _sync_periodically(live_matches: LiveMatches, hub: LiveHub) -> None:
+    while True:
+        await asyncio.sleep(settings.live_shared_sync_seconds)
+        for match_id, changed in live_matches.sync():
+            hub.publish(match_id, changed)
+
+
+async def init_shared(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Starts following points of matches changed by other workers.
+
+    :param app: current fastapi application.
+    """
+    live_matches: LiveMatches = app.state.live_matches
+    app.state.shared_syncer = None
+    if live_matches.shared is not None:
+        live_matches.shared.directory.mkdir(parents=True, exist_ok=True)
+        app.state.shared_syncer = asyncio.create_task(
+            _sync_periodically(live_matches, app.state.live_hub),
+        )
+
+
+async def shutdown_shared(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stops following shared points and unmaps their tables.
+
+    :param app: current fastapi application.
+    """
+    syncer = app.state.shared_syncer
+    if syncer is not None:
+        syncer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await syncer
+        app.state.live_matches.shared.close()
@@ -0,0 +1,249 @@
+"""Points of players shared by workers through memory mapped files."""
+
+import contextlib
+import fcntl
+import hashlib
+import mmap
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Tuple, TypeVar
+
+import numpy as np
+import numpy.typing as npt
+
+from playground_fantasymanager.exceptions.base import ValidationError
+
+MAGIC = b"PFMPTS1"
+HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("sequence", "<u8"),
+        ("capacity", "<u4"),
+        ("count", "<u4"),
+    ],
+)
+# Player ids are stored as fixed width bytes.
+PLAYER_ID = np.dtype("S32")
+
+T = TypeVar("T")
+# Zero-copy views of the ids and points of the players in a table.
+Reader = Callable[[npt.NDArray[np.bytes_], npt.NDArray[np.float64]], T]
+
+
+class SharedPoints:
+    """
+    Points of players of a match in a memory mapped file.
+
+    The file is a header with a sequence number and the number of
+    players, followed by a column of player ids and a column of their
+    points. Every worker maps the same file, so there is one copy of
+    the table whatever the number of workers.
+
+    Players are only appended. Writers take a lock on the file and
+    keep the sequence odd while they change the table, readers
+    retry reads that saw the sequence change.
+    """
+
+    def __init__(self, path: Path, capacity: int) -> None:
+        """
+        Map the table, creating the file if it doesn't exist.
+
+        :param path: path of the file.
+        :param capacity: players the table can hold, when it is created.
+        :raises ValueError: if the file isn't a table of points.
+        """
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked(fcntl.LOCK_EX):
+            if os.fstat(self._fd).st_size == 0:
+                header = np.zeros(1, HEADER)
+                header["magic"] = MAGIC
+                header["capacity"] = capacity
+                os.ftruncate(self._fd, _file_size(capacity))
+                os.pwrite(self._fd, header.tobytes(), 0)
+            self._map = mmap.mmap(self._fd, os.fstat(self._fd).st_size)
+        self._header = np.frombuffer(self._map, HEADER, count=1)
+        if self._header["magic"][0] != MAGIC:
+            del self._header
+            self._map.close()
+            os.close(self._fd)
+            raise ValueError(f"{path} is not a table of points")
+        self.capacity = int(self._header["capacity"][0])
+        self._ids = np.frombuffer(self._map, PLAYER_ID, self.capacity, HEADER.itemsize)
+        self._points = np.frombuffer(
+            self._map,
+            np.float64,
+            self.capacity,
+            HEADER.itemsize + PLAYER_ID.itemsize * self.capacity,
+        )
+        self._index: Dict[str, int] = {}
+
+    @property
+    def sequence(self) -> int:
+        """
+        Sequence number of the table, odd while it is being written.
+
+        :return: sequence number.
+        """
+        return int(self._header["sequence"][0])
+
+    def read(self, reader: Reader[T]) -> Tuple[int, T]:
+        """
+        Read the table consistently.
+
+        The reader gets read-only views of the mapped file
+        and may be called again if a writer changed the table
+        while it was reading.
+
+        :param reader: function of player ids and points.
+        :return: sequence of the table that was read and result of the reader.
+        """
+        while True:
+            sequence = self.sequence
+            if sequence % 2:
+                # Wait for the writer, or read under the lock if it died.
+                with self._locked(fcntl.LOCK_SH):
+                    return self.sequence, self._read(reader)
+            result = self._read(reader)
+            if self.sequence == sequence:
+                return sequence, result
+
+    def add(self, deltas: Mapping[str, float]) -> int:
+        """
+        Add points to players, registering new players with zero points.
+
+        :param deltas: points gained or lost by every player.
+        :return: sequence of the table after the change.
+        :raises ValidationError: if a new player doesn't fit in the table.
+        """
+        with self._locked(fcntl.LOCK_EX):
+            missing = self._missing(deltas)
+            with self._writing():
+                self._append(dict.fromkeys(missing, 0.0))
+                slots = [self._index[player_id] for player_id in deltas]
+                self._points[slots] += list(deltas.values())
+            return self.sequence
+
+    def setdefault(self, points: Mapping[str, float]) -> int:
+        """
+        Register players missing from the table.
+
+        Players already in the table keep their points, so workers
+        loading the same match agree on the points of every player.
+
+        :param points: initial points of players.
+        :return: sequence of the table after the change.
+        :raises ValidationError: if a new player doesn't fit in the table.
+        """
+        with self._locked(fcntl.LOCK_EX):
+            missing = self._missing(points)
+            if missing:
+                initial = {player_id: points[player_id] for player_id in missing}
+                with self._writing():
+                    self._append(initial)
+            return self.sequence
+
+    def close(self) -> None:
+        """Unmap the table and close its file."""
+        del self._header, self._ids, self._points
+        with contextlib.suppress(BufferError):
+            # Views kept by readers keep the map open until they are gone.
+            self._map.close()
+        os.close(self._fd)
+
+    def _read(self, reader: Reader[T]) -> T:
+        count = min(int(self._header["count"][0]), self.capacity)
+        ids = self._ids[:count]
+        points = self._points[:count]
+        ids.flags.writeable = False
+        points.flags.writeable = False
+        return reader(ids, points)
+
+    def _refresh(self) -> None:
+        # Players are only appended, so only new slots are decoded.
+        count = int(self._header["count"][0])
+        for slot in range(len(self._index), count):
+            self._index[self._ids[slot].decode()] = slot
+
+    def _missing(self, player_ids: Mapping[str, float]) -> List[str]:
+        # Called under the lock. New players are checked before anything
+        # is written, so a failed write leaves the table unchanged.
+        self._refresh()
+        missing = [
+            player_id for player_id in player_ids if player_id not in self._index
+        ]
+        if any(len(player_id.encode()) > PLAYER_ID.itemsize for player_id in missing):
+            raise ValidationError(
+                "Player id too long",
+                description=f"Player ids have at most {PLAYER_ID.itemsize} bytes",
+                field="points",
+            )
+        if len(self._index) + len(missing) > self.capacity:
+            raise ValidationError(
+                "Too many players",
+                description=f"A match has at most {self.capacity} players",
+                field="points",
+            )
+        return missing
+
+    def _append(self, points: Mapping[str, float]) -> None:
+        count = len(self._index)
+        end = count + len(points)
+        self._ids[count:end] = [player_id.encode() for player_id in points]
+        self._points[count:end] = list(points.values())
+        self._header["count"] = end
+        self._refresh()
+
+    @contextlib.contextmanager
+    def _writing(self) -> Iterator[None]:
+        self._header["sequence"] += 1
+        try:
+            yield
+        finally:
+            self._header["sequence"] += 1
+
+    @contextlib.contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        fcntl.flock(self._fd, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class SharedMatches:
+    """Tables of points of matches in a directory shared by workers."""
+
+    def __init__(self, directory: Path, capacity: int) -> None:
+        self.directory = directory
+        self.capacity = capacity
+        self._tables: Dict[str, SharedPoints] = {}
+
+    def get(self, match_id: str) -> SharedPoints:
+        """
+        Get table of a match, mapping it on first use.
+
+        :param match_id: id of the match.
+        :return: table of points of the match.
+        """
+        table = self._tables.get(match_id)
+        if table is None:
+            table = self._tables[match_id] = SharedPoints(
+                self.directory / _file_name(match_id),
+                self.capacity,
+            )
+        return table
+
+    def close(self) -> None:
+        """Unmap tables of all matches."""
+        while self._tables:
+            self._tables.popitem()[1].close()
+
+
+def _file_size(capacity: int) -> int:
+    return HEADER.itemsize + (PLAYER_ID.itemsize + 8) * capacity
+
+
+def _file_name(match_id: str) -> str:
+    # Match ids come from URLs, so they aren't used as file names.
+    return hashlib.blake2b(match_id.encode(), digest_size=16).hexdigest() + ".points"
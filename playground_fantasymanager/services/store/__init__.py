@@ -0,0 +1,27 @@
+"""Fantasy team storage."""
+
+from typing import TYPE_CHECKING, Any
+
+from playground_fantasymanager.services.store.base import FantasyTeamStore
+from playground_fantasymanager.services.store.memory import InMemoryFantasyTeamStore
+
+if TYPE_CHECKING:
+    from playground_fantasymanager.services.store.mongo import MongoFantasyTeamStore
+
+__all__ = [
+    "FantasyTeamStore",
+    "InMemoryFantasyTeamStore",
+    "MongoFantasyTeamStore",
+]
+
+
+def __getattr__(name: str) -> Any:
+    # pymongo is a tenth of the imports of the app, so it is imported
+    # only when the MongoDB store is used.
+    if name == "MongoFantasyTeamStore":
+        from playground_fantasymanager.services.store.mongo import (
+            MongoFantasyTeamStore,
+        )
+
+        return MongoFantasyTeamStore
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,304 @@
+"""Storage interface for fantasy teams."""
+
+import abc
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from playground_fantasymanager.exceptions.base import ValidationError
+
+# Players of every fantasy team.
+TEAM_SIZE = 11
+# Positions of players, in the order of their codes.
+POSITIONS = ("wk", "bat", "allrounder", "bowl")
+# Fields of a stored player that can't be changed by the user.
+SCORED_FIELDS = ("credits", "points_earned")
+
+# userId, fantasyTeamId and new players of a team.
+PlayersUpdate = Tuple[str, str, List[Dict[str, Any]]]
+# Number of teams of a match and sum of their versions,
+# changes whenever a team of the match is added, updated or deleted.
+MatchWatermark = Tuple[int, int]
+# Versions are summed modulo this, so sums of many teams stay small.
+WATERMARK_MODULUS = 1_000_000
+
+
+def initial_version() -> int:
+    """
+    Version of a newly inserted fantasy team.
+
+    Versions start at the insertion time in microseconds, so a team
+    recreated with the same id never repeats versions of the deleted one.
+
+    :return: version number.
+    """
+    return time.time_ns() // 1000
+
+
+def validate_players(players: Sequence[Any]) -> None:
+    """
+    Check players of a fantasy team before they are stored.
+
+    :param players: players of the team.
+    :raises ValidationError: if the team doesn't have ``TEAM_SIZE`` players.
+    """
+    if len(players) != TEAM_SIZE:
+        raise ValidationError(
+            "Wrong number of players",
+            description=f"A fantasy team has {TEAM_SIZE} players",
+            field="players",
+        )
+
+
+def apply_player_update(
+    document: Dict[str, Any],
+    players: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Build the new players and teams of a fantasy team after an update.
+
+    Updated players keep credits and points earned
+    from the stored document, and team sizes are recounted.
+
+    :param document: stored fantasy team document.
+    :param players: new list of players.
+    :return: fields to set on the document.
+    """
+    stored = {player["player_id"]: player for player in document.get("players", [])}
+    new_players = []
+    for player in players:
+        previous = stored.get(player["player_id"], {})
+        new_player = dict(player)
+        for field in SCORED_FIELDS:
+            new_player[field] = previous.get(field)
+        new_players.append(new_player)
+
+    sizes = Counter(player["team_id"] for player in new_players)
+    teams = [
+        {**team, "number_of_players": sizes.get(team["team_id"], 0)}
+        for team in document.get("teams", [])
+    ]
+    return {"players": new_players, "teams": teams}
+
+
+def project_players(
+    document: Dict[str, Any],
+    fields: Optional[Sequence[str]],
+) -> Dict[str, Any]:
+    """
+    Keep only the given fields of players in a document.
+
+    :param document: fantasy team document.
+    :param fields: player fields to keep or None to keep everything.
+    :return: projected document.
+    """
+    if fields is None:
+        return document
+    players = [
+        {field: player[field] for field in fields if field in player}
+        for player in document.get("players", [])
+    ]
+    return {**document, "players": players}
+
+
+class FantasyTeamStore(abc.ABC):
+    """
+    Storage for users' fantasy teams.
+
+    Documents are identified by userId, matchId and fantasyTeamId
+    and hold ``teams`` and ``players`` in the shape of ``FantasyTeam``.
+    Every change of a document increments its ``version``.
+    """
+
+    async def ensure_indexes(self) -> None:  # noqa: B027
+        """Create indexes required by queries of the store."""
+
+    async def close(self) -> None:  # noqa: B027
+        """Release resources held by the store."""
+
+    async def flush(self, match_id: Optional[str] = None) -> None:  # noqa: B027
+        """
+        Write changes the store buffers.
+
+        :param match_id: write only changes of this match, None for all.
+        """
+
+    async def lock_match(self, match_id: str) -> None:
+        """
+        Write buffered changes of a match that gets no more of them.
+
+        :param match_id: id of the match.
+        """
+        await self.flush(match_id)
+
+    @abc.abstractmethod
+    async def insert_team(self, document: Dict[str, Any]) -> None:
+        """
+        Insert a new fantasy team.
+
+        :param document: fantasy team document.
+        """
+
+    @abc.abstractmethod
+    async def get_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a single fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: fantasy team document or None if it doesn't exist.
+        """
+
+    @abc.abstractmethod
+    async def get_version(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[int]:
+        """
+        Find version of a single fantasy team without reading the team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: version or None if the team doesn't exist.
+        """
+
+    @abc.abstractmethod
+    async def list_versions(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Find ids and versions of the teams ``list_teams`` would return.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :return: list of fantasyTeamId and version pairs.
+        """
+
+    @abc.abstractmethod
+    async def list_teams(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find fantasy teams of a user for a match.
+
+        Teams are ordered by fantasyTeamId, so passing the last id
+        of a page as ``after`` continues from the index position
+        instead of skipping every previous team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :param fields: player fields to return or None for all fields.
+        :return: list of fantasy team documents.
+        """
+
+    @abc.abstractmethod
+    def iter_match_teams(
+        self,
+        match_id: str,
+        batch_size: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over fantasy teams of every user for a match.
+
+        Teams are fetched lazily in batches, so memory use
+        doesn't depend on how many teams the match has.
+
+        :param match_id: id of the match.
+        :param batch_size: number of teams fetched at once.
+        :return: iterator over fantasy team documents.
+        """
+
+    @abc.abstractmethod
+    async def match_watermark(self, match_id: str) -> MatchWatermark:
+        """
+        Summarize fantasy teams of a match to tell when they change.
+
+        :param match_id: id of the match.
+        :return: number of teams and sum of their versions
+            modulo ``WATERMARK_MODULUS``.
+        """
+
+    @abc.abstractmethod
+    async def update_players(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+        players: List[Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> bool:
+        """
+        Replace players of a fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :param players: new list of players.
+        :param version: new version of the team or None to increment it.
+            A team that already has this version or a newer one isn't
+            updated, so late writes don't replace newer updates.
+        :return: True if the team was found and updated.
+        """
+
+    @abc.abstractmethod
+    async def bulk_update_players(
+        self,
+        match_id: str,
+        updates: Sequence[PlayersUpdate],
+        versions: Optional[Sequence[int]] = None,
+    ) -> List[bool]:
+        """
+        Replace players of many fantasy teams of a match at once.
+
+        Updates don't depend on each other, so a failed one
+        doesn't stop the rest. When a team is updated several
+        times, the last update wins.
+
+        :param match_id: id of the match.
+        :param updates: userId, fantasyTeamId and players of every team.
+        :param versions: new version of every team or None to increment them.
+            Like in ``update_players``, teams with newer versions aren't updated.
+        :return: whether each update found and updated its team.
+        """
+
+    @abc.abstractmethod
+    async def delete_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> bool:
+        """
+        Delete a fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: True if the team was found and deleted.
+        """
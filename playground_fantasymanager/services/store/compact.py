@@ -0,0 +1,435 @@
+"""Compact array-backed storage of fantasy teams of a match."""
+
+from typing import Any, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar, cast
+
+import numpy as np
+import numpy.typing as npt
+from sortedcontainers import SortedDict, SortedList
+
+from playground_fantasymanager.services.store.base import SCORED_FIELDS, TEAM_SIZE
+
+# Player fields that are the same in every fantasy team picking the player.
+IDENTITY_KEYS = ("player_id", "player_name", "player_image_url", "position", "team_id")
+TEAM_KEYS = ("team_id", "name", "number_of_players", "team_image_url")
+# Slot of a missing player, captain or vice captain.
+EMPTY = -1
+
+PlayerRecord = Tuple[Any, ...]
+ScoreRecord = Tuple[Any, ...]
+TeamsRecord = Tuple[Tuple[Any, ...], ...]
+RecordT = TypeVar("RecordT", bound=Hashable)
+
+
+class InternTable(Generic[RecordT]):
+    """
+    Distinct records referred to by index.
+
+    Every index counts the rows referring to it, and a record
+    no row refers to anymore is dropped and its index reused,
+    so the table holds only records of stored teams.
+    """
+
+    def __init__(self) -> None:
+        self._records: List[Optional[RecordT]] = []
+        self._references: List[int] = []
+        self._index: Dict[RecordT, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, index: int) -> RecordT:
+        return cast(RecordT, self._records[index])
+
+    def acquire(self, record: RecordT) -> int:
+        """
+        Get index of a record, adding new records.
+
+        :param record: record to refer to.
+        :return: index of the record.
+        """
+        index = self._index.get(record)
+        if index is None:
+            if self._free:
+                index = self._free.pop()
+                self._records[index] = record
+            else:
+                index = len(self._records)
+                self._records.append(record)
+                self._references.append(0)
+            self._index[record] = index
+        self._references[index] += 1
+        return index
+
+    def release(self, index: int) -> None:
+        """
+        Drop a reference to a record, dropping the record with the last one.
+
+        :param index: index of the record.
+        """
+        self._references[index] -= 1
+        if not self._references[index]:
+            del self._index[cast(RecordT, self._records[index])]
+            self._records[index] = None
+            self._free.append(index)
+
+
+class PlayerCatalog:
+    """
+    Interned players and real teams of a match.
+
+    Every distinct player and every distinct list of real teams is
+    kept once, and fantasy teams refer to them by index. Credits and
+    points of a player change during a match, so they are kept apart
+    from the player, and entries nobody refers to are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._players: InternTable[PlayerRecord] = InternTable()
+        self._scores: InternTable[ScoreRecord] = InternTable()
+        self._teams: InternTable[TeamsRecord] = InternTable()
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def intern_player(self, player: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Get indices of a player and its scored fields, adding new entries.
+
+        :param player: player of a fantasy team.
+        :return: index of the player and index of its scored fields.
+        """
+        identity = tuple(player.get(key) for key in IDENTITY_KEYS)
+        score = tuple(player.get(key) for key in SCORED_FIELDS)
+        return self._players.acquire(identity), self._scores.acquire(score)
+
+    def intern_teams(self, teams: List[Dict[str, Any]]) -> int:
+        """
+        Get index of a list of real teams, adding new lists to the catalog.
+
+        :param teams: real teams of a fantasy team.
+        :return: index of the list.
+        """
+        record = tuple(tuple(team.get(key) for key in TEAM_KEYS) for team in teams)
+        return self._teams.acquire(record)
+
+    def release_player(self, index: int, score: int) -> None:
+        """
+        Drop a reference of a fantasy team to a player.
+
+        :param index: index of the player.
+        :param score: index of scored fields of the player.
+        """
+        self._players.release(index)
+        self._scores.release(score)
+
+    def release_teams(self, index: int) -> None:
+        """
+        Drop a reference of a fantasy team to a list of real teams.
+
+        :param index: index of the list.
+        """
+        self._teams.release(index)
+
+    def player(
+        self,
+        index: int,
+        score: int,
+        is_captain: bool,
+        is_vice_captain: bool,
+    ) -> Dict[str, Any]:
+        """
+        Build a player of a fantasy team.
+
+        :param index: index of the player.
+        :param score: index of scored fields of the player.
+        :param is_captain: whether the player is the captain.
+        :param is_vice_captain: whether the player is the vice captain.
+        :return: player in the shape of ``PlayerInfo``.
+        """
+        player_id, name, image_url, position, team_id = self._players[index]
+        credits, points = self._scores[score]
+        return {
+            "player_id": player_id,
+            "player_name": name,
+            "player_image_url": image_url,
+            "is_captain": is_captain,
+            "is_vice_captain": is_vice_captain,
+            "credits": credits,
+            "points_earned": points,
+            "position": position,
+            "team_id": team_id,
+        }
+
+    def teams(self, index: int) -> List[Dict[str, Any]]:
+        """
+        Build real teams of a fantasy team.
+
+        :param index: index of the list of teams.
+        :return: teams in the shape of ``TeamInfo``.
+        """
+        return [dict(zip(TEAM_KEYS, team, strict=True)) for team in self._teams[index]]
+
+
+class CompactMatchTeams:
+    """
+    Fantasy teams of every user for a match.
+
+    A fantasy team is a row of 11 player indices into the match
+    catalog with a row of indices of their credits and points, slots
+    of its captain and vice captain, the index of its real teams and
+    its version. Documents are only built
+    when a team is read, so a team takes tens of bytes instead of
+    a dict per player.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self.catalog = PlayerCatalog()
+        self._players: npt.NDArray[np.int32] = np.full(
+            (capacity, TEAM_SIZE),
+            EMPTY,
+            dtype=np.int32,
+        )
+        self._scores: npt.NDArray[np.int32] = np.full_like(self._players, EMPTY)
+        self._captains: npt.NDArray[np.int8] = np.full(capacity, EMPTY, np.int8)
+        self._vice_captains: npt.NDArray[np.int8] = np.full(capacity, EMPTY, np.int8)
+        self._teams: npt.NDArray[np.int32] = np.zeros(capacity, dtype=np.int32)
+        self._versions: npt.NDArray[np.int64] = np.zeros(capacity, dtype=np.int64)
+        self._rows: Dict[str, Dict[str, int]] = {}
+        self._team_ids: "SortedDict[str, SortedList[str]]" = SortedDict()
+        # Keys of rows are kept in two lists to avoid a tuple per team.
+        self._user_ids: List[str] = []
+        self._fantasy_team_ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._user_ids)
+
+    def row(self, user_id: str, fantasy_team_id: str) -> Optional[int]:
+        """
+        Find row of a fantasy team.
+
+        :param user_id: id of the user.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: row or None if the team doesn't exist.
+        """
+        return self._rows.get(user_id, {}).get(fantasy_team_id)
+
+    def insert(
+        self,
+        user_id: str,
+        fantasy_team_id: str,
+        document: Dict[str, Any],
+        version: int,
+    ) -> None:
+        """
+        Add a new fantasy team.
+
+        :param user_id: id of the user.
+        :param fantasy_team_id: id of the fantasy team.
+        :param document: fantasy team document.
+        :param version: version of the team.
+        """
+        row = len(self._user_ids)
+        if row == len(self._versions):
+            self._grow()
+        self._write(row, document, version)
+        self._user_ids.append(user_id)
+        self._fantasy_team_ids.append(fantasy_team_id)
+        self._rows.setdefault(user_id, {})[fantasy_team_id] = row
+        self._team_ids.setdefault(user_id, SortedList()).add(fantasy_team_id)
+
+    def replace(self, row: int, document: Dict[str, Any], version: int) -> None:
+        """
+        Replace players and teams of a fantasy team.
+
+        :param row: row of the team.
+        :param document: new fantasy team document.
+        :param version: new version of the team.
+        """
+        # Entries of players that stay in the team are kept.
+        previous = self._references(row)
+        self._write(row, document, version)
+        self._release(*previous)
+
+    def remove(self, row: int) -> None:
+        """
+        Remove a fantasy team, moving the last team into its row.
+
+        :param row: row of the team.
+        """
+        user_id = self._user_ids[row]
+        fantasy_team_id = self._fantasy_team_ids[row]
+        self._release(*self._references(row))
+        last = len(self._user_ids) - 1
+        if row != last:
+            for array in self._arrays():
+                array[row] = array[last]
+            moved_user_id = self._user_ids[row] = self._user_ids[last]
+            moved_team_id = self._fantasy_team_ids[row] = self._fantasy_team_ids[last]
+            self._rows[moved_user_id][moved_team_id] = row
+        self._user_ids.pop()
+        self._fantasy_team_ids.pop()
+        del self._rows[user_id][fantasy_team_id]
+        self._team_ids[user_id].remove(fantasy_team_id)
+        if not self._rows[user_id]:
+            del self._rows[user_id]
+            del self._team_ids[user_id]
+
+    def fantasy_team_id(self, row: int) -> str:
+        """
+        Get id of a fantasy team.
+
+        :param row: row of the team.
+        :return: fantasyTeamId.
+        """
+        return self._fantasy_team_ids[row]
+
+    def version(self, row: int) -> int:
+        """
+        Get version of a fantasy team.
+
+        :param row: row of the team.
+        :return: version.
+        """
+        return int(self._versions[row])
+
+    def versions(self) -> npt.NDArray[np.int64]:
+        """
+        Get versions of all fantasy teams.
+
+        :return: view of versions in the order of rows.
+        """
+        return self._versions[: len(self)]
+
+    def document(self, row: int, match_id: str) -> Dict[str, Any]:
+        """
+        Build the document of a fantasy team.
+
+        :param row: row of the team.
+        :param match_id: id of the match.
+        :return: fantasy team document.
+        """
+        captain = int(self._captains[row])
+        vice_captain = int(self._vice_captains[row])
+        players = [
+            self.catalog.player(index, score, slot == captain, slot == vice_captain)
+            for slot, (index, score) in enumerate(
+                zip(self._players[row].tolist(), self._scores[row].tolist()),
+            )
+            if index != EMPTY
+        ]
+        return {
+            "version": int(self._versions[row]),
+            "userId": self._user_ids[row],
+            "matchId": match_id,
+            "fantasyTeamId": self._fantasy_team_ids[row],
+            "teams": self.catalog.teams(int(self._teams[row])),
+            "players": players,
+        }
+
+    def page(
+        self,
+        user_id: str,
+        limit: int,
+        offset: int,
+        after: Optional[str],
+    ) -> List[int]:
+        """
+        Find rows of a page of a user's teams ordered by fantasyTeamId.
+
+        :param user_id: id of the user.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :return: rows of the teams.
+        """
+        team_ids = self._team_ids.get(user_id)
+        if team_ids is None:
+            return []
+        start = offset if after is None else team_ids.bisect_right(after) + offset
+        rows = self._rows[user_id]
+        return [rows[team_id] for team_id in team_ids[start : start + limit]]
+
+    def ordered_keys(
+        self,
+        after: Optional[Tuple[str, str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[str, str]]:
+        """
+        Get keys of teams ordered by userId and fantasyTeamId.
+
+        Keys are found by bisecting sorted ids, so a page
+        costs its own length, not the number of teams.
+
+        :param after: return only keys greater than this key.
+        :param limit: maximum number of keys to return, None for all.
+        :return: userId and fantasyTeamId of the teams.
+        """
+        keys: List[Tuple[str, str]] = []
+        start = 0 if after is None else self._team_ids.bisect_left(after[0])
+        for user_id in self._team_ids.islice(start):
+            team_ids = self._team_ids[user_id]
+            first = 0
+            if after is not None and user_id == after[0]:
+                first = team_ids.bisect_right(after[1])
+            for fantasy_team_id in team_ids.islice(first):
+                if len(keys) == limit:
+                    return keys
+                keys.append((user_id, fantasy_team_id))
+        return keys
+
+    def _write(self, row: int, document: Dict[str, Any], version: int) -> None:
+        players = document.get("players", [])
+        if len(players) > TEAM_SIZE:
+            # Requests are validated before they reach the store.
+            raise ValueError(f"Fantasy team has more than {TEAM_SIZE} players")
+        indices = [self.catalog.intern_player(player) for player in players]
+        missing = [EMPTY] * (TEAM_SIZE - len(indices))
+        captain = vice_captain = EMPTY
+        for slot, player in enumerate(players):
+            if player.get("is_captain"):
+                captain = slot
+            if player.get("is_vice_captain"):
+                vice_captain = slot
+        self._players[row] = [index for index, _ in indices] + missing
+        self._scores[row] = [score for _, score in indices] + missing
+        self._captains[row] = captain
+        self._vice_captains[row] = vice_captain
+        self._teams[row] = self.catalog.intern_teams(document.get("teams", []))
+        self._versions[row] = version
+
+    def _references(self, row: int) -> Tuple[List[int], List[int], int]:
+        return (
+            self._players[row].tolist(),
+            self._scores[row].tolist(),
+            int(self._teams[row]),
+        )
+
+    def _release(self, players: List[int], scores: List[int], teams: int) -> None:
+        for index, score in zip(players, scores, strict=True):
+            if index != EMPTY:
+                self.catalog.release_player(index, score)
+        self.catalog.release_teams(teams)
+
+    def _arrays(self) -> Tuple[npt.NDArray[Any], ...]:
+        return (
+            self._players,
+            self._scores,
+            self._captains,
+            self._vice_captains,
+            self._teams,
+            self._versions,
+        )
+
+    def _grow(self) -> None:
+        (
+            self._players,
+            self._scores,
+            self._captains,
+            self._vice_captains,
+            self._teams,
+            self._versions,
+        ) = (
+            np.concatenate([array, np.full_like(array, EMPTY)])
+            for array in self._arrays()
+        )
@@ -0,0 +1,13 @@
+from starlette.requests import Request
+
+from playground_fantasymanager.services.store.base import FantasyTeamStore
+
+
+def get_fantasy_team_store(request: Request) -> FantasyTeamStore:  # pragma: no cover
+    """
+    Returns fantasy team store of the application.
+
+    :param request: current request.
+    :return: fantasy team store.
+    """
+    return request.app.state.fantasy_team_store
@@ -0,0 +1,49 @@
+from typing import Any, Dict
+
+from fastapi import FastAPI
+
+from playground_fantasymanager.services.store.base import FantasyTeamStore
+from playground_fantasymanager.services.store.memory import InMemoryFantasyTeamStore
+from playground_fantasymanager.settings import StoreBackend, settings
+
+
+def create_store() -> FantasyTeamStore:
+    """
+    Create fantasy team store for the configured backend.
+
+    :return: fantasy team store.
+    """
+    if settings.store_backend == StoreBackend.MEMORY:
+        return InMemoryFantasyTeamStore()
+    # pymongo is imported only by workers that use it.
+    from pymongo import AsyncMongoClient
+
+    from playground_fantasymanager.services.store.mongo import (
+        MongoFantasyTeamStore,
+    )
+
+    client: "AsyncMongoClient[Dict[str, Any]]" = AsyncMongoClient(
+        str(settings.db_url),
+        maxPoolSize=settings.db_pool_size,
+    )
+    return MongoFantasyTeamStore(client, settings.db_base)
+
+
+async def init_store(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Creates fantasy team store and its indexes.
+
+    :param app: current fastapi application.
+    """
+    store = create_store()
+    await store.ensure_indexes()
+    app.state.fantasy_team_store = store
+
+
+async def shutdown_store(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Closes the fantasy team store.
+
+    :param app: current fastapi application.
+    """
+    await app.state.fantasy_team_store.close()
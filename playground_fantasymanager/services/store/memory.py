@@ -0,0 +1,271 @@
+"""In-memory fantasy team store for tests and local development."""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from playground_fantasymanager.exceptions.base import ConflictError
+from playground_fantasymanager.services.store.base import (
+    WATERMARK_MODULUS,
+    FantasyTeamStore,
+    MatchWatermark,
+    PlayersUpdate,
+    apply_player_update,
+    initial_version,
+    project_players,
+)
+from playground_fantasymanager.services.store.compact import CompactMatchTeams
+
+
+class InMemoryFantasyTeamStore(FantasyTeamStore):
+    """
+    Fantasy team store that keeps teams in process memory.
+
+    It behaves like the MongoDB store but lives only
+    as long as the process does. Teams of every match are
+    kept in compact arrays, and documents are built on reads.
+    """
+
+    def __init__(self) -> None:
+        self._matches: Dict[str, CompactMatchTeams] = {}
+
+    async def insert_team(self, document: Dict[str, Any]) -> None:
+        """
+        Insert a new fantasy team.
+
+        :param document: fantasy team document.
+        :raises ConflictError: if the team already exists.
+        """
+        match = self._matches.setdefault(document["matchId"], CompactMatchTeams())
+        user_id, fantasy_team_id = document["userId"], document["fantasyTeamId"]
+        if match.row(user_id, fantasy_team_id) is not None:
+            raise ConflictError("Fantasy team already exists")
+        match.insert(user_id, fantasy_team_id, document, initial_version())
+
+    async def get_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a single fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: fantasy team document or None if it doesn't exist.
+        """
+        found = self._find(user_id, match_id, fantasy_team_id)
+        if found is None:
+            return None
+        match, row = found
+        return match.document(row, match_id)
+
+    async def get_version(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[int]:
+        """
+        Find version of a single fantasy team without reading the team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: version or None if the team doesn't exist.
+        """
+        found = self._find(user_id, match_id, fantasy_team_id)
+        if found is None:
+            return None
+        match, row = found
+        return match.version(row)
+
+    async def list_versions(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Find ids and versions of the teams ``list_teams`` would return.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :return: list of fantasyTeamId and version pairs.
+        """
+        match = self._matches.get(match_id)
+        if match is None:
+            return []
+        return [
+            (match.fantasy_team_id(row), match.version(row))
+            for row in match.page(user_id, limit, offset, after)
+        ]
+
+    async def list_teams(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find fantasy teams of a user for a match.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :param fields: player fields to return or None for all fields.
+        :return: list of fantasy team documents.
+        """
+        match = self._matches.get(match_id)
+        if match is None:
+            return []
+        return [
+            project_players(match.document(row, match_id), fields)
+            for row in match.page(user_id, limit, offset, after)
+        ]
+
+    async def iter_match_teams(
+        self,
+        match_id: str,
+        batch_size: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over fantasy teams of every user for a match.
+
+        :param match_id: id of the match.
+        :param batch_size: number of teams fetched at once.
+        :yield: fantasy team documents.
+        """
+        match = self._matches.get(match_id)
+        if match is None:
+            return
+        after = None
+        # Keys are read a batch at a time from where the last batch ended.
+        while keys := match.ordered_keys(after, batch_size):
+            for user_id, fantasy_team_id in keys:
+                # Teams may be deleted while the caller consumes the iterator.
+                row = match.row(user_id, fantasy_team_id)
+                if row is not None:
+                    yield match.document(row, match_id)
+            after = keys[-1]
+
+    async def match_watermark(self, match_id: str) -> MatchWatermark:
+        """
+        Summarize fantasy teams of a match to tell when they change.
+
+        :param match_id: id of the match.
+        :return: number of teams and sum of their versions
+            modulo ``WATERMARK_MODULUS``.
+        """
+        match = self._matches.get(match_id)
+        if match is None:
+            return 0, 0
+        checksum = int((match.versions() % WATERMARK_MODULUS).sum())
+        return len(match), checksum % WATERMARK_MODULUS
+
+    async def update_players(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+        players: List[Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> bool:
+        """
+        Replace players of a fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :param players: new list of players.
+        :param version: new version of the team or None to increment it.
+        :return: True if the team was found and updated.
+        """
+        found = self._find(user_id, match_id, fantasy_team_id)
+        if found is None:
+            return False
+        match, row = found
+        document = match.document(row, match_id)
+        if version is not None and document["version"] >= version:
+            return False
+        match.replace(
+            row,
+            apply_player_update(document, players),
+            document["version"] + 1 if version is None else version,
+        )
+        return True
+
+    async def bulk_update_players(
+        self,
+        match_id: str,
+        updates: Sequence[PlayersUpdate],
+        versions: Optional[Sequence[int]] = None,
+    ) -> List[bool]:
+        """
+        Replace players of many fantasy teams of a match at once.
+
+        :param match_id: id of the match.
+        :param updates: userId, fantasyTeamId and players of every team.
+        :param versions: new version of every team or None to increment them.
+        :return: whether each update found and updated its team.
+        """
+        new_versions = [None] * len(updates) if versions is None else versions
+        return [
+            await self.update_players(
+                user_id,
+                match_id,
+                fantasy_team_id,
+                players,
+                version,
+            )
+            for (user_id, fantasy_team_id, players), version in zip(
+                updates,
+                new_versions,
+                strict=True,
+            )
+        ]
+
+    async def delete_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> bool:
+        """
+        Delete a fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: True if the team was found and deleted.
+        """
+        found = self._find(user_id, match_id, fantasy_team_id)
+        if found is None:
+            return False
+        match, row = found
+        match.remove(row)
+        return True
+
+    def _find(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[Tuple[CompactMatchTeams, int]]:
+        match = self._matches.get(match_id)
+        if match is None:
+            return None
+        row = match.row(user_id, fantasy_team_id)
+        if row is None:
+            return None
+        return match, row
@@ -0,0 +1,466 @@
+"""MongoDB-backed fantasy team store."""
+
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from pymongo import ASCENDING, AsyncMongoClient, UpdateOne
+from pymongo.asynchronous.cursor import AsyncCursor
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from playground_fantasymanager.exceptions.base import ConflictError
+from playground_fantasymanager.services.store.base import (
+    WATERMARK_MODULUS,
+    FantasyTeamStore,
+    MatchWatermark,
+    PlayersUpdate,
+    apply_player_update,
+    initial_version,
+)
+
+COLLECTION_NAME = "fantasy_teams"
+# Internal fields never leave the store.
+DEFAULT_PROJECTION = {"_id": 0}
+# Reads and writes of an update that keeps losing races with other updates.
+UPDATE_ATTEMPTS = 5
+
+
+def players_projection(fields: Optional[Sequence[str]]) -> Dict[str, int]:
+    """
+    Build query projection returning only the given player fields.
+
+    :param fields: player fields or None for all fields.
+    :return: projection for find queries.
+    """
+    if fields is None:
+        return DEFAULT_PROJECTION
+    projection = {"_id": 0, "fantasyTeamId": 1, "version": 1, "teams": 1}
+    projection.update({f"players.{field}": 1 for field in fields})
+    return projection
+
+
+class MongoFantasyTeamStore(FantasyTeamStore):
+    """
+    Fantasy team store backed by a MongoDB collection.
+
+    The client is shared by the whole worker, so every
+    request reuses connections from its pool.
+    """
+
+    def __init__(
+        self,
+        client: "AsyncMongoClient[Dict[str, Any]]",
+        db_name: str,
+    ) -> None:
+        self._client = client
+        self._collection = client[db_name][COLLECTION_NAME]
+
+    async def ensure_indexes(self) -> None:
+        """Create indexes required by queries of the store."""
+        await self._collection.create_index(
+            [
+                ("userId", ASCENDING),
+                ("matchId", ASCENDING),
+                ("fantasyTeamId", ASCENDING),
+            ],
+            name="user_match_team",
+            unique=True,
+        )
+        await self._collection.create_index(
+            [
+                ("matchId", ASCENDING),
+                ("userId", ASCENDING),
+                ("fantasyTeamId", ASCENDING),
+            ],
+            name="match_user_team",
+        )
+
+    async def close(self) -> None:
+        """Close the client and its connection pool."""
+        await self._client.close()
+
+    async def insert_team(self, document: Dict[str, Any]) -> None:
+        """
+        Insert a new fantasy team.
+
+        :param document: fantasy team document.
+        :raises ConflictError: if the team already exists.
+        """
+        try:
+            await self._collection.insert_one(
+                {"version": initial_version(), **document},
+            )
+        except DuplicateKeyError as exc:
+            raise ConflictError("Fantasy team already exists") from exc
+
+    async def get_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a single fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: fantasy team document or None if it doesn't exist.
+        """
+        return await self._collection.find_one(
+            {"userId": user_id, "matchId": match_id, "fantasyTeamId": fantasy_team_id},
+            DEFAULT_PROJECTION,
+        )
+
+    async def get_version(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[int]:
+        """
+        Find version of a single fantasy team without reading the team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: version or None if the team doesn't exist.
+        """
+        document = await self._collection.find_one(
+            {"userId": user_id, "matchId": match_id, "fantasyTeamId": fantasy_team_id},
+            {"_id": 0, "version": 1},
+        )
+        return None if document is None else document["version"]
+
+    async def list_versions(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Find ids and versions of the teams ``list_teams`` would return.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :return: list of fantasyTeamId and version pairs.
+        """
+        cursor = self._page(
+            user_id,
+            match_id,
+            limit,
+            offset,
+            after,
+            {"_id": 0, "fantasyTeamId": 1, "version": 1},
+        )
+        return [
+            (document["fantasyTeamId"], document["version"])
+            async for document in cursor
+        ]
+
+    async def list_teams(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find fantasy teams of a user for a match.
+
+        The query is served by the user_match_team index,
+        including the range on fantasyTeamId and the sort.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :param fields: player fields to return or None for all fields.
+        :return: list of fantasy team documents.
+        """
+        cursor = self._page(
+            user_id,
+            match_id,
+            limit,
+            offset,
+            after,
+            players_projection(fields),
+        )
+        return await cursor.to_list()
+
+    async def iter_match_teams(
+        self,
+        match_id: str,
+        batch_size: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over fantasy teams of every user for a match.
+
+        Documents come from a server-side cursor walking
+        the match_user_team index, one batch at a time.
+
+        :param match_id: id of the match.
+        :param batch_size: number of teams fetched at once.
+        :yield: fantasy team documents.
+        """
+        cursor = (
+            self._collection.find({"matchId": match_id}, DEFAULT_PROJECTION)
+            .hint("match_user_team")
+            .batch_size(batch_size)
+        )
+        async with cursor:
+            async for document in cursor:
+                yield document
+
+    async def match_watermark(self, match_id: str) -> MatchWatermark:
+        """
+        Summarize fantasy teams of a match to tell when they change.
+
+        The sum is computed by the server over the match_user_team index.
+
+        :param match_id: id of the match.
+        :return: number of teams and sum of their versions
+            modulo ``WATERMARK_MODULUS``.
+        """
+        cursor = await self._collection.aggregate(
+            [
+                {"$match": {"matchId": match_id}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "teams": {"$sum": 1},
+                        "versions": {
+                            "$sum": {"$mod": ["$version", WATERMARK_MODULUS]},
+                        },
+                    },
+                },
+            ],
+            hint="match_user_team",
+        )
+        async with cursor:
+            async for summary in cursor:
+                return summary["teams"], summary["versions"] % WATERMARK_MODULUS
+        return 0, 0
+
+    async def update_players(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+        players: List[Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> bool:
+        """
+        Replace players of a fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :param players: new list of players.
+        :param version: new version of the team or None to increment it.
+        :return: True if the team was found and updated.
+        """
+        query = {
+            "userId": user_id,
+            "matchId": match_id,
+            "fantasyTeamId": fantasy_team_id,
+        }
+        for _ in range(UPDATE_ATTEMPTS):
+            document = await self._collection.find_one(
+                query,
+                {"_id": 0, "players": 1, "teams": 1, "version": 1},
+            )
+            if document is None or not _is_older(document, version):
+                return False
+            # The update applies only if nobody changed the team since it was
+            # read, otherwise it is computed again from the new document.
+            result = await self._collection.update_one(
+                {**query, "version": document["version"]},
+                _players_update(apply_player_update(document, players), version),
+            )
+            if result.matched_count > 0:
+                return True
+        raise ConflictError(
+            "Fantasy team is being updated",
+            description="The team changed while it was updated, try again",
+        )
+
+    async def bulk_update_players(
+        self,
+        match_id: str,
+        updates: Sequence[PlayersUpdate],
+        versions: Optional[Sequence[int]] = None,
+    ) -> List[bool]:
+        """
+        Replace players of many fantasy teams of a match at once.
+
+        All teams are read with one query and written with one
+        unordered bulk write, so the batch costs two round trips.
+        Like single updates, every write applies only to the version
+        of the team that was read, and teams changed meanwhile are
+        reported as not updated. Only the last update of a team that
+        occurs more than once is written, the others are reported as
+        not updated.
+
+        :param match_id: id of the match.
+        :param updates: userId, fantasyTeamId and players of every team.
+        :param versions: new version of every team or None to increment them.
+        :return: whether each update found and updated its team.
+        """
+        if not updates:
+            return []
+        # Only the last update of every team is written.
+        latest = {(user_id, team_id): players for user_id, team_id, players in updates}
+        new_versions: Dict[Tuple[str, str], Optional[int]] = dict.fromkeys(latest)
+        if versions is not None:
+            new_versions.update(
+                ((user_id, team_id), version)
+                for (user_id, team_id, _), version in zip(
+                    updates,
+                    versions,
+                    strict=True,
+                )
+            )
+        cursor = self._collection.find(
+            {
+                "matchId": match_id,
+                "$or": [
+                    {"userId": user_id, "fantasyTeamId": team_id}
+                    for user_id, team_id in latest
+                ],
+            },
+            {
+                "_id": 0,
+                "userId": 1,
+                "fantasyTeamId": 1,
+                "players": 1,
+                "teams": 1,
+                "version": 1,
+            },
+        )
+        operations = []
+        # Version every team is expected to have after the write.
+        written: Dict[Tuple[str, str], int] = {}
+        async for document in cursor:
+            key = (document["userId"], document["fantasyTeamId"])
+            new_version = new_versions[key]
+            if not _is_older(document, new_version):
+                continue
+            operations.append(
+                UpdateOne(
+                    {
+                        "userId": key[0],
+                        "matchId": match_id,
+                        "fantasyTeamId": key[1],
+                        "version": document["version"],
+                    },
+                    _players_update(
+                        apply_player_update(document, latest[key]),
+                        new_version,
+                    ),
+                ),
+            )
+            written[key] = (
+                document["version"] + 1 if new_version is None else new_version
+            )
+
+        updated = set(written)
+        if operations:
+            updated -= await self._write_players(match_id, operations, written)
+        last = {
+            (user_id, team_id): index
+            for index, (user_id, team_id, _) in enumerate(updates)
+        }
+        return [
+            (user_id, team_id) in updated and last[user_id, team_id] == index
+            for index, (user_id, team_id, _) in enumerate(updates)
+        ]
+
+    async def _write_players(
+        self,
+        match_id: str,
+        operations: List[UpdateOne],
+        written: Dict[Tuple[str, str], int],
+    ) -> Set[Tuple[str, str]]:
+        # Returns teams that were not updated.
+        keys = list(written)
+        try:
+            result = await self._collection.bulk_write(operations, ordered=False)
+        except BulkWriteError:
+            # Failed teams keep the version they were read with.
+            pass
+        else:
+            if result.matched_count == len(operations):
+                return set()
+        # Some teams changed after they were read, they have other versions.
+        cursor = self._collection.find(
+            {
+                "matchId": match_id,
+                "$or": [
+                    {"userId": user_id, "fantasyTeamId": team_id}
+                    for user_id, team_id in keys
+                ],
+            },
+            {"_id": 0, "userId": 1, "fantasyTeamId": 1, "version": 1},
+        )
+        current = {
+            (document["userId"], document["fantasyTeamId"]): document["version"]
+            async for document in cursor
+        }
+        return {key for key in keys if current.get(key) != written[key]}
+
+    async def delete_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> bool:
+        """
+        Delete a fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: True if the team was found and deleted.
+        """
+        result = await self._collection.delete_one(
+            {"userId": user_id, "matchId": match_id, "fantasyTeamId": fantasy_team_id},
+        )
+        return result.deleted_count > 0
+
+    def _page(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int,
+        after: Optional[str],
+        projection: Dict[str, int],
+    ) -> "AsyncCursor[Dict[str, Any]]":
+        query: Dict[str, Any] = {"userId": user_id, "matchId": match_id}
+        if after is not None:
+            query["fantasyTeamId"] = {"$gt": after}
+        return (
+            self._collection.find(query, projection)
+            .sort("fantasyTeamId", ASCENDING)
+            .skip(offset)
+            .limit(limit)
+        )
+
+
+def _is_older(document: Dict[str, Any], version: Optional[int]) -> bool:
+    # Explicit versions never replace a version that is the same or newer.
+    return version is None or document["version"] < version
+
+
+def _players_update(fields: Dict[str, Any], version: Optional[int]) -> Dict[str, Any]:
+    # Versions are incremented unless the caller chose them.
+    if version is None:
+        return {"$set": fields, "$inc": {"version": 1}}
+    return {"$set": {**fields, "version": version}}
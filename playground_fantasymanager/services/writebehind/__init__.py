@@ -0,0 +1,6 @@
+"""Buffering of fantasy team updates in front of the store."""
+
+from playground_fantasymanager.services.writebehind.log import UpdateLog
+from playground_fantasymanager.services.writebehind.store import WriteBehindStore
+
+__all__ = ["UpdateLog", "WriteBehindStore"]
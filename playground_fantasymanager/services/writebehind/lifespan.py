@@ -0,0 +1,68 @@
+import asyncio
+import contextlib
+import logging
+
+from fastapi import FastAPI
+
+from playground_fantasymanager.services.writebehind.log import UpdateLog
+from playground_fantasymanager.services.writebehind.store import WriteBehindStore
+from playground_fantasymanager.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+async def _flush_periodically(store: WriteBehindStore) -> None:
+    while True:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(
+                store.full.wait(),
+                settings.write_behind_flush_seconds,
+            )
+        try:
+            # Matches other workers locked are stored before the rest.
+            await store.flush_locked()
+            await store.flush()
+        except Exception:
+            # Updates stay buffered and logged until the next flush.
+            logger.exception("Buffered fantasy team updates were not stored")
+
+
+async def init_write_behind(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Buffers player updates in front of the fantasy team store.
+
+    Updates left in the log by stopped workers are stored first.
+
+    :param app: current fastapi application.
+    """
+    app.state.write_behind_flusher = None
+    if not settings.write_behind_enabled:
+        return
+    store = WriteBehindStore(
+        app.state.fantasy_team_store,
+        UpdateLog(
+            settings.write_behind_dir,
+            settings.write_behind_fsync,
+            settings.write_behind_commit_seconds,
+            settings.write_behind_lock_seconds,
+        ),
+        settings.write_behind_max_pending,
+    )
+    if store.recover():
+        await store.flush()
+    app.state.fantasy_team_store = store
+    app.state.write_behind_flusher = asyncio.create_task(_flush_periodically(store))
+
+
+async def shutdown_write_behind(app: FastAPI) -> None:  # pragma: no cover
+    """
+    Stops flushing periodically and stores the last buffered updates.
+
+    :param app: current fastapi application.
+    """
+    flusher = app.state.write_behind_flusher
+    if flusher is not None:
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+        await app.state.fantasy_team_store.flush()
@@ -0,0 +1,239 @@
+"""Append-only log of updates acknowledged before they are stored."""
+
+import asyncio
+import fcntl
+import hashlib
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# An update or deletion of a fantasy team with the version it was given.
+Record = Dict[str, Any]
+
+SUFFIX = ".log"
+LOCKED_SUFFIX = ".locked"
+
+
+class UpdateLog:
+    """
+    Log of acknowledged updates in segment files of a directory.
+
+    Every worker appends to its own segments and holds a lock on them
+    until their updates are stored. Segments nobody holds a lock on
+    were left by workers that stopped before storing their updates,
+    and are recovered by the next worker that starts.
+
+    Locked matches have a marker file, so every worker stops
+    buffering their updates. Markers expire once every worker
+    had time to store the updates it buffered, which reopens
+    their matches.
+
+    Appends only write to the page cache. Appends waiting on ``commit``
+    at once share a single sync to disk, run in a thread, so the event
+    loop never waits for the disk and the disk sees a sync per batch
+    of updates instead of one per update.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        fsync: bool,
+        commit_seconds: float = 0.0,
+        lock_seconds: float = 10.0,
+    ) -> None:
+        """
+        Open a new segment of the log.
+
+        :param directory: directory of segments, created if it doesn't exist.
+        :param fsync: sync the segment to disk before ``commit`` returns.
+        :param commit_seconds: time appends wait for others to share their sync.
+        :param lock_seconds: time a locked match stays locked.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.fsync = fsync
+        self.commit_seconds = commit_seconds
+        self.lock_seconds = lock_seconds
+        # Sync that records appended so far wait for.
+        self._commit: Optional["asyncio.Task[None]"] = None
+        # Syncs that didn't finish, including those new records don't wait for.
+        self._syncs: Set["asyncio.Task[None]"] = set()
+        # Closed segments stay locked until their updates are stored.
+        self._closed: List[Tuple[Path, int]] = []
+        self._path, self._fd = self._open()
+        # Ids of locked matches by name of their marker.
+        self._locked: Dict[str, str] = {}
+
+    def append(self, records: Iterable[Record]) -> None:
+        """
+        Append records to the current segment.
+
+        :param records: updates and deletions of fantasy teams.
+        """
+        data = b"".join(
+            orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records
+        )
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view) :]
+
+    async def commit(self) -> None:
+        """Wait until appended records are synced to disk, if the log syncs."""
+        if not self.fsync:
+            return
+        if self._commit is None:
+            self._commit = asyncio.create_task(self._sync())
+            self._syncs.add(self._commit)
+            self._commit.add_done_callback(self._syncs.discard)
+        # A cancelled caller doesn't cancel the sync others wait for.
+        await asyncio.shield(self._commit)
+
+    async def rotate(self) -> int:
+        """
+        Close the current segment and start a new one.
+
+        The closed segment is synced to disk in a thread.
+
+        :return: number of closed segments, to pass to ``discard``
+            once their updates are stored.
+        """
+        # Running syncs may be of the current segment, which
+        # must not be discarded before they finish.
+        while self._syncs:
+            await asyncio.wait(set(self._syncs))
+        fd = self._fd
+        self._closed.append((self._path, fd))
+        self._path, self._fd = self._open()
+        await asyncio.to_thread(os.fsync, fd)
+        return len(self._closed)
+
+    def discard(self, count: int) -> None:
+        """
+        Delete the oldest closed segments.
+
+        :param count: number of segments returned by ``rotate``.
+        """
+        discarded, self._closed = self._closed[:count], self._closed[count:]
+        for path, fd in discarded:
+            path.unlink(missing_ok=True)
+            os.close(fd)
+
+    def recover(self) -> List[Record]:
+        """
+        Take over segments left by stopped workers and read them.
+
+        Recovered segments become closed segments of this log,
+        so they are deleted after the next rotation is stored.
+
+        :return: records of the recovered segments.
+        """
+        records: List[Record] = []
+        for path in sorted(self.directory.glob(f"*{SUFFIX}")):
+            try:
+                fd = os.open(path, os.O_RDWR)
+            except FileNotFoundError:
+                # Another worker stored and deleted it meanwhile.
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # The segment belongs to a running worker.
+                os.close(fd)
+                continue
+            records.extend(_read_records(path))
+            self._closed.append((path, fd))
+        return records
+
+    def lock_match(self, match_id: str) -> None:
+        """
+        Mark a match as locked for every worker.
+
+        :param match_id: id of the match.
+        """
+        path = self._marker(match_id)
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(match_id, encoding="utf-8")
+        temporary.replace(path)
+
+    def is_locked(self, match_id: str) -> bool:
+        """
+        Check whether a match was locked by any worker.
+
+        :param match_id: id of the match.
+        :return: True if the match has a marker that didn't expire.
+        """
+        try:
+            return not self._expired(self._marker(match_id))
+        except FileNotFoundError:
+            return False
+
+    def locked_matches(self) -> Set[str]:
+        """
+        Find matches locked by any worker and delete expired markers.
+
+        Only markers that weren't seen before are read.
+
+        :return: ids of locked matches.
+        """
+        locked = {}
+        for path in self.directory.glob(f"*{LOCKED_SUFFIX}"):
+            try:
+                if self._expired(path):
+                    path.unlink(missing_ok=True)
+                elif path.name in self._locked:
+                    locked[path.name] = self._locked[path.name]
+                else:
+                    locked[path.name] = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                # Another worker deleted the expired marker meanwhile.
+                continue
+        self._locked = locked
+        return set(locked.values())
+
+    def close(self) -> None:
+        """Close all segments, keeping them for recovery."""
+        for _, fd in [*self._closed, (self._path, self._fd)]:
+            os.close(fd)
+        self._closed = []
+
+    async def _sync(self) -> None:
+        await asyncio.sleep(self.commit_seconds)
+        # Records appended from now on wait for the next sync.
+        self._commit = None
+        await asyncio.to_thread(os.fsync, self._fd)
+
+    def _open(self) -> Tuple[Path, int]:
+        # Names sort in creation order. The segment is locked before it
+        # gets its name, so no other worker recovers it while it is new.
+        name = f"{time.time_ns():020d}-{os.getpid()}"
+        temporary = self.directory / f"{name}.tmp"
+        fd = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        path = temporary.with_suffix(SUFFIX)
+        temporary.rename(path)
+        return path, fd
+
+    def _expired(self, marker: Path) -> bool:
+        return time.time() - marker.stat().st_mtime >= self.lock_seconds
+
+    def _marker(self, match_id: str) -> Path:
+        # Match ids come from URLs, so they aren't used as file names.
+        name = hashlib.blake2b(match_id.encode(), digest_size=16).hexdigest()
+        return self.directory / f"{name}{LOCKED_SUFFIX}"
+
+
+def _read_records(path: Path) -> List[Record]:
+    records = []
+    for line in path.read_bytes().splitlines():
+        try:
+            records.append(orjson.loads(line))
+        except orjson.JSONDecodeError:
+            # The worker stopped in the middle of writing the line.
+            logger.warning("Skipped a torn record of %s", path)
+    return records
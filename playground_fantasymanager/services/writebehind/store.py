@@ -0,0 +1,589 @@
+"""Fantasy team store acknowledging player updates before they are stored."""
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Set, Tuple
+
+from playground_fantasymanager.exceptions.base import ConflictError, ValidationError
+from playground_fantasymanager.services.store.base import (
+    FantasyTeamStore,
+    MatchWatermark,
+    PlayersUpdate,
+    apply_player_update,
+    initial_version,
+    project_players,
+    validate_players,
+)
+from playground_fantasymanager.services.writebehind.log import Record, UpdateLog
+
+logger = logging.getLogger(__name__)
+
+# matchId and userId of buffered teams.
+UserKey = Tuple[str, str]
+# Players of a buffered update and the version it was given.
+Buffered = Tuple[List[Dict[str, Any]], int]
+# Buffered updates of teams by fantasyTeamId.
+Buffer = Dict[UserKey, Dict[str, Buffered]]
+
+
+class WriteBehindStore(FantasyTeamStore):
+    """
+    Store that buffers player updates in front of another store.
+
+    Updates of players are appended to a log, kept in memory and
+    acknowledged. A later update of a team replaces the buffered one,
+    and ``flush`` writes buffered updates to the wrapped store in one
+    bulk write per match. Reads see buffered updates.
+
+    Versions of updates are chosen when they are acknowledged and
+    written with them, so ETags stay the same when they are stored.
+    Other changes go straight to the wrapped store.
+
+    Locking a match marks it in the log for every worker. Updates of
+    a locked match are refused until the lock expires, and
+    ``flush_locked`` stores updates a worker buffered before
+    another worker locked the match.
+    """
+
+    def __init__(
+        self,
+        store: FantasyTeamStore,
+        log: UpdateLog,
+        max_pending: int,
+    ) -> None:
+        """
+        Wrap a store.
+
+        :param store: store updates are written to.
+        :param log: log of acknowledged updates.
+        :param max_pending: buffered teams that make ``full`` set.
+        """
+        self.store = store
+        self.log = log
+        self.max_pending = max_pending
+        # Set when enough teams are buffered to flush before the interval.
+        self.full = asyncio.Event()
+        self._pending: Buffer = {}
+        self._flushing: Buffer = {}
+        self._count = 0
+        # Flushes and bulk updates write to the store one at a time.
+        self._writing = asyncio.Lock()
+        # Locked matches this worker knows of.
+        self._locked: Set[str] = set()
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of teams with updates that aren't stored yet.
+
+        :return: number of teams.
+        """
+        return self._count
+
+    def recover(self) -> int:
+        """
+        Buffer updates left in the log by stopped workers.
+
+        :return: number of teams with recovered updates.
+        """
+        records = self.log.recover()
+        # Versions of records tell which update of a team is the last.
+        for record in sorted(records, key=lambda record: record["version"]):
+            key = (record["matchId"], record["userId"])
+            team_id = record["fantasyTeamId"]
+            if record["players"] is None:
+                self._forget(key, team_id)
+            else:
+                self._buffer(key, team_id, (record["players"], record["version"]))
+        return self._count
+
+    async def flush(self, match_id: Optional[str] = None) -> None:
+        """
+        Write buffered updates to the wrapped store.
+
+        Updates that fail to be written are buffered again,
+        unless the team got a newer update meanwhile. So are
+        updates the store didn't apply while it has an older
+        version of their team, and they are logged again before
+        the segments they were in are deleted.
+
+        :param match_id: write only updates of this match, None for all.
+        """
+        async with self._writing:
+            segments = None
+            if match_id is None:
+                # Later updates go to a new segment, so the current ones
+                # can be deleted once everything in them is stored.
+                segments = await self.log.rotate()
+                batch, self._pending = self._pending, {}
+            else:
+                batch = {
+                    key: self._pending.pop(key)
+                    for key in list(self._pending)
+                    if key[0] == match_id
+                }
+            self._count -= sum(len(teams) for teams in batch.values())
+            if self._count < self.max_pending:
+                self.full.clear()
+            self._flushing = batch
+            try:
+                unwritten = await self._write(batch)
+            except Exception:
+                self._rebuffer(batch)
+                raise
+            finally:
+                self._flushing = {}
+            self._rebuffer(unwritten)
+            if segments is not None:
+                self.log.append(
+                    _record(match, user_id, team_id, players, version)
+                    for (match, user_id), teams in unwritten.items()
+                    for team_id, (players, version) in teams.items()
+                )
+                await self.log.commit()
+                self.log.discard(segments)
+
+    async def lock_match(self, match_id: str) -> None:
+        """
+        Lock a match for every worker and store its buffered updates.
+
+        :param match_id: id of the match.
+        """
+        self.log.lock_match(match_id)
+        self._locked.add(match_id)
+        await self.flush(match_id)
+
+    async def flush_locked(self) -> None:
+        """
+        Store buffered updates of matches locked by any worker.
+
+        Matches whose lock expired are reopened.
+        """
+        self._locked = self.log.locked_matches()
+        buffered = {match_id for match_id, _ in self._pending}
+        for match_id in buffered & self._locked:
+            await self.flush(match_id)
+
+    async def ensure_indexes(self) -> None:
+        """Create indexes of the wrapped store."""
+        await self.store.ensure_indexes()
+
+    async def close(self) -> None:
+        """Close the log and the wrapped store, keeping buffered updates in the log."""
+        self.log.close()
+        await self.store.close()
+
+    async def insert_team(self, document: Dict[str, Any]) -> None:
+        """
+        Insert a new fantasy team.
+
+        :param document: fantasy team document.
+        """
+        await self.store.insert_team(document)
+
+    async def get_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a single fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: fantasy team document or None if it doesn't exist.
+        """
+        document = await self.store.get_team(user_id, match_id, fantasy_team_id)
+        if document is None:
+            return None
+        return self._overlay(document, match_id, user_id)
+
+    async def get_version(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> Optional[int]:
+        """
+        Find version of a single fantasy team without reading the team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: version or None if the team doesn't exist.
+        """
+        version = await self.store.get_version(user_id, match_id, fantasy_team_id)
+        if version is None:
+            return None
+        return self._version((match_id, user_id), fantasy_team_id, version)
+
+    async def list_versions(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+    ) -> List[Tuple[str, int]]:
+        """
+        Find ids and versions of the teams ``list_teams`` would return.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :return: list of fantasyTeamId and version pairs.
+        """
+        versions = await self.store.list_versions(
+            user_id,
+            match_id,
+            limit,
+            offset,
+            after,
+        )
+        key = (match_id, user_id)
+        if not self._has_buffered(key):
+            return versions
+        return [
+            (team_id, self._version(key, team_id, version))
+            for team_id, version in versions
+        ]
+
+    async def list_teams(
+        self,
+        user_id: str,
+        match_id: str,
+        limit: int,
+        offset: int = 0,
+        after: Optional[str] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find fantasy teams of a user for a match.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param limit: maximum number of teams to return.
+        :param offset: number of teams to skip.
+        :param after: return only teams with greater fantasyTeamId.
+        :param fields: player fields to return or None for all fields.
+        :return: list of fantasy team documents.
+        """
+        if not self._has_buffered((match_id, user_id)):
+            return await self.store.list_teams(
+                user_id,
+                match_id,
+                limit,
+                offset,
+                after,
+                fields,
+            )
+        # Buffered players take scored fields from the whole stored team.
+        documents = await self.store.list_teams(user_id, match_id, limit, offset, after)
+        return [
+            project_players(self._overlay(document, match_id, user_id), fields)
+            for document in documents
+        ]
+
+    async def iter_match_teams(
+        self,
+        match_id: str,
+        batch_size: int,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over fantasy teams of every user for a match.
+
+        :param match_id: id of the match.
+        :param batch_size: number of teams fetched at once.
+        :yield: fantasy team documents.
+        """
+        async for document in self.store.iter_match_teams(match_id, batch_size):
+            yield self._overlay(document, match_id, document["userId"])
+
+    async def match_watermark(self, match_id: str) -> MatchWatermark:
+        """
+        Summarize stored fantasy teams of a match to tell when they change.
+
+        Buffered updates count once they are stored.
+
+        :param match_id: id of the match.
+        :return: number of teams and sum of their versions.
+        """
+        return await self.store.match_watermark(match_id)
+
+    async def update_players(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+        players: List[Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> bool:
+        """
+        Buffer new players of a fantasy team.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :param players: new list of players.
+        :param version: new version of the team or None to increment it.
+        :return: True if the team was found and the update buffered.
+        :raises ValidationError: if the players can't be stored.
+        :raises ConflictError: if the match is locked.
+        """
+        # Acknowledged updates must be storable.
+        validate_players(players)
+        key = (match_id, user_id)
+        now = initial_version()
+        if self._buffered(key, fantasy_team_id) is None:
+            # Teams with a buffered update are known to exist.
+            stored = await self.store.get_version(user_id, match_id, fantasy_team_id)
+            if stored is None:
+                return False
+            # The store keeps only newer versions, whatever clocks of workers say.
+            now = max(now, stored + 1)
+        # Checked after the last await, so a lock can't slip in before buffering.
+        if self._is_locked(match_id):
+            raise ConflictError(
+                "Match is locked",
+                description="Fantasy teams of a locked match can't be changed",
+            )
+        if version is None:
+            version = self._next_version(key, fantasy_team_id, now)
+        self.log.append(
+            [_record(match_id, user_id, fantasy_team_id, players, version)],
+        )
+        self._buffer(key, fantasy_team_id, (players, version))
+        if self._count >= self.max_pending:
+            self.full.set()
+        # Acknowledged once the update survives a crash.
+        await self.log.commit()
+        return True
+
+    async def bulk_update_players(
+        self,
+        match_id: str,
+        updates: Sequence[PlayersUpdate],
+        versions: Optional[Sequence[int]] = None,
+    ) -> List[bool]:
+        """
+        Replace players of many fantasy teams of a match at once.
+
+        Bulk updates are already batched, so they are written through.
+        They are logged too, so updates buffered before them aren't
+        recovered over them.
+
+        :param match_id: id of the match.
+        :param updates: userId, fantasyTeamId and players of every team.
+        :param versions: new version of every team or None to increment them.
+        :return: whether each update found and updated its team.
+        :raises ValidationError: if players of a team can't be stored.
+        """
+        for _, _, players in updates:
+            validate_players(players)
+        async with self._writing:
+            if versions is None:
+                now = initial_version()
+                versions = [
+                    self._next_version((match_id, user_id), team_id, now)
+                    for user_id, team_id, _ in updates
+                ]
+            self.log.append(
+                _record(match_id, user_id, team_id, players, version)
+                for (user_id, team_id, players), version in zip(
+                    updates,
+                    versions,
+                    strict=True,
+                )
+            )
+            await self.log.commit()
+            updated = await self.store.bulk_update_players(match_id, updates, versions)
+            for (user_id, team_id, _), version in zip(updates, versions, strict=True):
+                buffered = self._buffered((match_id, user_id), team_id)
+                if buffered is not None and buffered[1] <= version:
+                    self._forget((match_id, user_id), team_id)
+            return updated
+
+    async def delete_team(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+    ) -> bool:
+        """
+        Delete a fantasy team with its buffered update.
+
+        :param user_id: id of the user.
+        :param match_id: id of the match.
+        :param fantasy_team_id: id of the fantasy team.
+        :return: True if the team was found and deleted.
+        """
+        deleted = await self.store.delete_team(user_id, match_id, fantasy_team_id)
+        key = (match_id, user_id)
+        if self._forget(key, fantasy_team_id):
+            # Recovery must not bring the update back to a recreated team.
+            self.log.append(
+                [_record(match_id, user_id, fantasy_team_id, None, initial_version())],
+            )
+            await self.log.commit()
+        return deleted
+
+    async def _write(self, batch: Buffer) -> Buffer:
+        # Returns updates that must be written again.
+        matches: Dict[str, Tuple[List[PlayersUpdate], List[int]]] = {}
+        for (match_id, user_id), teams in batch.items():
+            updates, versions = matches.setdefault(match_id, ([], []))
+            for team_id, (players, version) in teams.items():
+                updates.append((user_id, team_id, players))
+                versions.append(version)
+        unwritten: Buffer = {}
+        for match_id, (updates, versions) in matches.items():
+            try:
+                written = await self.store.bulk_update_players(
+                    match_id,
+                    updates,
+                    versions,
+                )
+            except (ValidationError, ValueError):
+                # A team the store rejects must not hold back the others.
+                written = await self._write_each(match_id, updates, versions)
+            for (user_id, team_id, players), version, is_written in zip(
+                updates,
+                versions,
+                written,
+                strict=True,
+            ):
+                if not is_written and await self._is_behind(
+                    user_id,
+                    match_id,
+                    team_id,
+                    version,
+                ):
+                    teams = unwritten.setdefault((match_id, user_id), {})
+                    teams[team_id] = (players, version)
+        return unwritten
+
+    async def _write_each(
+        self,
+        match_id: str,
+        updates: List[PlayersUpdate],
+        versions: List[int],
+    ) -> List[bool]:
+        written = []
+        for (user_id, team_id, players), version in zip(updates, versions, strict=True):
+            try:
+                written.append(
+                    await self.store.update_players(
+                        user_id,
+                        match_id,
+                        team_id,
+                        players,
+                        version,
+                    ),
+                )
+            except (ValidationError, ValueError):
+                # Writing it again would fail the same way.
+                logger.exception(
+                    "Dropped the update of fantasy team %s of user %s",
+                    team_id,
+                    user_id,
+                )
+                written.append(True)
+        return written
+
+    async def _is_behind(
+        self,
+        user_id: str,
+        match_id: str,
+        fantasy_team_id: str,
+        version: int,
+    ) -> bool:
+        # Updates of deleted teams and of teams with a newer version
+        # from another worker are dropped, others are written again.
+        stored = await self.store.get_version(user_id, match_id, fantasy_team_id)
+        return stored is not None and stored < version
+
+    def _overlay(
+        self,
+        document: Dict[str, Any],
+        match_id: str,
+        user_id: str,
+    ) -> Dict[str, Any]:
+        buffered = self._buffered((match_id, user_id), document["fantasyTeamId"])
+        if buffered is None:
+            return document
+        players, version = buffered
+        return {
+            **document,
+            **apply_player_update(document, players),
+            "version": version,
+        }
+
+    def _buffered(self, key: UserKey, fantasy_team_id: str) -> Optional[Buffered]:
+        # Updates being flushed are read until the store has them.
+        for buffer in (self._pending, self._flushing):
+            buffered = buffer.get(key, {}).get(fantasy_team_id)
+            if buffered is not None:
+                return buffered
+        return None
+
+    def _version(self, key: UserKey, fantasy_team_id: str, stored: int) -> int:
+        buffered = self._buffered(key, fantasy_team_id)
+        return stored if buffered is None else buffered[1]
+
+    def _next_version(self, key: UserKey, fantasy_team_id: str, now: int) -> int:
+        # Versions are times like those of new teams, so they don't repeat
+        # versions other workers give, and follow the buffered version.
+        buffered = self._buffered(key, fantasy_team_id)
+        return now if buffered is None else max(now, buffered[1] + 1)
+
+    def _is_locked(self, match_id: str) -> bool:
+        if match_id not in self._locked and self.log.is_locked(match_id):
+            self._locked.add(match_id)
+        return match_id in self._locked
+
+    def _rebuffer(self, batch: Buffer) -> None:
+        for key, teams in batch.items():
+            for team_id, buffered in teams.items():
+                self._buffer(key, team_id, buffered)
+
+    def _has_buffered(self, key: UserKey) -> bool:
+        return key in self._pending or key in self._flushing
+
+    def _buffer(self, key: UserKey, fantasy_team_id: str, buffered: Buffered) -> None:
+        teams = self._pending.setdefault(key, {})
+        current = teams.get(fantasy_team_id)
+        if current is None:
+            self._count += 1
+        elif current[1] > buffered[1]:
+            return
+        teams[fantasy_team_id] = buffered
+
+    def _forget(self, key: UserKey, fantasy_team_id: str) -> bool:
+        teams = self._pending.get(key, {})
+        if teams.pop(fantasy_team_id, None) is None:
+            return False
+        self._count -= 1
+        if not teams:
+            del self._pending[key]
+        return True
+
+
+def _record(
+    match_id: str,
+    user_id: str,
+    fantasy_team_id: str,
+    players: Optional[List[Dict[str, Any]]],
+    version: int,
+) -> Record:
+    # Deletions are records without players.
+    return {
+        "matchId": match_id,
+        "userId": user_id,
+        "fantasyTeamId": fantasy_team_id,
+        "players": players,
+        "version": version,
+    }
@@ -1,8 +1,10 @@
 import enum
 from pathlib import Path
 from tempfile import gettempdir
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from yarl import URL
 
 TEMP_DIR = Path(gettempdir())
 
@@ -18,6 +20,13 @@ class LogLevel(str, enum.Enum):
     FATAL = "FATAL"
 
 
+class StoreBackend(str, enum.Enum):
+    """Possible fantasy team storage backends."""
+
+    MONGO = "mongo"
+    MEMORY = "memory"
+
+
 class Settings(BaseSettings):
     """
     Application settings.
@@ -37,6 +46,136 @@ class Settings(BaseSettings):
     environment: str = "dev"
 
     log_level: LogLevel = LogLevel.INFO
+    # Write logs as JSON lines in batches from a background thread
+    log_queued: bool = False
+    # Records waiting to be written in the queued mode, more are dropped
+    log_queue_size: int = 10_000
+    # Maximum number of records written at once in the queued mode
+    log_batch_size: int = 500
+    # Identical warnings and errors logged per window in the queued mode
+    log_repeat_limit: int = 10
+    log_repeat_window: float = 60.0
+
+    # Variables for the database
+    db_host: str = "localhost"
+    db_port: int = 27017
+    db_user: Optional[str] = None
+    db_pass: Optional[str] = None
+    db_base: str = "playground_fantasymanager"
+    # Maximum number of pooled connections per worker
+    db_pool_size: int = 100
+    # Where fantasy teams are stored
+    store_backend: StoreBackend = StoreBackend.MONGO
+
+    # Seed of generated default match teams
+    default_teams_seed: int = 0
+    # Maximum number of best projected teams suggested for a match
+    suggested_teams_max: int = 20
+
+    # Cache of default match teams
+    default_teams_cache_ttl: float = 30.0
+    default_teams_cache_max_entries: int = 1024
+    default_teams_cache_max_bytes: int = 16 * 1024 * 1024
+
+    # Maximum number of fantasy teams in one bulk update
+    bulk_update_max_teams: int = 1000
+
+    # Number of fantasy teams fetched at once by exports
+    export_batch_size: int = 1000
+    # Size of chunks sent by exports
+    export_chunk_bytes: int = 64 * 1024
+
+    # Number of fantasy teams fetched at once when a live match is loaded
+    live_load_batch_size: int = 5000
+    # Publishes a live client may miss before it is dropped
+    live_max_lag: int = 50
+    # Seconds between keep-alive comments of live streams
+    live_heartbeat_seconds: float = 15.0
+    # Directory of points tables shared by workers, none keeps points per worker
+    live_shared_dir: Optional[Path] = None
+    # Players a shared points table of a match can hold
+    live_shared_players: int = 4096
+    # Seconds between checks for points changed by other workers
+    live_shared_sync_seconds: float = 0.1
+    # Seconds between checks for fantasy teams changed by other workers
+    live_refresh_seconds: float = 5.0
+    # Directory of snapshots of live matches, none loads matches from the store
+    live_snapshot_dir: Optional[Path] = None
+    # Seconds between snapshots of changed live matches
+    live_snapshot_seconds: float = 60.0
+    # Older snapshots are ignored and their matches are loaded from the store
+    live_snapshot_max_age_seconds: float = 3600.0
+
+    # Acknowledge player updates before they are stored
+    write_behind_enabled: bool = False
+    # Directory of the log of acknowledged updates that aren't stored yet
+    write_behind_dir: Path = TEMP_DIR / "playground_fantasymanager_updates"
+    # Seconds between writes of buffered updates to the store
+    write_behind_flush_seconds: float = 1.0
+    # Buffered teams that trigger a write before the interval
+    write_behind_max_pending: int = 10_000
+    # Sync the log to disk before updates are acknowledged, to survive host crashes
+    write_behind_fsync: bool = True
+    # Seconds an update waits for others to share its sync of the log
+    write_behind_commit_seconds: float = 0.001
+    # Seconds a locked match refuses updates while every worker stores its updates
+    write_behind_lock_seconds: float = 10.0
+
+    # Directory where workers share request metrics, one file per worker
+    metrics_dir: Optional[Path] = None
+    # Seconds between writes of worker metrics to the directory
+    metrics_flush_seconds: float = 5.0
+
+    # Compress responses with the best coding accepted by the client
+    compression_enabled: bool = True
+    # Smallest response body worth compressing
+    compression_minimum_size: int = 1000
+
+    # Requests per second of a user on a route, 0 disables the limit
+    rate_limit_user_per_second: float = 0.0
+    rate_limit_user_burst: int = 20
+    # Requests per second on a route from all users, 0 disables the limit
+    rate_limit_route_per_second: float = 0.0
+    rate_limit_route_burst: int = 200
+    # Requests a worker serves at once, 0 disables admission control
+    admission_max_in_flight: int = 0
+    # Share of admitted requests that may be writes, shed first under load
+    admission_write_share: float = 0.5
+    # Path prefixes that are always admitted
+    admission_exempt_paths: List[str] = ["/api/health", "/api/metrics", "/api/live/"]
+
+    # Client errors a client may cause per window before getting 429, 0 disables
+    error_rate_limit: int = 0
+    error_rate_window: float = 60.0
+
+    # OpenAPI document built ahead of time, none builds it on first request
+    openapi_file: Optional[Path] = None
+
+    # Sampling profiler, off unless enabled
+    profiling_enabled: bool = False
+    # Seconds between stack samples
+    profiling_interval_seconds: float = 0.005
+    # Request header that asks for a profile of the request
+    profiling_header: str = "X-Debug-Profile"
+    # Token required by profiler routes and the debug header, if set
+    profiling_token: Optional[str] = None
+    # Number of request profiles kept by a worker
+    profiling_max_requests: int = 100
+
+    @property
+    def db_url(self) -> URL:
+        """
+        Assemble database URL from settings.
+
+        :return: database URL.
+        """
+        return URL.build(
+            scheme="mongodb",
+            host=self.db_host,
+            port=self.db_port,
+            user=self.db_user,
+            password=self.db_pass,
+        )
 
     model_config = SettingsConfigDict(
         env_file=".env",
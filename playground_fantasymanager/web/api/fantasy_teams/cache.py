@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from playground_fantasymanager.services.compression import compress
+from playground_fantasymanager.settings import settings
+
+# Expiration time, value and the value in every requested content coding.
+Entry = Tuple[float, bytes, Dict[str, bytes]]
+
+
+class ResponseCache:
+    """
+    In-process cache for serialized responses.
+
+    Entries expire after ``ttl`` seconds and the least recently used
+    ones are evicted when there are more than ``max_entries`` of them
+    or they take more than ``max_bytes``. Concurrent misses for the same
+    key share a single computation.
+
+    Compressed values are kept with their entry, so a value is
+    compressed once per coding and expires together with its entry.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        max_bytes: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Entry]" = OrderedDict()
+        self._pending: "Dict[Hashable, asyncio.Future[bytes]]" = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """
+        Get cached value or compute it.
+
+        :param key: cache key.
+        :param factory: computes the value on a miss.
+        :return: cached or computed value.
+        """
+        value = self._lookup(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        pending = self._pending.get(key)
+        if pending is None:
+            self.misses += 1
+            pending = asyncio.ensure_future(self._fill(key, factory))
+            self._pending[key] = pending
+        else:
+            self.coalesced += 1
+        # Shielded, so a cancelled caller doesn't cancel other waiters.
+        return await asyncio.shield(pending)
+
+    def encoded(self, key: Hashable, value: bytes, encoding: str) -> bytes:
+        """
+        Get a value compressed with a content coding.
+
+        :param key: cache key.
+        :param value: value returned by ``get_or_compute`` for the key.
+        :param encoding: name of the content coding.
+        :return: compressed value, cached with the entry of the key.
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[1] is not value:
+            # The value wasn't stored or was replaced meanwhile.
+            return compress(value, encoding)
+        variants = entry[2]
+        compressed = variants.get(encoding)
+        if compressed is None:
+            compressed = variants[encoding] = compress(value, encoding)
+            self._size += len(compressed)
+            self._evict()
+        return compressed
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters.
+
+        :return: counters by name.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+    async def _fill(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        try:
+            value = await factory()
+        finally:
+            del self._pending[key]
+        self._store(key, value)
+        return value
+
+    def _lookup(self, key: Hashable) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self._clock() + self.ttl, value, {})
+        self._size += len(value)
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, value, variants = self._entries.pop(key)
+        self._size -= len(value) + sum(map(len, variants.values()))
+
+
+default_teams_cache = ResponseCache(
+    ttl=settings.default_teams_cache_ttl,
+    max_entries=settings.default_teams_cache_max_entries,
+    max_bytes=settings.default_teams_cache_max_bytes,
+)
@@ -0,0 +1,41 @@
+import hashlib
+from typing import Optional, Sequence, Tuple
+
+
+def team_etag(version: int) -> str:
+    """
+    Build ETag of a single fantasy team.
+
+    :param version: version of the team.
+    :return: strong ETag.
+    """
+    return f'"{version:x}"'
+
+
+def list_etag(entries: Sequence[Tuple[str, int]]) -> str:
+    """
+    Build ETag of a page of fantasy teams.
+
+    :param entries: fantasyTeamId and version of every team of the page.
+    :return: strong ETag.
+    """
+    digest = hashlib.blake2b(digest_size=12)
+    for fantasy_team_id, version in entries:
+        digest.update(f"{fantasy_team_id}\0{version:x}\0".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches the current ETag.
+
+    :param if_none_match: value of the If-None-Match header.
+    :param etag: current ETag of the resource.
+    :return: True if the client's copy is up to date.
+    """
+    if not if_none_match:
+        return False
+    for candidate in (value.strip() for value in if_none_match.split(",")):
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
@@ -0,0 +1,54 @@
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import orjson
+
+from .projection import get_projector
+
+
+async def export_chunks(
+    documents: AsyncIterator[Dict[str, Any]],
+    json_array: bool,
+    chunk_size: int,
+    player_fields: Optional[Tuple[str, ...]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Serialize fantasy teams into chunks of a streamed response.
+
+    Documents are pulled only when the previous chunk was sent,
+    so a slow client slows down reading from the store instead
+    of piling documents up in memory.
+
+    Teams are written like ``FantasyTeam`` with the ids of their
+    user, match and team, without internal fields.
+
+    :param documents: fantasy team documents.
+    :param json_array: write a JSON array instead of NDJSON.
+    :param chunk_size: number of bytes to collect before sending.
+    :param player_fields: player fields to keep or None for all fields.
+    :yield: chunks of the response body.
+    """
+    project = get_projector(player_fields)
+    separator = b"," if json_array else b"\n"
+    buffer = bytearray(b"[" if json_array else b"")
+    first = True
+    async for document in documents:
+        if json_array and not first:
+            buffer += separator
+        buffer += orjson.dumps(
+            {
+                "userId": document["userId"],
+                "matchId": document["matchId"],
+                "fantasyTeamId": document["fantasyTeamId"],
+                **project(document),
+            },
+        )
+        if not json_array:
+            buffer += separator
+        first = False
+        if len(buffer) >= chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+    if json_array:
+        buffer += b"]"
+    if buffer:
+        yield bytes(buffer)
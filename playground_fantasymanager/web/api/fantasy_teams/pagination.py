@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+
+from playground_fantasymanager.exceptions.base import ValidationError
+
+
+def encode_cursor(fantasy_team_id: str) -> str:
+    """
+    Build an opaque cursor pointing after a fantasy team.
+
+    :param fantasy_team_id: id of the last team of a page.
+    :return: cursor for the next page.
+    """
+    payload = json.dumps({"after": fantasy_team_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Extract the fantasy team id from a cursor.
+
+    :param cursor: cursor returned with a previous page.
+    :raises ValidationError: if the cursor is malformed.
+    :return: id of the last team of the previous page.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        after = payload["after"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        after = None
+    if not isinstance(after, str):
+        raise ValidationError(
+            "Invalid cursor",
+            description="cursor must be a value returned as next_cursor",
+            field="cursor",
+        )
+    return after
@@ -0,0 +1,67 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from playground_fantasymanager.exceptions.base import ValidationError
+
+from .schema import PlayerInfo
+
+PLAYER_FIELDS: Tuple[str, ...] = tuple(PlayerInfo.model_fields)
+
+Projector = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse the ``fields`` query parameter.
+
+    Fields are returned in the order of ``PlayerInfo``,
+    so the same set always gives the same tuple.
+
+    :param fields: comma-separated player fields.
+    :raises ValidationError: if an unknown field is requested.
+    :return: requested player fields or None for all fields.
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested.difference(PLAYER_FIELDS)
+    if unknown:
+        raise ValidationError(
+            "Unknown player fields",
+            description=f"Unknown player fields: {', '.join(sorted(unknown))}",
+            field="fields",
+        )
+    if not requested:
+        return None
+    return tuple(field for field in PLAYER_FIELDS if field in requested)
+
+
+@lru_cache(maxsize=2 ** len(PLAYER_FIELDS) + 1)
+def get_projector(fields: Optional[Tuple[str, ...]]) -> Projector:
+    """
+    Get projector of stored fantasy teams to the fields of ``FantasyTeam``.
+
+    A projector is built once per field set and cached, so a request
+    only copies the fields it asked for out of every document.
+
+    :param fields: player fields as returned by ``parse_fields``.
+    :return: function returning teams and projected players of a document.
+    """
+    if fields is None:
+        return _public_team
+
+    def project(document: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "teams": document["teams"],
+            "players": [
+                {field: player[field] for field in fields if field in player}
+                for player in document["players"]
+            ],
+        }
+
+    return project
+
+
+def _public_team(document: Dict[str, Any]) -> Dict[str, Any]:
+    # Internal fields like the version stay out of responses.
+    return {"teams": document["teams"], "players": document["players"]}
@@ -1,8 +1,23 @@
+import enum
 from typing import List, Optional
 
 from pydantic import BaseModel
 
 
+class ExportFormat(str, enum.Enum):
+    """Possible formats of fantasy team exports."""
+
+    NDJSON = "ndjson"
+    JSON = "json"
+
+
+class DefaultTeamsStrategy(str, enum.Enum):
+    """Possible ways to build default fantasy teams."""
+
+    RANDOM = "random"
+    BEST = "best"
+
+
 class TeamInfo(BaseModel):
     """Schema representing information about a team."""
 
@@ -38,6 +53,31 @@ class FantasyTeamUpdateRequest(BaseModel):
     team_id: str
 
 
+class FantasyTeamBulkUpdateItem(BaseModel):
+    """Request schema for updating one of many fantasy teams."""
+
+    user_id: str
+    fantasy_team_id: str
+    players: List[FantasyTeamUpdateRequest]
+
+
+class FantasyTeamBulkUpdateResult(BaseModel):
+    """Result of updating one of many fantasy teams."""
+
+    user_id: str
+    fantasy_team_id: str
+    updated: bool
+    error: Optional[str] = None
+
+
+class FantasyTeamBulkUpdateResponse(BaseModel):
+    """Response schema for a bulk update of fantasy teams."""
+
+    results: List[FantasyTeamBulkUpdateResult]
+    updated: int
+    failed: int
+
+
 class FantasyTeam(BaseModel):
     """Schema representing a fantasy team."""
 
@@ -56,6 +96,7 @@ class FantasyTeamFilteredFieldsResponse(BaseModel):
 
     fantasy_teams: List[FantasyTeam]  # Use List[Any] if truly dynamic
     count: int
+    next_cursor: Optional[str] = None
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,66 @@
+"""
+Serialization of stored fantasy teams straight to JSON.
+
+Stored documents already have the shape of ``FantasyTeam``, they were
+validated when they were written. Hot endpoints dump them with orjson
+instead of building Pydantic models only to serialize them again.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import orjson
+from fastapi import Response
+
+from .projection import get_projector
+
+
+def dump_team(document: Dict[str, Any]) -> bytes:
+    """
+    Serialize a single fantasy team.
+
+    :param document: fantasy team document.
+    :return: JSON bytes.
+    """
+    return orjson.dumps(get_projector(None)(document))
+
+
+def dump_teams(
+    documents: Iterable[Dict[str, Any]],
+    player_fields: Optional[Tuple[str, ...]] = None,
+    **fields: Any,
+) -> bytes:
+    """
+    Serialize a response with a list of fantasy teams.
+
+    :param documents: fantasy team documents.
+    :param player_fields: player fields to keep, None for documents
+        the store already projected.
+    :param fields: other fields of the response, like ``count``.
+    :return: JSON bytes.
+    """
+    project = get_projector(player_fields)
+    return orjson.dumps(
+        {"fantasy_teams": [project(document) for document in documents], **fields},
+    )
+
+
+def json_response(
+    content: bytes,
+    headers: Optional[Dict[str, str]] = None,
+    encoding: Optional[str] = None,
+) -> Response:
+    """
+    Wrap serialized JSON into a response.
+
+    :param content: JSON bytes.
+    :param headers: extra response headers.
+    :param encoding: content coding ``content`` is compressed with.
+    :return: response sent as is.
+    """
+    if encoding is not None:
+        headers = {
+            **(headers or {}),
+            "Content-Encoding": encoding,
+            "Vary": "Accept-Encoding",
+        }
+    return Response(content, media_type="application/json", headers=headers)
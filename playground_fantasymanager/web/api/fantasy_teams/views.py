@@ -1,54 +1,57 @@
-import secrets
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Body, Path, Query
+from fastapi import APIRouter, Body, Depends, Header, Path, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.status import HTTP_202_ACCEPTED, HTTP_304_NOT_MODIFIED
 
-from playground_fantasymanager.exceptions.base import ValidationError
+from playground_fantasymanager.exceptions.base import NotFoundError, ValidationError
+from playground_fantasymanager.services.compression import negotiate
+from playground_fantasymanager.services.generator import generate_teams, suggest_teams
+from playground_fantasymanager.services.leaderboard import LiveMatches
+from playground_fantasymanager.services.leaderboard.dependency import get_live_matches
+from playground_fantasymanager.services.push import LiveHub
+from playground_fantasymanager.services.push.dependency import get_live_hub
+from playground_fantasymanager.services.store.base import (
+    FantasyTeamStore,
+    validate_players,
+)
+from playground_fantasymanager.services.store.dependency import get_fantasy_team_store
+from playground_fantasymanager.settings import settings
 
+from .cache import default_teams_cache
+from .etag import etag_matches, list_etag, team_etag
+from .export import export_chunks
+from .pagination import decode_cursor, encode_cursor
+from .projection import parse_fields
 from .schema import (
+    DefaultTeamsStrategy,
     ErrorResponse,
+    ExportFormat,
     FantasyTeam,
+    FantasyTeamBulkUpdateItem,
+    FantasyTeamBulkUpdateResponse,
+    FantasyTeamBulkUpdateResult,
+    FantasyTeamFilteredFieldsResponse,
     FantasyTeamResponse,
     FantasyTeamUpdateRequest,
-    PlayerInfo,
-    TeamInfo,
 )
+from .serialization import dump_team, dump_teams, json_response
 
 router = APIRouter(prefix="/fTeams", tags=["Fantasy Teams"])
 
 
-def random_team(match_id: str) -> FantasyTeam:
-    """Generate a random fantasy team for a given match."""
-    sysrand = secrets.SystemRandom()
-    teams = [
-        TeamInfo(
-            team_id="t1",
-            name="Chennai Super Kings",
-            number_of_players=sysrand.randint(4, 7),
-            team_image_url="https://example.com/csk.png",
-        ),
-        TeamInfo(
-            team_id="t2",
-            name="Mumbai Indians",
-            number_of_players=sysrand.randint(4, 7),
-            team_image_url="https://example.com/mi.png",
-        ),
-    ]
-    players = [
-        PlayerInfo(
-            player_id=f"p{i}",
-            player_name=sysrand.choice(["MS Dhoni", "Rohit Sharma", "Jasprit Bumrah"]),
-            player_image_url="https://example.com/player.png",
-            is_captain=(i == 1),
-            is_vice_captain=(i == 2),
-            credits=round(sysrand.uniform(8, 11), 1),
-            points_earned=sysrand.randint(50, 150),
-            position=sysrand.choice(["wk", "bat", "bowl", "allrounder"]),
-            team_id=sysrand.choice(["t1", "t2"]),
-        )
-        for i in range(1, 12)
-    ]
-    return FantasyTeam(teams=teams, players=players)
+def _team_not_found(fantasy_team_id: str) -> NotFoundError:
+    return NotFoundError(
+        "Fantasy team not found",
+        description=f"Fantasy team {fantasy_team_id} does not exist",
+        resource_type="fantasy_team",
+        resource_id=fantasy_team_id,
+    )
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
 
 @router.get(
@@ -61,17 +64,95 @@ async def get_default_fantasy_teams(
     fields: Optional[str] = Query(None, description="Comma-separated player fields"),
     limit: int = Query(2, ge=1, le=10),
     offset: int = Query(0, ge=0),
-) -> FantasyTeamResponse:
+    strategy: DefaultTeamsStrategy = Query(
+        DefaultTeamsStrategy.RANDOM,
+        description="random teams or teams with the most projected points",
+    ),
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False),
+) -> Response:
     """Get default fantasy teams for a match."""
     if not match_id:
         raise ValidationError("matchId is required", description="Missing matchId")
-    teams = [random_team(match_id) for _ in range(limit)]
-    return FantasyTeamResponse(fantasy_teams=teams)
+    player_fields = parse_fields(fields)
+    if (
+        strategy == DefaultTeamsStrategy.BEST
+        and offset + limit > settings.suggested_teams_max
+    ):
+        raise ValidationError(
+            "Too many suggested teams",
+            description=(
+                f"At most {settings.suggested_teams_max} teams can be suggested"
+            ),
+            field="offset",
+        )
+
+    async def build() -> bytes:
+        if strategy == DefaultTeamsStrategy.BEST:
+            # Solving blocks for milliseconds, so it stays off the event loop.
+            documents = await run_in_threadpool(
+                suggest_teams,
+                match_id,
+                limit,
+                offset=offset,
+                seed=settings.default_teams_seed,
+            )
+        else:
+            documents = generate_teams(
+                match_id,
+                limit,
+                offset=offset,
+                seed=settings.default_teams_seed,
+            )
+        return dump_teams(documents, player_fields)
+
+    key = (match_id, limit, offset, player_fields, strategy)
+    content = await default_teams_cache.get_or_compute(key, build)
+    encoding = negotiate(accept_encoding) if settings.compression_enabled else None
+    if encoding is None or len(content) < settings.compression_minimum_size:
+        return json_response(content)
+    return json_response(
+        default_teams_cache.encoded(key, content, encoding),
+        encoding=encoding,
+    )
+
+
+@router.get(
+    "/matches/{matchId}/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}, "application/json": {}}},
+        400: {"model": ErrorResponse},
+    },
+)
+async def export_match_fantasy_teams(
+    match_id: str = Path(..., alias="matchId", description="Match ID"),
+    export_format: ExportFormat = Query(
+        ExportFormat.NDJSON,
+        alias="format",
+        description="ndjson for one team per line or json for a single array",
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated player fields"),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+) -> StreamingResponse:
+    """Stream fantasy teams of every user for a match."""
+    if not match_id:
+        raise ValidationError("matchId is required", description="Missing matchId")
+    player_fields = parse_fields(fields)
+    json_array = export_format == ExportFormat.JSON
+    return StreamingResponse(
+        export_chunks(
+            store.iter_match_teams(match_id, settings.export_batch_size),
+            json_array=json_array,
+            chunk_size=settings.export_chunk_bytes,
+            player_fields=player_fields,
+        ),
+        media_type="application/json" if json_array else "application/x-ndjson",
+    )
 
 
 @router.get(
     "/user/{userId}/matches/{matchId}",
-    response_model=FantasyTeamResponse,
+    response_model=FantasyTeamFilteredFieldsResponse,
     responses={400: {"model": ErrorResponse}},
 )
 async def get_user_fantasy_teams(
@@ -80,21 +161,64 @@ async def get_user_fantasy_teams(
     fields: Optional[str] = Query(None, description="Comma-separated player fields"),
     limit: int = Query(2, ge=1, le=10),
     offset: int = Query(0, ge=0),
-) -> FantasyTeamResponse:
-    """Get fantasy teams for a user and match."""
+    cursor: Optional[str] = Query(
+        None,
+        description="next_cursor of the previous page",
+    ),
+    if_none_match: Optional[str] = Header(None),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+) -> Response:
+    """
+    Get fantasy teams for a user and match.
+
+    Stored documents are written to the response as they are,
+    without building a model of every team and player.
+    """
     if not user_id or not match_id:
         raise ValidationError(
             "userId and matchId are required",
             description="Missing userId or matchId",
         )
-    teams = [random_team(match_id) for _ in range(limit)]
-    return FantasyTeamResponse(fantasy_teams=teams)
+    player_fields = parse_fields(fields)
+    after = decode_cursor(cursor) if cursor else None
+    if if_none_match:
+        # Versions are enough to tell if the page changed.
+        versions = await store.list_versions(
+            user_id,
+            match_id,
+            limit + 1,
+            offset=offset,
+            after=after,
+        )
+        etag = list_etag(versions)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+    # One extra team tells whether there is a next page.
+    documents = await store.list_teams(
+        user_id,
+        match_id,
+        limit + 1,
+        offset=offset,
+        after=after,
+        fields=player_fields,
+    )
+    etag = list_etag(
+        [(document["fantasyTeamId"], document["version"]) for document in documents],
+    )
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = encode_cursor(documents[-1]["fantasyTeamId"])
+    return json_response(
+        dump_teams(documents, count=len(documents), next_cursor=next_cursor),
+        headers={"ETag": etag},
+    )
 
 
 @router.get(
     "/user/{userId}/matches/{matchId}/fTeams/{fantasyTeamId}",
     response_model=FantasyTeam,
-    responses={400: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
 )
 async def get_single_fantasy_team(
     user_id: str = Path(..., alias="userId", description="User ID"),
@@ -105,20 +229,39 @@ async def get_single_fantasy_team(
         description="Fantasy Team ID",
     ),
     detail: bool = Query(True, description="Return detailed info"),
-) -> FantasyTeam:
+    if_none_match: Optional[str] = Header(None),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+) -> Response:
     """Get a single fantasy team for a user and match."""
     if not user_id or not match_id or not fantasy_team_id:
         raise ValidationError(
             "Missing required path parameters",
             description="userId, matchId, fantasyTeamId required",
         )
-    return random_team(match_id)
+    if if_none_match:
+        version = await store.get_version(user_id, match_id, fantasy_team_id)
+        if version is None:
+            raise _team_not_found(fantasy_team_id)
+        etag = team_etag(version)
+        if etag_matches(if_none_match, etag):
+            return _not_modified(etag)
+    document = await store.get_team(user_id, match_id, fantasy_team_id)
+    if document is None:
+        raise _team_not_found(fantasy_team_id)
+    return json_response(
+        dump_team(document),
+        headers={"ETag": team_etag(document["version"])},
+    )
 
 
 @router.put(
     "/user/{userId}/matches/{matchId}/fTeams/{fantasyTeamId}/players",
     response_model=Dict[str, str],
-    responses={400: {"model": ErrorResponse}},
+    responses={
+        400: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+        409: {"model": ErrorResponse},
+    },
 )
 async def update_fantasy_team_players(
     user_id: str = Path(..., alias="userId", description="User ID"),
@@ -132,6 +275,9 @@ async def update_fantasy_team_players(
         ...,
         description="List of player objects with updated positions",
     ),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+    live_matches: LiveMatches = Depends(get_live_matches),
+    hub: LiveHub = Depends(get_live_hub),
 ) -> Dict[str, str]:
     """Update players in a fantasy team."""
     if not user_id or not match_id or not fantasy_team_id:
@@ -139,13 +285,106 @@ async def update_fantasy_team_players(
             "Missing required path parameters",
             description="userId, matchId, fantasyTeamId required",
         )
+    validate_players(players)
+    new_players = [player.model_dump() for player in players]
+    updated = await store.update_players(
+        user_id,
+        match_id,
+        fantasy_team_id,
+        new_players,
+    )
+    if not updated:
+        raise _team_not_found(fantasy_team_id)
+    key = (user_id, fantasy_team_id)
+    hub.publish(match_id, live_matches.update_team(match_id, key, new_players))
     return {"message": "Players updated successfully"}
 
 
+@router.put(
+    "/matches/{matchId}/players",
+    response_model=FantasyTeamBulkUpdateResponse,
+    responses={400: {"model": ErrorResponse}},
+)
+async def bulk_update_fantasy_team_players(
+    match_id: str = Path(..., alias="matchId", description="Match ID"),
+    updates: List[FantasyTeamBulkUpdateItem] = Body(
+        ...,
+        description="Players of every fantasy team to update",
+    ),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+    live_matches: LiveMatches = Depends(get_live_matches),
+    hub: LiveHub = Depends(get_live_hub),
+) -> FantasyTeamBulkUpdateResponse:
+    """Update players in many fantasy teams of a match."""
+    if not match_id:
+        raise ValidationError("matchId is required", description="Missing matchId")
+    if len(updates) > settings.bulk_update_max_teams:
+        raise ValidationError(
+            "Too many fantasy teams",
+            description=(
+                f"At most {settings.bulk_update_max_teams} "
+                "fantasy teams can be updated at once"
+            ),
+        )
+    for update in updates:
+        validate_players(update.players)
+    team_updates = [
+        (
+            update.user_id,
+            update.fantasy_team_id,
+            [player.model_dump() for player in update.players],
+        )
+        for update in updates
+    ]
+    updated = await store.bulk_update_players(match_id, team_updates)
+    changed: List[Tuple[Tuple[str, str], float]] = []
+    for (user_id, fantasy_team_id, players), is_updated in zip(team_updates, updated):
+        if is_updated:
+            key = (user_id, fantasy_team_id)
+            changed += live_matches.update_team(match_id, key, players)
+    hub.publish(match_id, changed)
+    results = [
+        FantasyTeamBulkUpdateResult(
+            user_id=update.user_id,
+            fantasy_team_id=update.fantasy_team_id,
+            updated=is_updated,
+            error=None if is_updated else "Fantasy team was not updated",
+        )
+        for update, is_updated in zip(updates, updated)
+    ]
+    updated_count = sum(updated)
+    return FantasyTeamBulkUpdateResponse(
+        results=results,
+        updated=updated_count,
+        failed=len(results) - updated_count,
+    )
+
+
+@router.post(
+    "/matches/{matchId}/flush",
+    response_model=Dict[str, str],
+    status_code=HTTP_202_ACCEPTED,
+    responses={400: {"model": ErrorResponse}},
+)
+async def flush_match_fantasy_teams(
+    match_id: str = Path(..., alias="matchId", description="Match ID"),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+) -> Dict[str, str]:
+    """
+    Lock a match and store the updates of it this worker acknowledged.
+
+    Other workers store theirs within their next flush.
+    """
+    if not match_id:
+        raise ValidationError("matchId is required", description="Missing matchId")
+    await store.lock_match(match_id)
+    return {"message": "Fantasy teams are being stored"}
+
+
 @router.delete(
     "/user/{userId}/matches/{matchId}/fTeams/{fantasyTeamId}",
     response_model=Dict[str, str],
-    responses={400: {"model": ErrorResponse}},
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
 )
 async def delete_fantasy_team(
     user_id: str = Path(..., alias="userId", description="User ID"),
@@ -155,6 +394,8 @@ async def delete_fantasy_team(
         alias="fantasyTeamId",
         description="Fantasy Team ID",
     ),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+    live_matches: LiveMatches = Depends(get_live_matches),
 ) -> Dict[str, str]:
     """Delete a fantasy team."""
     if not user_id or not match_id or not fantasy_team_id:
@@ -162,4 +403,8 @@ async def delete_fantasy_team(
             "Missing required path parameters",
             description="userId, matchId, fantasyTeamId required",
         )
+    deleted = await store.delete_team(user_id, match_id, fantasy_team_id)
+    if not deleted:
+        raise _team_not_found(fantasy_team_id)
+    live_matches.remove_team(match_id, (user_id, fantasy_team_id))
     return {"message": "Fantasy team deleted successfully"}
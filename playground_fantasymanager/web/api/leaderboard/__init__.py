@@ -0,0 +1,5 @@
+"""Leaderboard API."""
+
+from playground_fantasymanager.web.api.leaderboard.views import router
+
+__all__ = ["router"]
@@ -0,0 +1,31 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class LeaderboardEntry(BaseModel):
+    """Position of a fantasy team on a leaderboard."""
+
+    rank: int
+    user_id: str
+    fantasy_team_id: str
+    points: float
+
+
+class LeaderboardResponse(BaseModel):
+    """Response schema for the top of a leaderboard."""
+
+    entries: List[LeaderboardEntry]
+    total: int
+
+
+class PointsEvent(BaseModel):
+    """Points gained or lost by players on a ball."""
+
+    points: Dict[str, float]
+
+
+class PointsEventResponse(BaseModel):
+    """Response schema for an applied points event."""
+
+    updated_teams: int
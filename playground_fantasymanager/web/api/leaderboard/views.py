@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Body, Depends, Path, Query
+
+from playground_fantasymanager.exceptions.base import NotFoundError
+from playground_fantasymanager.services.leaderboard import LiveMatches
+from playground_fantasymanager.services.leaderboard.dependency import get_live_matches
+from playground_fantasymanager.services.push import LiveHub
+from playground_fantasymanager.services.push.dependency import get_live_hub
+from playground_fantasymanager.services.store.base import FantasyTeamStore
+from playground_fantasymanager.services.store.dependency import get_fantasy_team_store
+from playground_fantasymanager.web.api.fantasy_teams.schema import ErrorResponse
+
+from .schema import (
+    LeaderboardEntry,
+    LeaderboardResponse,
+    PointsEvent,
+    PointsEventResponse,
+)
+
+router = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+
+@router.get(
+    "/matches/{matchId}",
+    response_model=LeaderboardResponse,
+    responses={400: {"model": ErrorResponse}},
+)
+async def get_leaderboard(
+    match_id: str = Path(..., alias="matchId", description="Match ID"),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    live_matches: LiveMatches = Depends(get_live_matches),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+) -> LeaderboardResponse:
+    """Get the best fantasy teams of a match."""
+    match = await live_matches.get(match_id, store)
+    entries = [
+        LeaderboardEntry(
+            rank=rank,
+            user_id=user_id,
+            fantasy_team_id=fantasy_team_id,
+            points=points,
+        )
+        for rank, (user_id, fantasy_team_id), points in match.leaderboard.top(
+            limit,
+            offset,
+        )
+    ]
+    return LeaderboardResponse(entries=entries, total=len(match.leaderboard))
+
+
+@router.get(
+    "/matches/{matchId}/user/{userId}/fTeams/{fantasyTeamId}",
+    response_model=LeaderboardEntry,
+    responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+)
+async def get_fantasy_team_rank(
+    match_id: str = Path(..., alias="matchId", description="Match ID"),
+    user_id: str = Path(..., alias="userId", description="User ID"),
+    fantasy_team_id: str = Path(
+        ...,
+        alias="fantasyTeamId",
+        description="Fantasy Team ID",
+    ),
+    live_matches: LiveMatches = Depends(get_live_matches),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+) -> LeaderboardEntry:
+    """Get rank of a fantasy team in a match."""
+    match = await live_matches.get(match_id, store)
+    key = (user_id, fantasy_team_id)
+    rank = match.leaderboard.rank(key)
+    points = match.leaderboard.score(key)
+    if rank is None or points is None:
+        raise NotFoundError(
+            "Fantasy team not found",
+            description=f"Fantasy team {fantasy_team_id} is not on the leaderboard",
+            resource_type="fantasy_team",
+            resource_id=fantasy_team_id,
+        )
+    return LeaderboardEntry(
+        rank=rank,
+        user_id=user_id,
+        fantasy_team_id=fantasy_team_id,
+        points=points,
+    )
+
+
+@router.post(
+    "/matches/{matchId}/events",
+    response_model=PointsEventResponse,
+    responses={400: {"model": ErrorResponse}},
+)
+async def apply_points_event(
+    match_id: str = Path(..., alias="matchId", description="Match ID"),
+    event: PointsEvent = Body(..., description="Point deltas of players"),
+    live_matches: LiveMatches = Depends(get_live_matches),
+    hub: LiveHub = Depends(get_live_hub),
+    store: FantasyTeamStore = Depends(get_fantasy_team_store),
+) -> PointsEventResponse:
+    """Apply point deltas of a ball to all fantasy teams of a match."""
+    match = await live_matches.get(match_id, store)
+    changed = match.apply_points(event.points)
+    hub.publish(match_id, changed)
+    return PointsEventResponse(updated_teams=len(changed))
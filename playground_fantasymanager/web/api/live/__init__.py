@@ -0,0 +1,5 @@
+"""Live updates API."""
+
+from playground_fantasymanager.web.api.live.views import router
+
+__all__ = ["router"]
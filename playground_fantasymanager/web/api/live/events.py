@@ -0,0 +1,43 @@
+import asyncio
+from typing import AsyncIterator
+
+import ujson
+
+from playground_fantasymanager.services.push import LiveHub, Subscription
+
+# Clients reconnect after this many milliseconds.
+RETRY_MS = 3000
+
+
+async def server_sent_events(
+    hub: LiveHub,
+    subscription: Subscription,
+    heartbeat: float,
+) -> AsyncIterator[bytes]:
+    """
+    Stream updates of a subscription as server-sent events.
+
+    Every event carries ``[userId, fantasyTeamId, points]`` of teams
+    changed since the previous event. A comment is sent when nothing
+    changes for ``heartbeat`` seconds to keep the connection open.
+
+    :param hub: hub the subscription belongs to.
+    :param subscription: subscription to stream.
+    :param heartbeat: seconds between keep-alive comments.
+    :yield: encoded events.
+    """
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        while True:
+            try:
+                batch = await asyncio.wait_for(subscription.next_batch(), heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if subscription.closed:
+                yield b"event: dropped\ndata: {}\n\n"
+                return
+            teams = [[*key, points] for key, points in batch.items()]  # type: ignore[misc]
+            yield b"data: " + ujson.dumps({"teams": teams}).encode() + b"\n\n"
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,49 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Path, Query
+from fastapi.responses import StreamingResponse
+
+from playground_fantasymanager.exceptions.base import ValidationError
+from playground_fantasymanager.services.push import LiveHub
+from playground_fantasymanager.services.push.dependency import get_live_hub
+from playground_fantasymanager.settings import settings
+from playground_fantasymanager.web.api.fantasy_teams.schema import ErrorResponse
+
+from .events import server_sent_events
+
+router = APIRouter(prefix="/live", tags=["Live"])
+
+
+@router.get(
+    "/matches/{matchId}/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse},
+    },
+)
+async def stream_fantasy_team_points(
+    match_id: str = Path(..., alias="matchId", description="Match ID"),
+    user_id: Optional[str] = Query(None, alias="userId", description="User ID"),
+    fantasy_team_id: Optional[str] = Query(
+        None,
+        alias="fantasyTeamId",
+        description="Fantasy Team ID, every team of the match if omitted",
+    ),
+    hub: LiveHub = Depends(get_live_hub),
+) -> StreamingResponse:
+    """Stream points of fantasy teams of a match as server-sent events."""
+    if (user_id is None) != (fantasy_team_id is None):
+        raise ValidationError(
+            "userId and fantasyTeamId go together",
+            description="Pass both userId and fantasyTeamId or neither of them",
+        )
+    team_keys = None
+    if user_id is not None and fantasy_team_id is not None:
+        team_keys = [(user_id, fantasy_team_id)]
+    subscription = hub.subscribe(match_id, team_keys)
+    return StreamingResponse(
+        server_sent_events(hub, subscription, settings.live_heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
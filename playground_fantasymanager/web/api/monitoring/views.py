@@ -1,4 +1,14 @@
-from fastapi import APIRouter
+from typing import Dict
+
+from fastapi import APIRouter, Depends, Path
+from fastapi.responses import PlainTextResponse
+
+from playground_fantasymanager.exceptions.base import ConflictError, NotFoundError
+from playground_fantasymanager.services.metrics.dependency import get_metrics
+from playground_fantasymanager.services.metrics.registry import MetricsRegistry
+from playground_fantasymanager.services.profiling import Profiler
+from playground_fantasymanager.services.profiling.dependency import get_profiler
+from playground_fantasymanager.web.api.fantasy_teams.cache import default_teams_cache
 
 router = APIRouter()
 
@@ -10,3 +20,82 @@ def health_check() -> None:
 
     It returns 200 if the project is healthy.
     """
+
+
+@router.get("/cache")
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Returns counters of in-process caches.
+
+    :returns: counters of every cache by cache name.
+    """
+    return {"default_teams": default_teams_cache.stats()}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(
+    metrics: MetricsRegistry = Depends(get_metrics),
+) -> PlainTextResponse:
+    """
+    Returns request metrics of all workers in the Prometheus format.
+
+    :param metrics: metrics of the worker.
+    :returns: metrics exposition.
+    """
+    return PlainTextResponse(
+        metrics.collect().render(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
+@router.post("/profiler/start")
+def start_profiler(profiler: Profiler = Depends(get_profiler)) -> Dict[str, float]:
+    """
+    Starts sampling stacks of the worker.
+
+    :param profiler: profiler of the worker.
+    :raises ConflictError: if the profiler is already running.
+    :returns: seconds between samples.
+    """
+    if profiler.profile is not None:
+        raise ConflictError("Profiler is already running")
+    profiler.start()
+    return {"interval_seconds": profiler.interval}
+
+
+@router.post("/profiler/stop", response_class=PlainTextResponse)
+def stop_profiler(profiler: Profiler = Depends(get_profiler)) -> PlainTextResponse:
+    """
+    Stops sampling stacks of the worker.
+
+    :param profiler: profiler of the worker.
+    :raises ConflictError: if the profiler isn't running.
+    :returns: stacks sampled since the start in the collapsed format.
+    """
+    profile = profiler.stop()
+    if profile is None:
+        raise ConflictError("Profiler is not running")
+    return PlainTextResponse(profile.collapsed())
+
+
+@router.get("/profiler/requests/{profileId}", response_class=PlainTextResponse)
+def request_profile(
+    profile_id: str = Path(..., alias="profileId", description="Profile ID"),
+    profiler: Profiler = Depends(get_profiler),
+) -> PlainTextResponse:
+    """
+    Returns stacks sampled while a profiled request was served.
+
+    :param profile_id: value of the X-Profile-Id header of the response.
+    :param profiler: profiler of the worker.
+    :raises NotFoundError: if the profile doesn't exist or was dropped.
+    :returns: stacks in the collapsed format.
+    """
+    profile = profiler.requests.get(profile_id)
+    if profile is None:
+        raise NotFoundError(
+            "Profile not found",
+            resource_type="profile",
+            resource_id=profile_id,
+        )
+    return PlainTextResponse(profile.collapsed())
@@ -1,6 +1,10 @@
+from fastapi import Depends
 from fastapi.routing import APIRouter
 
-from playground_fantasymanager.web.api import echo, monitoring
+from playground_fantasymanager.services.admission.dependency import (
+    enforce_rate_limits,
+)
+from playground_fantasymanager.web.api import echo, leaderboard, live, monitoring
 from playground_fantasymanager.web.api.fantasy_teams.views import (
     router as fantasy_teams_router,
 )
@@ -9,4 +13,8 @@ api_router = APIRouter()
 api_router.include_router(monitoring.router)
 api_router.include_router(echo.router, prefix="/echo", tags=["echo"])
 
-api_router.include_router(fantasy_teams_router)
+# Monitoring routes stay out of rate limits.
+rate_limited = [Depends(enforce_rate_limits)]
+api_router.include_router(fantasy_teams_router, dependencies=rate_limited)
+api_router.include_router(leaderboard.router, dependencies=rate_limited)
+api_router.include_router(live.router)
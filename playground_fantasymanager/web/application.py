@@ -1,10 +1,30 @@
-from importlib import metadata
-
 from fastapi import FastAPI
 from fastapi.responses import UJSONResponse
 
+from playground_fantasymanager.exceptions import register_exception_handlers
+from playground_fantasymanager.exceptions.limiter import (
+    ErrorRateLimiter,
+    ErrorRateLimitMiddleware,
+)
+from playground_fantasymanager.log import configure_logging
+from playground_fantasymanager.services.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    RateLimiter,
+)
+from playground_fantasymanager.services.compression import CompressionMiddleware
+from playground_fantasymanager.services.leaderboard import LiveMatches, LiveSnapshots
+from playground_fantasymanager.services.metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+)
+from playground_fantasymanager.services.profiling import Profiler, ProfilingMiddleware
+from playground_fantasymanager.services.push import LiveHub
+from playground_fantasymanager.services.shared import SharedMatches
+from playground_fantasymanager.settings import settings
 from playground_fantasymanager.web.api.router import api_router
 from playground_fantasymanager.web.lifespan import lifespan_setup
+from playground_fantasymanager.web.openapi import serve_openapi
 
 
 def get_app() -> FastAPI:
@@ -15,6 +35,7 @@ def get_app() -> FastAPI:
 
     :return: application.
     """
+    configure_logging()
     app = FastAPI(
         title="playground_fantasymanager",
         version="0.1.0",
@@ -25,7 +46,83 @@ def get_app() -> FastAPI:
         default_response_class=UJSONResponse,
     )
 
+    register_exception_handlers(app)
+    # Clients causing too many errors are rejected before routing.
+    if settings.error_rate_limit:
+        app.add_middleware(
+            ErrorRateLimitMiddleware,
+            limiter=ErrorRateLimiter(
+                settings.error_rate_limit,
+                settings.error_rate_window,
+            ),
+        )
+
+    # Requests over the admission limits are shed with 503 before routing.
+    app.state.admission = None
+    if settings.admission_max_in_flight:
+        app.state.admission = AdmissionController(
+            settings.admission_max_in_flight,
+            settings.admission_write_share,
+        )
+        app.add_middleware(
+            AdmissionMiddleware,
+            controller=app.state.admission,
+            exempt_paths=settings.admission_exempt_paths,
+        )
+
+    # Rate limits of users and routes, checked by API routes.
+    app.state.rate_limiter = RateLimiter(
+        settings.rate_limit_user_per_second,
+        settings.rate_limit_user_burst,
+        settings.rate_limit_route_per_second,
+        settings.rate_limit_route_burst,
+    )
+
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+        )
+
+    # Request metrics of the worker, served on /api/metrics.
+    app.state.metrics = MetricsRegistry(settings.metrics_dir)
+    app.add_middleware(MetricsMiddleware, registry=app.state.metrics)
+
+    # Nothing is profiled or checked per request unless profiling is enabled.
+    app.state.profiler = None
+    if settings.profiling_enabled:
+        app.state.profiler = Profiler(
+            settings.profiling_interval_seconds,
+            settings.profiling_max_requests,
+        )
+        app.add_middleware(
+            ProfilingMiddleware,
+            profiler=app.state.profiler,
+            header=settings.profiling_header,
+            token=settings.profiling_token,
+        )
+
+    # Scores and leaderboards of matches, loaded on first use.
+    # Points of players are shared by workers if a directory is set,
+    # and matches are restored from snapshots if theirs are usable.
+    shared = None
+    if settings.live_shared_dir is not None:
+        shared = SharedMatches(settings.live_shared_dir, settings.live_shared_players)
+    snapshots = None
+    if settings.live_snapshot_dir is not None:
+        snapshots = LiveSnapshots(
+            settings.live_snapshot_dir,
+            settings.live_snapshot_max_age_seconds,
+        )
+    app.state.live_matches = LiveMatches(
+        settings.live_load_batch_size,
+        shared,
+        snapshots,
+    )
+    app.state.live_hub = LiveHub(settings.live_max_lag)
+
     # Main router for the API.
     app.include_router(router=api_router, prefix="/api")
+    serve_openapi(app, settings.openapi_file)
 
     return app
@@ -3,6 +3,29 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI
 
+from playground_fantasymanager.services.leaderboard.lifespan import (
+    init_refresh,
+    init_snapshots,
+    shutdown_refresh,
+    shutdown_snapshots,
+)
+from playground_fantasymanager.services.metrics.lifespan import (
+    init_metrics,
+    shutdown_metrics,
+)
+from playground_fantasymanager.services.shared.lifespan import (
+    init_shared,
+    shutdown_shared,
+)
+from playground_fantasymanager.services.store.lifespan import (
+    init_store,
+    shutdown_store,
+)
+from playground_fantasymanager.services.writebehind.lifespan import (
+    init_write_behind,
+    shutdown_write_behind,
+)
+
 
 @asynccontextmanager
 async def lifespan_setup(
@@ -18,7 +41,17 @@ async def lifespan_setup(
     :return: function that actually performs actions.
     """
 
-    app.middleware_stack = None
-    app.middleware_stack = app.build_middleware_stack()
+    await init_store(app)
+    await init_write_behind(app)
+    await init_metrics(app)
+    await init_shared(app)
+    await init_snapshots(app)
+    await init_refresh(app)
 
     yield
+    await shutdown_refresh(app)
+    await shutdown_snapshots(app)
+    await shutdown_shared(app)
+    await shutdown_metrics(app)
+    await shutdown_write_behind(app)
+    await shutdown_store(app)
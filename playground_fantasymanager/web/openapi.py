@@ -0,0 +1,76 @@
+"""
+OpenAPI document of the application served as static bytes.
+
+Build the document ahead of time with
+``python -m playground_fantasymanager.web.openapi openapi.json``
+and point ``PLAYGROUND_FANTASYMANAGER_OPENAPI_FILE`` at it.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Optional
+
+import orjson
+from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+logger = logging.getLogger(__name__)
+
+
+def openapi_document(app: FastAPI) -> bytes:
+    """
+    Encode the OpenAPI document of an application.
+
+    :param app: application.
+    :return: JSON document.
+    """
+    return orjson.dumps(app.openapi())
+
+
+def serve_openapi(app: FastAPI, path: Optional[Path]) -> None:
+    """
+    Serve the OpenAPI document of an application as static bytes.
+
+    The route FastAPI adds builds the document on the first request
+    and encodes it on every request. It is replaced by one sending
+    the document built at build time, or built and encoded once on
+    the first request if there is no such document.
+
+    :param app: application.
+    :param path: document built ahead of time, if any.
+    """
+    document: Optional[bytes] = None
+    if path is not None:
+        try:
+            document = path.read_bytes()
+        except OSError as exc:
+            logger.warning("OpenAPI document %s is not used: %s", path, exc)
+
+    async def openapi(request: Request) -> Response:
+        nonlocal document
+        if document is None:
+            document = openapi_document(app)
+        return Response(document, media_type="application/json")
+
+    routes = app.router.routes
+    for index, route in enumerate(routes):
+        if isinstance(route, Route) and route.path == app.openapi_url:
+            routes[index] = Route(route.path, openapi, include_in_schema=False)
+
+
+def main() -> None:
+    """Write the OpenAPI document of the application to a file."""
+    # The application imports this module to serve the document.
+    from playground_fantasymanager.web.application import get_app
+
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("path", type=Path, help="file to write")
+    args = parser.parse_args()
+    args.path.write_bytes(openapi_document(get_app()))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ import pytest
 from fastapi import FastAPI
 from httpx import AsyncClient
 
+from playground_fantasymanager.services.store import (
+    FantasyTeamStore,
+    InMemoryFantasyTeamStore,
+)
+from playground_fantasymanager.services.store.dependency import get_fantasy_team_store
 from playground_fantasymanager.web.application import get_app
 
 
@@ -18,14 +23,28 @@ def anyio_backend() -> str:
 
 
 @pytest.fixture
-def fastapi_app() -> FastAPI:
+def fantasy_team_store() -> FantasyTeamStore:
+    """
+    Fixture for an empty fantasy team store.
+
+    :return: in-memory fantasy team store.
+    """
+    return InMemoryFantasyTeamStore()
+
+
+@pytest.fixture
+def fastapi_app(fantasy_team_store: FantasyTeamStore) -> FastAPI:
     """
     Fixture for creating FastAPI app.
 
+    :param fantasy_team_store: store for fantasy teams.
     :return: fastapi app with mocked dependencies.
     """
     application = get_app()
-    return application  # noqa: RET504
+    application.dependency_overrides[get_fantasy_team_store] = (
+        lambda: fantasy_team_store
+    )
+    return application
 
 
 @pytest.fixture
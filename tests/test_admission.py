@@ -0,0 +1,130 @@
+from typing import AsyncGenerator
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.services.admission import (
+    AdmissionController,
+    Priority,
+    TokenBuckets,
+)
+from playground_fantasymanager.settings import settings
+from playground_fantasymanager.web.application import get_app
+from tests.test_cache import FakeClock
+
+
+def test_token_buckets_refill_over_time() -> None:
+    """Checks that a bucket allows a burst and then its rate."""
+    clock = FakeClock()
+    buckets = TokenBuckets(rate=2, burst=2, clock=clock, max_keys=1)
+    assert buckets.take("a") == 0
+    assert buckets.take("a") == 0
+    assert buckets.take("a") == 0.5
+    clock.now = 0.25
+    assert buckets.take("a") == 0.25
+    clock.now = 0.75
+    assert buckets.take("a") == 0
+
+    clock.now = 10
+    assert buckets.take("b") == 0
+    # The full bucket of "a" was dropped to make room.
+    assert len(buckets) == 1
+
+
+def test_token_buckets_drop_the_least_recently_used() -> None:
+    """Checks that buckets used last are kept when there are too many."""
+    buckets = TokenBuckets(rate=1, burst=1, clock=FakeClock(), max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        buckets.take(key)
+    assert len(buckets) == 2
+    # "a" kept its empty bucket, "b" starts full again.
+    assert buckets.take("a") == 1
+    assert buckets.take("b") == 0
+
+
+def test_writes_are_shed_before_reads() -> None:
+    """Checks that writes are admitted only below their share of the limit."""
+    controller = AdmissionController(max_in_flight=2, write_share=0.5)
+    assert controller.admit(Priority.WRITE)
+    assert not controller.admit(Priority.WRITE)
+    assert controller.admit(Priority.READ)
+    assert not controller.admit(Priority.READ)
+    controller.release()
+    assert controller.admit(Priority.READ)
+    assert controller.shed == {Priority.READ: 1, Priority.WRITE: 1}
+
+
+@pytest.fixture
+async def limited_app(
+    monkeypatch: pytest.MonkeyPatch,
+    fastapi_app: FastAPI,
+) -> FastAPI:
+    """
+    App with rate limits and admission control.
+
+    :param monkeypatch: pytest monkeypatch.
+    :param fastapi_app: app with the default settings and mocked store.
+    :return: app with mocked store.
+    """
+    monkeypatch.setattr(settings, "rate_limit_user_per_second", 0.01)
+    monkeypatch.setattr(settings, "rate_limit_user_burst", 1)
+    monkeypatch.setattr(settings, "admission_max_in_flight", 2)
+    app = get_app()
+    app.dependency_overrides = fastapi_app.dependency_overrides
+    return app
+
+
+@pytest.fixture
+async def limited_client(
+    limited_app: FastAPI,
+    anyio_backend: str,
+) -> AsyncGenerator[AsyncClient, None]:
+    """
+    Client of the app with limits.
+
+    :param limited_app: app with limits.
+    :yield: client for the app.
+    """
+    async with AsyncClient(app=limited_app, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.anyio
+async def test_users_are_rate_limited_per_route(
+    limited_client: AsyncClient,
+    limited_app: FastAPI,
+) -> None:
+    """Checks that a user over the limit gets 429 and others don't."""
+
+    def url(user_id: str) -> str:
+        return limited_app.url_path_for(
+            "get_user_fantasy_teams",
+            userId=user_id,
+            matchId="m1",
+        )
+
+    assert (await limited_client.get(url("u1"))).status_code == status.HTTP_200_OK
+    response = await limited_client.get(url("u1"))
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json()["code"] == "TOO_MANY_REQUESTS"
+    assert int(response.headers["Retry-After"]) >= 99
+    assert (await limited_client.get(url("u2"))).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_overload_is_shed_except_health(
+    limited_client: AsyncClient,
+    limited_app: FastAPI,
+) -> None:
+    """Checks that requests over the admission limit get 503 at once."""
+    limited_app.state.admission.in_flight = 2
+    url = limited_app.url_path_for("get_default_fantasy_teams", matchId="m1")
+    response = await limited_client.get(url)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["code"] == "SERVICE_UNAVAILABLE"
+    assert response.headers["Retry-After"] == "1"
+    response = await limited_client.get("/api/health")
+    assert response.status_code == status.HTTP_200_OK
+    assert limited_app.state.admission.in_flight == 2
@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.web.api.fantasy_teams.cache import ResponseCache
+
+
+class FakeClock:
+    """Clock that moves only when told to."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """
+        Current time.
+
+        :return: time in seconds.
+        """
+        return self.now
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_are_coalesced() -> None:
+    """Checks that concurrent misses compute the value once."""
+    cache = ResponseCache(ttl=10, max_entries=10, max_bytes=1024)
+    calls: List[int] = []
+
+    async def factory() -> bytes:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return b"value"
+
+    values = await asyncio.gather(
+        *(cache.get_or_compute("key", factory) for _ in range(100)),
+    )
+    assert values == [b"value"] * 100
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 99
+
+
+@pytest.mark.anyio
+async def test_entries_expire() -> None:
+    """Checks that entries are computed again after ttl."""
+    clock = FakeClock()
+    cache = ResponseCache(ttl=10, max_entries=10, max_bytes=1024, clock=clock)
+
+    async def factory() -> bytes:
+        return str(clock.now).encode()
+
+    assert await cache.get_or_compute("key", factory) == b"0.0"
+    clock.now = 5
+    assert await cache.get_or_compute("key", factory) == b"0.0"
+    clock.now = 11
+    assert await cache.get_or_compute("key", factory) == b"11"
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.anyio
+async def test_least_recently_used_are_evicted() -> None:
+    """Checks that entry count and size limits evict old entries."""
+    cache = ResponseCache(ttl=10, max_entries=2, max_bytes=10)
+
+    async def factory() -> bytes:
+        return b"1234"
+
+    await cache.get_or_compute("a", factory)
+    await cache.get_or_compute("b", factory)
+    await cache.get_or_compute("a", factory)
+    await cache.get_or_compute("c", factory)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 1
+
+    await cache.get_or_compute("b", factory)
+    assert cache.stats()["misses"] == 4
+
+    cache.max_entries = 10
+    await cache.get_or_compute("d", factory)
+    assert cache.stats()["bytes"] <= 10
+
+
+@pytest.mark.anyio
+async def test_default_teams_are_cached(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """Checks that default teams are served from cache."""
+    url = fastapi_app.url_path_for(
+        "get_default_fantasy_teams",
+        matchId=uuid.uuid4().hex,
+    )
+    first = await client.get(url)
+    second = await client.get(url)
+    assert first.status_code == status.HTTP_200_OK
+    assert first.content == second.content
+
+    response = await client.get(fastapi_app.url_path_for("cache_stats"))
+    assert response.json()["default_teams"]["hits"] >= 1
@@ -0,0 +1,56 @@
+from playground_fantasymanager.services.store.compact import CompactMatchTeams
+from tests.utils import make_team
+
+
+def test_players_are_interned() -> None:
+    """Checks that teams share catalog entries of the same players."""
+    teams = CompactMatchTeams(capacity=1)
+    for i in range(5):
+        teams.insert("u1", f"f{i}", make_team(f"f{i}"), version=i)
+    assert len(teams) == 5
+    assert len(teams.catalog) == 11
+
+    document = teams.document(teams.row("u1", "f3") or 0, "m1")
+    expected = make_team("f3")
+    assert document["players"] == expected["players"]
+    assert document["teams"] == expected["teams"]
+    assert document["version"] == 3
+
+
+def test_remove_keeps_other_teams() -> None:
+    """Checks that removing a team moves the last one into its row."""
+    teams = CompactMatchTeams(capacity=2)
+    for i in range(3):
+        document = make_team(f"f{i}")
+        document["players"][0]["player_name"] = f"Captain {i}"
+        teams.insert("u1", f"f{i}", document, version=i)
+    teams.remove(teams.row("u1", "f0") or 0)
+
+    assert teams.row("u1", "f0") is None
+    assert teams.ordered_keys() == [("u1", "f1"), ("u1", "f2")]
+    assert teams.ordered_keys(after=("u1", "f1"), limit=1) == [("u1", "f2")]
+    assert teams.ordered_keys(after=("u0", "f9"), limit=1) == [("u1", "f1")]
+    row = teams.row("u1", "f2")
+    assert row is not None
+    assert teams.version(row) == 2
+    assert teams.document(row, "m1")["players"][0]["player_name"] == "Captain 2"
+    assert teams.page("u1", limit=5, offset=0, after="f1") == [row]
+
+
+def test_catalog_drops_unused_players() -> None:
+    """Checks that catalog entries go away with the last team using them."""
+    teams = CompactMatchTeams(capacity=1)
+    teams.insert("u1", "f1", make_team("f1"), version=1)
+    teams.insert("u1", "f2", make_team("f2"), version=1)
+    for points in range(10):
+        document = make_team("f1")
+        document["players"][0]["points_earned"] = float(points)
+        document["players"][1]["player_name"] = f"Renamed {points}"
+        teams.replace(teams.row("u1", "f1") or 0, document, version=2 + points)
+    assert len(teams.catalog) == 12
+
+    teams.remove(teams.row("u1", "f2") or 0)
+    assert len(teams.catalog) == 11
+    document = teams.document(teams.row("u1", "f1") or 0, "m1")
+    assert document["players"][0]["points_earned"] == 9.0
+    assert document["players"][1]["player_name"] == "Renamed 9"
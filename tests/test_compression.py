@@ -0,0 +1,110 @@
+import json
+import uuid
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.services.compression import ENCODINGS, negotiate
+from playground_fantasymanager.services.compression.codecs import StreamCompressor
+from playground_fantasymanager.services.store import FantasyTeamStore
+from playground_fantasymanager.web.api.fantasy_teams.cache import default_teams_cache
+from tests.utils import make_team
+
+
+def test_negotiate_prefers_accepted_codings() -> None:
+    """Checks that the best coding accepted by the client is chosen."""
+    assert negotiate("gzip;q=0.5, unknown") == "gzip"
+    assert negotiate("identity") is None
+    assert negotiate("*;q=0") is None
+    assert negotiate(None) is None
+    assert negotiate("gzip;q=0.2, *") == ENCODINGS[0]
+
+
+def test_streamed_chunks_can_be_decoded_as_they_arrive() -> None:
+    """Checks that every compressed chunk is flushed."""
+    compressor = StreamCompressor("gzip")
+    decompressor = zlib.decompressobj(31)
+    for chunk in (b'{"a": 1}\n', b'{"b": 2}\n'):
+        assert decompressor.decompress(compressor.compress(chunk, more=True)) == chunk
+    assert decompressor.decompress(compressor.compress(b"", more=False)) == b""
+    assert decompressor.eof
+
+
+@pytest.mark.anyio
+async def test_default_teams_are_compressed_once(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """Checks that compressed default teams are cached with their entry."""
+    url = fastapi_app.url_path_for(
+        "get_default_fantasy_teams",
+        matchId=uuid.uuid4().hex,
+    )
+    plain = await client.get(url, params={"limit": 10})
+    size = default_teams_cache.stats()["bytes"]
+
+    for encoding in ENCODINGS * 2:
+        response = await client.get(
+            url,
+            params={"limit": 10},
+            headers={"Accept-Encoding": encoding},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) < len(plain.content) // 4
+        assert response.content == plain.content
+    added = default_teams_cache.stats()["bytes"] - size
+    assert 0 < added < len(ENCODINGS) * len(plain.content) // 4
+
+    response = await client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.anyio
+async def test_compressed_responses_have_weak_etags(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that compressed bodies don't share the strong ETag of the identity."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    url = fastapi_app.url_path_for(
+        "get_single_fantasy_team",
+        userId="u1",
+        matchId="m1",
+        fantasyTeamId="f1",
+    )
+    plain = await client.get(url, headers={"Accept-Encoding": "identity"})
+    assert not plain.headers["etag"].startswith("W/")
+
+    response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f"W/{plain.headers['etag']}"
+    response = await client.get(
+        url,
+        headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["etag"] == f"W/{plain.headers['etag']}"
+
+
+@pytest.mark.anyio
+async def test_export_is_compressed_while_streamed(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that streamed responses are compressed chunk by chunk."""
+    for i in range(3):
+        await fantasy_team_store.insert_team(make_team("f1", user_id=f"u{i}"))
+    url = fastapi_app.url_path_for("export_match_fantasy_teams", matchId="m1")
+
+    response = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = response.text.splitlines()
+    assert [json.loads(line)["userId"] for line in lines] == ["u0", "u1", "u2"]
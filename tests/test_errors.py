@@ -0,0 +1,77 @@
+import json
+from typing import AsyncGenerator
+
+import pytest
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.exceptions.base import NotFoundError, ValidationError
+from playground_fantasymanager.exceptions.handlers import error_body
+from playground_fantasymanager.exceptions.limiter import ErrorRateLimiter
+from playground_fantasymanager.settings import settings
+from playground_fantasymanager.web.application import get_app
+from tests.test_cache import FakeClock
+
+
+def test_error_body_matches_error_fields() -> None:
+    """Checks that cached body prefixes are completed with descriptions."""
+    for team_id in ("f1", 'f"2'):
+        exc = NotFoundError(
+            "Fantasy team not found",
+            description=f"Fantasy team {team_id} does not exist",
+        )
+        assert json.loads(error_body(exc)) == {
+            "status_code": 404,
+            "code": "NOT_FOUND",
+            "error": "NotFoundError",
+            "message": "Fantasy team not found",
+            "description": f"Fantasy team {team_id} does not exist",
+        }
+    body = json.loads(error_body(ValidationError("matchId is required")))
+    assert body["description"] == "matchId is required"
+    assert body["error"] == "ValidationError"
+
+
+def test_error_rate_limiter_counts_clients_separately() -> None:
+    """Checks that only clients over the limit wait until the window ends."""
+    clock = FakeClock()
+    limiter = ErrorRateLimiter(limit=2, window=60, clock=clock)
+    limiter.record("a")
+    limiter.record("a")
+    limiter.record("b")
+    clock.now = 15
+    assert limiter.retry_after("a") == 45
+    assert limiter.retry_after("b") == 0
+    clock.now = 60
+    assert limiter.retry_after("a") == 0
+
+
+@pytest.fixture
+async def limited_client(
+    monkeypatch: pytest.MonkeyPatch,
+    anyio_backend: str,
+) -> AsyncGenerator[AsyncClient, None]:
+    """
+    Client of an app limiting errors of clients.
+
+    :param monkeypatch: pytest monkeypatch.
+    :yield: client for the app.
+    """
+    monkeypatch.setattr(settings, "error_rate_limit", 2)
+    app = get_app()
+    async with AsyncClient(app=app, base_url="http://test", timeout=2.0) as ac:
+        yield ac
+
+
+@pytest.mark.anyio
+async def test_clients_with_many_errors_are_rejected(
+    limited_client: AsyncClient,
+) -> None:
+    """Checks that a client gets 429 once it caused too many errors."""
+    for _ in range(2):
+        response = await limited_client.get("/api/missing")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await limited_client.get("/api/health")
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.json()["code"] == "TOO_MANY_REQUESTS"
+    assert int(response.headers["Retry-After"]) > 0
@@ -0,0 +1,326 @@
+import json
+from typing import Any, Dict
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.services.store import FantasyTeamStore
+from playground_fantasymanager.web.api.fantasy_teams.projection import get_projector
+from tests.utils import make_team
+
+
+@pytest.mark.anyio
+async def test_get_single_team(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that stored teams are returned."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    url = fastapi_app.url_path_for(
+        "get_single_fantasy_team",
+        userId="u1",
+        matchId="m1",
+        fantasyTeamId="f1",
+    )
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["players"]) == 11
+
+
+@pytest.mark.anyio
+async def test_user_teams_hide_internal_fields(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that stored documents are returned without internal fields."""
+    document = make_team("f1")
+    await fantasy_team_store.insert_team(document)
+    url = fastapi_app.url_path_for("get_user_fantasy_teams", userId="u1", matchId="m1")
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["fantasy_teams"] == [
+        {"teams": document["teams"], "players": document["players"]},
+    ]
+
+
+@pytest.mark.anyio
+async def test_get_missing_team(client: AsyncClient, fastapi_app: FastAPI) -> None:
+    """Checks that unknown teams are reported as not found."""
+    url = fastapi_app.url_path_for(
+        "get_single_fantasy_team",
+        userId="u1",
+        matchId="m1",
+        fantasyTeamId="missing",
+    )
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json()["code"] == "NOT_FOUND"
+
+
+@pytest.mark.anyio
+async def test_update_players(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that updates swap captains and keep earned points."""
+    document = make_team("f1")
+    await fantasy_team_store.insert_team(document)
+    players = [
+        {
+            key: value
+            for key, value in player.items()
+            if key not in {"credits", "points_earned"}
+        }
+        for player in document["players"]
+    ]
+    players[0]["is_captain"], players[2]["is_captain"] = False, True
+    url = fastapi_app.url_path_for(
+        "update_fantasy_team_players",
+        userId="u1",
+        matchId="m1",
+        fantasyTeamId="f1",
+    )
+    response = await client.put(url, json=players)
+    assert response.status_code == status.HTTP_200_OK
+
+    stored = await fantasy_team_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][2]["is_captain"]
+    assert stored["players"][2]["points_earned"] == 3.0
+    assert [team["number_of_players"] for team in stored["teams"]] == [6, 5]
+
+    response = await client.put(url, json=[*players, players[0]])
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert await fantasy_team_store.get_team("u1", "m1", "f1") == stored
+
+
+@pytest.mark.anyio
+async def test_delete_team(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that deleted teams are gone from the store."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    url = fastapi_app.url_path_for(
+        "delete_fantasy_team",
+        userId="u1",
+        matchId="m1",
+        fantasyTeamId="f1",
+    )
+    response = await client.delete(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert await fantasy_team_store.get_team("u1", "m1", "f1") is None
+
+    response = await client.delete(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_user_teams_pagination(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that cursors walk through all teams of a user."""
+    for i in range(5):
+        await fantasy_team_store.insert_team(make_team(f"f{i}"))
+    await fantasy_team_store.insert_team(make_team("f9", user_id="u2"))
+    url = fastapi_app.url_path_for("get_user_fantasy_teams", userId="u1", matchId="m1")
+
+    counts = []
+    params: Dict[str, Any] = {"limit": 2}
+    while True:
+        response = await client.get(url, params=params)
+        assert response.status_code == status.HTTP_200_OK
+        page = response.json()
+        counts.append(page["count"])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+    assert counts == [2, 2, 1]
+
+    response = await client.get(url, params={"limit": 2, "offset": 4})
+    assert response.json()["count"] == 1
+
+
+@pytest.mark.anyio
+async def test_user_teams_invalid_cursor(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """Checks that malformed cursors are rejected."""
+    url = fastapi_app.url_path_for("get_user_fantasy_teams", userId="u1", matchId="m1")
+    response = await client.get(url, params={"cursor": "not-a-cursor"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_user_teams_fields(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that only requested player fields are returned."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    url = fastapi_app.url_path_for("get_user_fantasy_teams", userId="u1", matchId="m1")
+    response = await client.get(url, params={"fields": "points_earned,player_id"})
+    assert response.status_code == status.HTTP_200_OK
+    team = response.json()["fantasy_teams"][0]
+    assert team["players"][0] == {"player_id": "p1", "points_earned": 1.0}
+    assert "fantasyTeamId" not in team
+
+    response = await client.get(url, params={"fields": "player_id,salary"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_default_teams_fields(client: AsyncClient, fastapi_app: FastAPI) -> None:
+    """Checks that default teams are projected to requested fields."""
+    url = fastapi_app.url_path_for("get_default_fantasy_teams", matchId="m1")
+    response = await client.get(url, params={"fields": "player_id"})
+    assert response.status_code == status.HTTP_200_OK
+    for team in response.json()["fantasy_teams"]:
+        assert all(player.keys() == {"player_id"} for player in team["players"])
+
+
+def test_projectors_are_cached_per_field_set() -> None:
+    """Checks that a field set reuses its projector, which drops internal fields."""
+    fields = ("player_id", "points_earned")
+    project = get_projector(fields)
+    assert get_projector(fields) is project
+
+    projected = project({**make_team("f1"), "version": 1})
+    assert projected.keys() == {"teams", "players"}
+    assert projected["players"][0] == {"player_id": "p1", "points_earned": 1.0}
+
+
+@pytest.mark.anyio
+async def test_default_teams_best(client: AsyncClient, fastapi_app: FastAPI) -> None:
+    """Checks that best teams are suggested up to the configured number."""
+    url = fastapi_app.url_path_for("get_default_fantasy_teams", matchId="m1")
+    response = await client.get(url, params={"strategy": "best", "limit": 3})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["fantasy_teams"]) == 3
+
+    response = await client.get(url, params={"strategy": "best", "offset": 100})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_single_team_etag(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that unchanged teams are answered with 304."""
+    document = make_team("f1")
+    await fantasy_team_store.insert_team(document)
+    url = fastapi_app.url_path_for(
+        "get_single_fantasy_team",
+        userId="u1",
+        matchId="m1",
+        fantasyTeamId="f1",
+    )
+    etag = (await client.get(url)).headers["ETag"]
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+
+    await fantasy_team_store.update_players("u1", "m1", "f1", document["players"])
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.anyio
+async def test_user_teams_etag(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that pages change ETag when one of their teams changes."""
+    for i in range(3):
+        await fantasy_team_store.insert_team(make_team(f"f{i}"))
+    url = fastapi_app.url_path_for("get_user_fantasy_teams", userId="u1", matchId="m1")
+    etag = (await client.get(url)).headers["ETag"]
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    projected = await client.get(url, params={"fields": "player_id"})
+    assert "ETag" in projected.headers
+
+    await fantasy_team_store.delete_team("u1", "m1", "f1")
+    response = await client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.anyio
+async def test_bulk_update_players(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that bulk updates report results of every team."""
+    document = make_team("f1")
+    await fantasy_team_store.insert_team(document)
+    await fantasy_team_store.insert_team(make_team("f2", user_id="u2"))
+    players = [
+        {
+            key: value
+            for key, value in player.items()
+            if key not in {"credits", "points_earned"}
+        }
+        for player in document["players"]
+    ]
+    players[0]["is_captain"] = False
+    url = fastapi_app.url_path_for("bulk_update_fantasy_team_players", matchId="m1")
+    response = await client.put(
+        url,
+        json=[
+            {"user_id": "u1", "fantasy_team_id": "f1", "players": players},
+            {"user_id": "u2", "fantasy_team_id": "f2", "players": players},
+            {"user_id": "u3", "fantasy_team_id": "f3", "players": players},
+        ],
+    )
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert [result["updated"] for result in body["results"]] == [True, True, False]
+    assert (body["updated"], body["failed"]) == (2, 1)
+
+    stored = await fantasy_team_store.get_team("u2", "m1", "f2")
+    assert stored is not None
+    assert not stored["players"][0]["is_captain"]
+
+
+@pytest.mark.anyio
+async def test_export_match_teams(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that every team of a match is exported."""
+    for i in range(3):
+        await fantasy_team_store.insert_team(make_team("f1", user_id=f"u{i}"))
+    await fantasy_team_store.insert_team(make_team("f1", match_id="m2"))
+    url = fastapi_app.url_path_for("export_match_fantasy_teams", matchId="m1")
+
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.text.splitlines()
+    assert [json.loads(line)["userId"] for line in lines] == ["u0", "u1", "u2"]
+    assert "version" not in json.loads(lines[0])
+
+    response = await client.get(url, params={"format": "json"})
+    assert len(response.json()) == 3
+
+    response = await client.get(url, params={"fields": "player_id"})
+    team = json.loads(response.text.splitlines()[0])
+    assert team["fantasyTeamId"] == "f1"
+    assert all(player.keys() == {"player_id"} for player in team["players"])
@@ -0,0 +1,88 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from playground_fantasymanager.services.generator import (
+    TeamSolver,
+    generate_teams,
+    suggest_teams,
+)
+from playground_fantasymanager.services.generator.engine import (
+    MAX_PLAYERS_PER_TEAM,
+    POSITION_LIMITS,
+    POSITIONS,
+    player_pool,
+)
+from playground_fantasymanager.services.generator.solver import (
+    CREDIT_BUDGET,
+    MIN_DIFFERENT_PLAYERS,
+)
+from playground_fantasymanager.services.scoring.engine import (
+    CAPTAIN_MULTIPLIER,
+    VICE_CAPTAIN_MULTIPLIER,
+)
+from playground_fantasymanager.web.api.fantasy_teams.schema import FantasyTeam
+
+
+def test_generated_teams_are_valid() -> None:
+    """Checks that generated teams follow the squad rules."""
+    for document in generate_teams("m1", 500):
+        team = FantasyTeam.model_validate(document)
+        positions = Counter(player.position for player in team.players)
+        for position, (low, high) in zip(POSITIONS, POSITION_LIMITS, strict=True):
+            assert low <= positions[position] <= high
+        assert len({player.player_id for player in team.players}) == 11
+        assert sum(player.is_captain for player in team.players) == 1
+        assert sum(player.is_vice_captain for player in team.players) == 1
+        assert not any(p.is_captain and p.is_vice_captain for p in team.players)
+
+        sizes = Counter(player.team_id for player in team.players)
+        assert {info.team_id: info.number_of_players for info in team.teams} == sizes
+        assert max(sizes.values()) <= MAX_PLAYERS_PER_TEAM
+
+
+def test_generated_teams_are_deterministic() -> None:
+    """Checks that a team depends only on the match, seed and offset."""
+    teams = generate_teams("m1", 40)
+    assert generate_teams("m1", 40) == teams
+    assert generate_teams("m1", 7, offset=13) == teams[13:20]
+    assert generate_teams("m2", 40) != teams
+    assert generate_teams("m1", 40, seed=1) != teams
+    assert generate_teams("m1", 0) == []
+
+
+def test_suggested_teams_are_valid_and_diverse() -> None:
+    """Checks that suggested teams follow the rules and differ enough."""
+    pool = player_pool("m1")
+    suggestions = TeamSolver(pool).suggest(5)
+    assert len(suggestions) == 5
+    points = [team_points for team_points, _ in suggestions]
+    assert points == sorted(points, reverse=True)
+    for team_points, players in suggestions:
+        rows = list(players)
+        assert pool.credits[rows].sum() <= CREDIT_BUDGET + 1e-9
+        assert np.bincount(pool.teams[rows]).max() <= MAX_PLAYERS_PER_TEAM
+        positions = np.bincount(pool.positions[rows], minlength=len(POSITIONS))
+        for count, (low, high) in zip(positions, POSITION_LIMITS, strict=True):
+            assert low <= count <= high
+        projected = pool.projected[rows]
+        assert projected[0] == projected.max()
+        assert team_points == pytest.approx(
+            projected.sum()
+            + (CAPTAIN_MULTIPLIER - 1) * projected[0]
+            + (VICE_CAPTAIN_MULTIPLIER - 1) * projected[1],
+        )
+    for i, (_, first) in enumerate(suggestions):
+        for _, second in suggestions[i + 1 :]:
+            assert len(set(first) & set(second)) <= 11 - MIN_DIFFERENT_PLAYERS
+
+
+def test_suggested_documents_have_captains() -> None:
+    """Checks that the best projected player of a suggestion is captain."""
+    for document in suggest_teams("m1", 2, offset=1):
+        team = FantasyTeam.model_validate(document)
+        captain = next(player for player in team.players if player.is_captain)
+        assert captain.points_earned == max(
+            player.points_earned or 0 for player in team.players
+        )
@@ -0,0 +1,195 @@
+import asyncio
+from pathlib import Path
+from typing import Tuple
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.services.leaderboard import Leaderboard, LiveMatches
+from playground_fantasymanager.services.shared import SharedMatches
+from playground_fantasymanager.services.store import FantasyTeamStore
+from tests.utils import make_team
+
+
+def test_ranks_follow_score_updates() -> None:
+    """Checks that ranks change with scores and ties share a rank."""
+    board: Leaderboard[str] = Leaderboard()
+    board.update_many([("a", 10), ("b", 20), ("c", 10), ("d", 5)])
+    assert [board.rank(key) for key in "abcd"] == [2, 1, 2, 4]
+
+    board.update("d", 30)
+    assert board.rank("d") == 1
+    assert board.rank("b") == 2
+    assert board.top(2) == [(1, "d", 30), (2, "b", 20)]
+
+    board.remove("d")
+    assert board.rank("d") is None
+    assert board.top(10, offset=1) == [(2, "a", 10), (2, "c", 10)]
+
+
+@pytest.mark.anyio
+async def test_points_events_rerank_teams(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that point deltas move teams on the leaderboard."""
+    for user_id, captain in (("u1", 1), ("u2", 11)):
+        document = make_team("f1", user_id=user_id)
+        for player in document["players"]:
+            player["is_captain"] = player["player_id"] == f"p{captain}"
+        await fantasy_team_store.insert_team(document)
+
+    rank_url = fastapi_app.url_path_for(
+        "get_fantasy_team_rank",
+        matchId="m1",
+        userId="u1",
+        fantasyTeamId="f1",
+    )
+    response = await client.get(rank_url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["rank"] == 2
+
+    events_url = fastapi_app.url_path_for("apply_points_event", matchId="m1")
+    response = await client.post(events_url, json={"points": {"p1": 20}})
+    assert response.json()["updated_teams"] == 2
+
+    response = await client.get(
+        fastapi_app.url_path_for("get_leaderboard", matchId="m1"),
+    )
+    entries = response.json()["entries"]
+    assert [entry["user_id"] for entry in entries] == ["u1", "u2"]
+    assert entries[0]["points"] == pytest.approx(entries[1]["points"] + 10)
+
+
+@pytest.mark.anyio
+async def test_rank_of_unknown_team(client: AsyncClient, fastapi_app: FastAPI) -> None:
+    """Checks that teams missing from the leaderboard are not found."""
+    url = fastapi_app.url_path_for(
+        "get_fantasy_team_rank",
+        matchId="m1",
+        userId="u1",
+        fantasyTeamId="f1",
+    )
+    response = await client.get(url)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_team_changes_move_teams_on_the_leaderboard(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that updated and deleted teams reach a loaded leaderboard."""
+    for user_id, captain in (("u1", 1), ("u2", 11)):
+        document = make_team("f1", user_id=user_id)
+        for player in document["players"]:
+            player["is_captain"] = player["player_id"] == f"p{captain}"
+        await fantasy_team_store.insert_team(document)
+    rank_url = fastapi_app.url_path_for(
+        "get_fantasy_team_rank",
+        matchId="m1",
+        userId="u1",
+        fantasyTeamId="f1",
+    )
+    response = await client.get(rank_url)
+    assert response.json()["rank"] == 2
+
+    players = make_team("f1")["players"]
+    for player in players:
+        player["is_captain"] = player["player_id"] == "p11"
+        del player["credits"], player["points_earned"]
+    response = await client.put(
+        fastapi_app.url_path_for(
+            "update_fantasy_team_players",
+            userId="u1",
+            matchId="m1",
+            fantasyTeamId="f1",
+        ),
+        json=players,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await client.get(rank_url)
+    assert response.json()["rank"] == 1
+
+    response = await client.delete(
+        fastapi_app.url_path_for(
+            "delete_fantasy_team",
+            userId="u2",
+            matchId="m1",
+            fantasyTeamId="f1",
+        ),
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await client.get(
+        fastapi_app.url_path_for("get_leaderboard", matchId="m1"),
+    )
+    assert response.json()["total"] == 1
+
+
+@pytest.mark.anyio
+async def test_matches_without_teams_are_not_kept(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that unknown matches take neither memory nor shared tables."""
+    tables = SharedMatches(tmp_path, capacity=64)
+    live_matches = LiveMatches(100, tables)
+    match = await live_matches.get("m1", fantasy_team_store)
+    assert not len(match.leaderboard)
+    assert not list(tmp_path.iterdir())
+
+    await fantasy_team_store.insert_team(make_team("f1"))
+    match = await live_matches.get("m1", fantasy_team_store)
+    assert len(match.leaderboard) == 1
+    assert await live_matches.get("m1", fantasy_team_store) is match
+    tables.close()
+
+
+@pytest.mark.anyio
+async def test_concurrent_loads_of_a_match_without_teams(
+    fantasy_team_store: FantasyTeamStore,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that requests waiting for an empty match all get it."""
+    watermark = fantasy_team_store.match_watermark
+
+    async def slow_watermark(match_id: str) -> Tuple[int, int]:
+        await asyncio.sleep(0.01)
+        return await watermark(match_id)
+
+    monkeypatch.setattr(fantasy_team_store, "match_watermark", slow_watermark)
+    live_matches = LiveMatches(100)
+    matches = await asyncio.gather(
+        *(live_matches.get("m1", fantasy_team_store) for _ in range(3)),
+    )
+    assert [len(match.leaderboard) for match in matches] == [0, 0, 0]
+
+
+@pytest.mark.anyio
+async def test_refresh_follows_teams_changed_in_the_store(
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that teams changed by other workers are loaded with live points."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    live_matches = LiveMatches(100)
+    match = await live_matches.get("m1", fantasy_team_store)
+    match.apply_points({"p11": 10.0})
+    assert await live_matches.refresh(fantasy_team_store) == []
+
+    await fantasy_team_store.insert_team(make_team("f2"))
+    refreshed = await live_matches.refresh(fantasy_team_store)
+    assert refreshed == [("m1", [(("u1", "f2"), 78.0)])]
+    match = await live_matches.get("m1", fantasy_team_store)
+    assert match.leaderboard.top(2) == [
+        (1, ("u1", "f1"), 78.0),
+        (1, ("u1", "f2"), 78.0),
+    ]
+
+    for fantasy_team_id in ("f1", "f2"):
+        await fantasy_team_store.delete_team("u1", "m1", fantasy_team_id)
+    assert await live_matches.refresh(fantasy_team_store) == []
+    assert await live_matches.get("m1", fantasy_team_store) is not match
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.services.push import LiveHub
+from playground_fantasymanager.web.api.live.events import server_sent_events
+
+
+@pytest.mark.anyio
+async def test_updates_are_coalesced_per_team() -> None:
+    """Checks that subscribers get only the latest totals of their teams."""
+    hub = LiveHub(max_lag=10)
+    team = hub.subscribe("m1", [("u1", "f1")])
+    match = hub.subscribe("m1")
+    other = hub.subscribe("m2")
+
+    hub.publish("m1", [(("u1", "f1"), 10.0), (("u2", "f1"), 5.0)])
+    hub.publish("m1", [(("u1", "f1"), 12.0)])
+
+    assert await team.next_batch() == {("u1", "f1"): 12.0}
+    assert await match.next_batch() == {("u1", "f1"): 12.0, ("u2", "f1"): 5.0}
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(other.next_batch(), 0.01)
+
+
+@pytest.mark.anyio
+async def test_slow_subscribers_are_dropped() -> None:
+    """Checks that subscribers missing too many publishes are closed."""
+    hub = LiveHub(max_lag=2)
+    subscription = hub.subscribe("m1")
+    for points in range(4):
+        hub.publish("m1", [(("u1", "f1"), float(points))])
+
+    assert subscription.closed
+    assert hub.stats() == {"subscriptions": 0, "dropped": 1}
+
+
+@pytest.mark.anyio
+async def test_server_sent_events() -> None:
+    """Checks that updates are encoded as server-sent events."""
+    hub = LiveHub(max_lag=10)
+    subscription = hub.subscribe("m1", [("u1", "f1")])
+    events = server_sent_events(hub, subscription, heartbeat=10)
+    assert (await events.__anext__()).startswith(b"retry:")
+
+    hub.publish("m1", [(("u1", "f1"), 42.0)])
+    event = await events.__anext__()
+    assert json.loads(event.removeprefix(b"data: ")) == {
+        "teams": [["u1", "f1", 42.0]],
+    }
+
+    await events.aclose()
+    assert hub.stats()["subscriptions"] == 0
+
+
+@pytest.mark.anyio
+async def test_stream_needs_both_team_ids(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """Checks that a team is identified by user and fantasy team ids."""
+    url = fastapi_app.url_path_for("stream_fantasy_team_points", matchId="m1")
+    response = await client.get(url, params={"userId": "u1"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,123 @@
+import io
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Generator, List
+
+import orjson
+import pytest
+from loguru import logger
+
+from playground_fantasymanager.log import (
+    InterceptHandler,
+    QueuedJsonSink,
+    RepeatLimiter,
+    use_stdlib_caller,
+)
+from tests.test_cache import FakeClock
+
+
+class BlockingStream(io.BytesIO):
+    """Stream whose first write waits until it is released."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writing = threading.Event()
+        self.released = threading.Event()
+
+    def write(self, data: Any) -> int:
+        """
+        Write data once released.
+
+        :param data: bytes to write.
+        :return: number of written bytes.
+        """
+        self.writing.set()
+        self.released.wait(timeout=5)
+        return super().write(data)
+
+
+@pytest.fixture
+def stdlib_logger() -> Generator[logging.Logger, None, None]:
+    """
+    Stdlib logger passing records to loguru.
+
+    :yield: logger.
+    """
+    logger.configure(patcher=use_stdlib_caller)
+    stdlib = logging.getLogger("tests.queued")
+    stdlib.addHandler(InterceptHandler())
+    stdlib.propagate = False
+    yield stdlib
+    stdlib.handlers = []
+    logger.configure(patcher=None)  # type: ignore[arg-type]
+
+
+def _write_lines(sink: QueuedJsonSink, log: Any) -> List[Any]:
+    handler_id = logger.add(sink.write, format="{message}")
+    try:
+        log()
+    finally:
+        logger.remove(handler_id)
+    sink.close()
+    stream = sink.stream
+    assert isinstance(stream, io.BytesIO)
+    return [orjson.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_stdlib_records_are_written_as_json(stdlib_logger: logging.Logger) -> None:
+    """Checks that records keep their stdlib caller and extra fields."""
+    sink = QueuedJsonSink(io.BytesIO(), 10, 10, RepeatLimiter(10, 60))
+
+    def log() -> None:
+        stdlib_logger.warning("Team %s not found", "f1", extra={"path": "/api/x"})
+
+    (line,) = _write_lines(sink, log)
+    assert line["message"] == "Team f1 not found"
+    assert line["level"] == "WARNING"
+    assert line["logger"] == "tests.queued"
+    assert line["function"] == "log"
+    assert line["path"] == "/api/x"
+    assert datetime.fromisoformat(line["time"]).tzinfo is not None
+
+
+def test_repeated_records_are_suppressed(stdlib_logger: logging.Logger) -> None:
+    """Checks that identical warnings beyond the limit are summarized."""
+    clock = FakeClock()
+    sink = QueuedJsonSink(io.BytesIO(), 100, 10, RepeatLimiter(2, 60, clock))
+
+    def log() -> None:
+        for _ in range(5):
+            stdlib_logger.warning("Invalid team")
+        clock.now = 61
+        stdlib_logger.warning("Invalid team")
+
+    lines = _write_lines(sink, log)
+    assert [line["message"] for line in lines] == [
+        "Invalid team",
+        "Invalid team",
+        "Suppressed 3 more records: Invalid team",
+        "Invalid team",
+    ]
+    assert lines[2]["suppressed"] == 3
+
+
+def test_full_queue_drops_records() -> None:
+    """Checks that records that don't fit the queue are dropped and counted."""
+    stream = BlockingStream()
+    sink = QueuedJsonSink(stream, 1, 10, RepeatLimiter(10, 60))
+
+    def log() -> None:
+        logger.info("first")
+        assert stream.writing.wait(timeout=5)
+        logger.info("second")
+        logger.info("third")
+        stream.released.set()
+
+    lines = _write_lines(sink, log)
+    assert sink.dropped == 1
+    assert [line["message"] for line in lines] == [
+        "first",
+        "second",
+        "Dropped 1 records, the log queue was full",
+    ]
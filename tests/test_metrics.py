@@ -0,0 +1,75 @@
+from pathlib import Path
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.services.metrics import MetricsRegistry
+
+
+@pytest.mark.anyio
+async def test_requests_are_counted_by_route(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """Checks that requests are labeled with route templates and error codes."""
+    for user_id in ("u1", "u2"):
+        url = fastapi_app.url_path_for(
+            "get_single_fantasy_team",
+            userId=user_id,
+            matchId="m1",
+            fantasyTeamId="missing",
+        )
+        response = await client.get(url)
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await client.get(fastapi_app.url_path_for("prometheus_metrics"))
+    assert response.status_code == status.HTTP_200_OK
+    text = response.text
+    route = "/api/fTeams/user/{userId}/matches/{matchId}/fTeams/{fantasyTeamId}"
+    assert f'http_requests_total{{method="GET",route="{route}",status="404"}} 2' in text
+    assert 'app_exceptions_total{code="NOT_FOUND"} 2' in text
+    assert (
+        f'http_request_duration_seconds_count{{method="GET",route="{route}"}} 2' in text
+    )
+    assert "u1" not in text
+
+
+def test_metrics_of_workers_are_merged(tmp_path: Path) -> None:
+    """Checks that a scrape sums metrics written by other workers."""
+    other = MetricsRegistry()
+    other.request_started()
+    other.request_finished("GET", "/api/health", 200, 0.002, 10)
+    (tmp_path / "1.json").write_bytes(orjson.dumps(other.snapshot()))
+
+    registry = MetricsRegistry(tmp_path)
+    registry.request_started()
+    registry.request_finished("GET", "/api/health", 200, 0.2, 5000)
+    registry.exception_raised("CONFLICT")
+    text = registry.collect().render()
+
+    labels = 'method="GET",route="/api/health"'
+    assert f'http_requests_total{{{labels},status="200"}} 2' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="0.0025"}} 1' in text
+    assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in text
+    assert f'http_response_size_bytes_bucket{{{labels},le="1000"}} 1' in text
+    assert 'app_exceptions_total{code="CONFLICT"} 1' in text
+    assert "http_requests_in_flight 0" in text
+
+
+def test_stopped_workers_have_no_requests_in_flight(tmp_path: Path) -> None:
+    """Checks that requests of a stopped worker are counted but not in flight."""
+    stopped = MetricsRegistry()
+    stopped.request_started()
+    stopped.request_started()
+    stopped.request_finished("GET", "/api/health", 200, 0.002, 10)
+    # Pids never go past 2**22 on Linux.
+    (tmp_path / f"{2**22 + 1}.json").write_bytes(orjson.dumps(stopped.snapshot()))
+
+    text = MetricsRegistry(tmp_path).collect().render()
+    assert (
+        'http_requests_total{method="GET",route="/api/health",status="200"} 1' in text
+    )
+    assert "http_requests_in_flight 0" in text
@@ -0,0 +1,283 @@
+import copy
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Set
+
+import pytest
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from playground_fantasymanager.exceptions.base import ConflictError
+from playground_fantasymanager.services.store.mongo import (
+    COLLECTION_NAME,
+    MongoFantasyTeamStore,
+)
+from tests.utils import make_team
+
+
+class FakeCollection:
+    """
+    Collection keeping documents in memory.
+
+    Only equality filters and ``$or`` of them are supported.
+    ``before_write`` runs before every write, like a concurrent
+    writer would, and operations of bulk writes whose index is
+    in ``failing`` fail with a write error.
+    """
+
+    def __init__(self) -> None:
+        self.documents: List[Dict[str, Any]] = []
+        self.before_write: Callable[[], None] = lambda: None
+        self.failing: Set[int] = set()
+
+    async def insert_one(self, document: Dict[str, Any]) -> None:
+        """
+        Insert a document.
+
+        :param document: document to insert.
+        """
+        self.documents.append(copy.deepcopy(document))
+
+    async def find_one(
+        self,
+        query: Dict[str, Any],
+        projection: Dict[str, int],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the first matching document.
+
+        :param query: equality filter.
+        :param projection: ignored, whole documents are returned.
+        :return: copy of the document or None.
+        """
+        return next(map(copy.deepcopy, self._find(query)), None)
+
+    def find(self, query: Dict[str, Any], projection: Dict[str, int]) -> "_Cursor":
+        """
+        Find matching documents.
+
+        :param query: equality filter.
+        :param projection: ignored, whole documents are returned.
+        :return: cursor over copies of the documents.
+        """
+        return _Cursor([copy.deepcopy(document) for document in self._find(query)])
+
+    async def update_one(
+        self,
+        query: Dict[str, Any],
+        update: Dict[str, Any],
+    ) -> SimpleNamespace:
+        """
+        Update the first matching document.
+
+        :param query: equality filter.
+        :param update: ``$set`` and ``$inc`` of fields.
+        :return: result with the number of matched documents.
+        """
+        self.before_write()
+        return SimpleNamespace(matched_count=self._update(query, update))
+
+    async def bulk_write(
+        self,
+        operations: List[UpdateOne],
+        ordered: bool,
+    ) -> SimpleNamespace:
+        """
+        Apply updates, reporting those that fail like the server does.
+
+        :param operations: updates of single documents.
+        :param ordered: ignored, every operation is tried.
+        :return: result with the number of matched documents.
+        :raises BulkWriteError: if an operation failed.
+        """
+        self.before_write()
+        matched = 0
+        errors = []
+        for index, operation in enumerate(operations):
+            if index in self.failing:
+                errors.append({"index": index, "code": 2, "errmsg": "failed"})
+                continue
+            matched += self._update(
+                operation._filter,  # noqa: SLF001
+                operation._doc,  # noqa: SLF001
+            )
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nMatched": matched})
+        return SimpleNamespace(matched_count=matched)
+
+    def _find(self, query: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        return (document for document in self.documents if _matches(document, query))
+
+    def _update(self, query: Dict[str, Any], update: Dict[str, Any]) -> int:
+        for document in self._find(query):
+            document.update(copy.deepcopy(update.get("$set", {})))
+            for field, increment in update.get("$inc", {}).items():
+                document[field] += increment
+            return 1
+        return 0
+
+
+class _Cursor:
+    def __init__(self, documents: List[Dict[str, Any]]) -> None:
+        self._documents = documents
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        for document in self._documents:
+            yield document
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    return all(
+        (
+            any(_matches(document, option) for option in value)
+            if field == "$or"
+            else document.get(field) == value
+        )
+        for field, value in query.items()
+    )
+
+
+def _players(captain: int) -> List[Dict[str, Any]]:
+    players = make_team("f1")["players"]
+    for player in players:
+        player["is_captain"] = player["player_id"] == f"p{captain}"
+        del player["credits"], player["points_earned"]
+    return players
+
+
+@pytest.fixture
+def collection() -> FakeCollection:
+    """
+    Fixture for an empty fake collection.
+
+    :return: fake collection.
+    """
+    return FakeCollection()
+
+
+@pytest.fixture
+async def mongo_store(collection: FakeCollection) -> MongoFantasyTeamStore:
+    """
+    Fixture for a mongo store with teams f1 and f2 of match m1.
+
+    :param collection: collection of the store.
+    :return: mongo fantasy team store.
+    """
+    client: Any = {"fantasy": {COLLECTION_NAME: collection}}
+    store = MongoFantasyTeamStore(client, "fantasy")
+    for fantasy_team_id in ("f1", "f2"):
+        await store.insert_team(make_team(fantasy_team_id))
+    return store
+
+
+def _bump(collection: FakeCollection, fantasy_team_id: str, updates: int = 1) -> None:
+    # Acts like another worker updating the team.
+    for document in collection.documents:
+        if document["fantasyTeamId"] == fantasy_team_id:
+            document["version"] += updates
+
+
+@pytest.mark.anyio
+async def test_updates_retry_lost_races(
+    collection: FakeCollection,
+    mongo_store: MongoFantasyTeamStore,
+) -> None:
+    """Checks that an update read again after losing a race is applied."""
+    version = await mongo_store.get_version("u1", "m1", "f1")
+    assert version is not None
+    races = iter([True])
+    collection.before_write = lambda: next(races, False) and _bump(collection, "f1")
+
+    assert await mongo_store.update_players("u1", "m1", "f1", _players(4))
+    stored = await mongo_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][3]["is_captain"]
+    assert stored["version"] == version + 2
+
+
+@pytest.mark.anyio
+async def test_updates_losing_every_race_conflict(
+    collection: FakeCollection,
+    mongo_store: MongoFantasyTeamStore,
+) -> None:
+    """Checks that an update losing every race raises a conflict."""
+    collection.before_write = lambda: _bump(collection, "f1")
+
+    with pytest.raises(ConflictError):
+        await mongo_store.update_players("u1", "m1", "f1", _players(4))
+    stored = await mongo_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][0]["is_captain"]
+
+
+@pytest.mark.anyio
+async def test_explicit_versions_apply_only_if_newer(
+    mongo_store: MongoFantasyTeamStore,
+) -> None:
+    """Checks that explicit versions don't replace the same or a newer version."""
+    versions = [
+        await mongo_store.get_version("u1", "m1", fantasy_team_id)
+        for fantasy_team_id in ("f1", "f2")
+    ]
+    assert None not in versions
+    first, second = versions
+
+    assert not await mongo_store.update_players(
+        "u1",
+        "m1",
+        "f1",
+        _players(4),
+        version=first,
+    )
+    assert await mongo_store.bulk_update_players(
+        "m1",
+        [("u1", "f1", _players(4)), ("u1", "f2", _players(4))],
+        versions=[first - 1, second + 1],
+    ) == [False, True]
+    assert await mongo_store.get_version("u1", "m1", "f2") == second + 1
+
+
+@pytest.mark.anyio
+async def test_bulk_write_errors_fail_their_teams(
+    collection: FakeCollection,
+    mongo_store: MongoFantasyTeamStore,
+) -> None:
+    """Checks that teams whose write failed are reported as not updated."""
+    collection.failing = {0}
+
+    assert await mongo_store.bulk_update_players(
+        "m1",
+        [("u1", "f1", _players(4)), ("u1", "f2", _players(4))],
+    ) == [False, True]
+    for fantasy_team_id, captain in (("f1", False), ("f2", True)):
+        stored = await mongo_store.get_team("u1", "m1", fantasy_team_id)
+        assert stored is not None
+        assert stored["players"][3]["is_captain"] is captain
+
+
+@pytest.mark.anyio
+async def test_bulk_write_errors_check_other_teams(
+    collection: FakeCollection,
+    mongo_store: MongoFantasyTeamStore,
+) -> None:
+    """Checks that teams changed meanwhile are not updated when others fail."""
+    collection.failing = {0}
+    collection.before_write = lambda: _bump(collection, "f2", updates=2)
+
+    assert await mongo_store.bulk_update_players(
+        "m1",
+        [("u1", "f1", _players(4)), ("u1", "f2", _players(4))],
+    ) == [False, False]
+
+
+@pytest.mark.anyio
+async def test_bulk_updates_of_a_team_apply_the_last(
+    mongo_store: MongoFantasyTeamStore,
+) -> None:
+    """Checks that only the last of repeated updates of a team is reported."""
+    assert await mongo_store.bulk_update_players(
+        "m1",
+        [("u1", "f1", _players(4)), ("u1", "f1", _players(5))],
+    ) == [False, True]
+    stored = await mongo_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][4]["is_captain"]
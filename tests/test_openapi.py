@@ -0,0 +1,45 @@
+from pathlib import Path
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.settings import settings
+from playground_fantasymanager.web.application import get_app
+from playground_fantasymanager.web.openapi import openapi_document
+
+
+@pytest.mark.anyio
+async def test_openapi_document_is_built_once(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """Checks that the document is encoded on first request and then reused."""
+    url = fastapi_app.url_path_for("openapi")
+    first = await client.get(url)
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json() == fastapi_app.openapi()
+
+    fastapi_app.openapi_schema = {"changed": True}
+    assert (await client.get(url)).content == first.content
+
+
+@pytest.mark.anyio
+async def test_prebuilt_openapi_document_is_served(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that a document built ahead of time is served as it is."""
+    path = tmp_path / "openapi.json"
+    path.write_bytes(openapi_document(get_app()))
+    monkeypatch.setattr(settings, "openapi_file", path)
+    app = get_app()
+
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        response = await client.get(app.url_path_for("openapi"))
+        docs = await client.get(app.url_path_for("swagger_ui_html"))
+    assert response.content == path.read_bytes()
+    assert orjson.loads(response.content) == app.openapi()
+    assert docs.status_code == status.HTTP_200_OK
@@ -0,0 +1,134 @@
+import threading
+import time
+from typing import AsyncGenerator, List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.services.profiling import Profiler
+from playground_fantasymanager.settings import settings
+from playground_fantasymanager.web.application import get_app
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_profiler_samples_running_code() -> None:
+    """Checks that stacks of busy code are sampled until the profile stops."""
+    profiler = Profiler(interval=0.001, max_requests=1)
+    profiler.start()
+    _busy(0.1)
+    profile = profiler.stop()
+
+    assert profile is not None
+    assert profile.samples > 0
+    assert any(
+        stack.startswith("MainThread;") and "_busy (" in stack
+        for stack in profile.collapsed().splitlines()
+    )
+    assert profiler.stop() is None
+
+    first = profiler.start_request()
+    profiler.stop_request(first)
+    second = profiler.start_request()
+    profiler.stop_request(second)
+    assert list(profiler.requests) == [second]
+
+
+def test_restarted_profiler_samples_from_one_thread(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that a sampler stopped while sampling ends when a new one starts."""
+    profiler = Profiler(interval=0.001, max_requests=1)
+    sampling, resume = threading.Event(), threading.Event()
+
+    def sample() -> List[str]:
+        sampling.set()
+        resume.wait()
+        return []
+
+    monkeypatch.setattr(profiler, "sample", sample)
+    profiler.start()
+    assert sampling.wait(1.0)
+    profiler.stop()
+    profiler.start()
+    resume.set()
+    time.sleep(0.1)
+    samplers = [t for t in threading.enumerate() if t.name == "stack-sampler"]
+    assert len(samplers) == 1
+
+    profiler.stop()
+    samplers[0].join(1.0)
+    assert not samplers[0].is_alive()
+
+
+@pytest.fixture
+async def profiled_client(
+    monkeypatch: pytest.MonkeyPatch,
+    anyio_backend: str,
+) -> AsyncGenerator[AsyncClient, None]:
+    """
+    Client of an app with profiling enabled.
+
+    :param monkeypatch: pytest monkeypatch.
+    :yield: client for the app.
+    """
+    monkeypatch.setattr(settings, "profiling_enabled", True)
+    monkeypatch.setattr(settings, "profiling_token", "secret")
+    app = get_app()
+    async with AsyncClient(app=app, base_url="http://test", timeout=2.0) as ac:
+        yield ac
+
+
+@pytest.mark.anyio
+async def test_profiler_routes(profiled_client: AsyncClient) -> None:
+    """Checks starting and stopping the profiler and request profiles."""
+    token = {"X-Profiler-Token": "secret"}
+    response = await profiled_client.post("/api/profiler/start")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await profiled_client.post("/api/profiler/start", headers=token)
+    assert response.status_code == status.HTTP_200_OK
+    response = await profiled_client.post("/api/profiler/start", headers=token)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    response = await profiled_client.post("/api/profiler/stop", headers=token)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+
+    response = await profiled_client.get(
+        "/api/health",
+        headers={"X-Debug-Profile": "wrong"},
+    )
+    assert "X-Profile-Id" not in response.headers
+    response = await profiled_client.get(
+        "/api/health",
+        headers={"X-Debug-Profile": "secret"},
+    )
+    profile_id = response.headers["X-Profile-Id"]
+    response = await profiled_client.get(
+        f"/api/profiler/requests/{profile_id}",
+        headers=token,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await profiled_client.get(
+        "/api/profiler/requests/missing",
+        headers=token,
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.anyio
+async def test_profiler_is_disabled_by_default(
+    client: AsyncClient,
+    fastapi_app: FastAPI,
+) -> None:
+    """Checks that profiler routes don't exist when profiling is off."""
+    response = await client.post(fastapi_app.url_path_for("start_profiler"))
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    response = await client.get("/api/health", headers={"X-Debug-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from playground_fantasymanager.services.scoring import MatchScorer
+
+PLAYERS = [f"p{i}" for i in range(11)]
+
+
+def test_totals_use_captain_multipliers() -> None:
+    """Checks that captains and vice captains get their multipliers."""
+    scorer = MatchScorer(capacity=1)
+    scorer.add_team("a", PLAYERS, captain_id="p0", vice_captain_id="p1")
+    scorer.add_team("b", PLAYERS[::-1], captain_id="p10", vice_captain_id="p9")
+    for player_id in PLAYERS:
+        scorer.set_points(player_id, 10)
+
+    np.testing.assert_allclose(scorer.totals(), [125, 125])
+
+    scorer.apply_events({"p0": 4, "p10": -2})
+    np.testing.assert_allclose(scorer.totals(), [125 + 8 - 2, 125 + 4 - 4])
+    assert scorer.team_total("a") == pytest.approx(131)
+
+
+def test_remove_team_keeps_other_teams() -> None:
+    """Checks that removing a team doesn't change totals of others."""
+    scorer = MatchScorer(capacity=2)
+    for key in range(5):
+        scorer.add_team(key, PLAYERS, captain_id=PLAYERS[key])
+    scorer.set_points("p2", 1)
+
+    scorer.remove_team(0)
+    assert sorted(scorer.team_keys) == [1, 2, 3, 4]
+    assert scorer.team_total(2) == pytest.approx(2)
+    assert scorer.team_total(4) == pytest.approx(1)
+
+
+def test_teams_with_players() -> None:
+    """Checks that teams are found by their players."""
+    scorer = MatchScorer()
+    scorer.add_team("a", PLAYERS)
+    scorer.add_team("b", [f"q{i}" for i in range(11)])
+    assert scorer.teams_with_players(["q3", "unknown"]).tolist() == [False, True]
+
+
+def test_team_must_have_eleven_players() -> None:
+    """Checks that incomplete teams are rejected."""
+    with pytest.raises(ValueError, match="11 players"):
+        MatchScorer().add_team("a", PLAYERS[:10])
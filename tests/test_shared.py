@@ -0,0 +1,85 @@
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from playground_fantasymanager.exceptions.base import ValidationError
+from playground_fantasymanager.services.leaderboard import LiveMatches
+from playground_fantasymanager.services.shared import SharedMatches, SharedPoints
+from playground_fantasymanager.services.store import FantasyTeamStore
+from tests.utils import make_team
+
+
+def _add_points(path: Path) -> None:
+    table = SharedPoints(path, capacity=8)
+    table.add({"p1": 5.0, "p9": 1.0})
+    table.close()
+
+
+def test_points_are_shared_by_processes(tmp_path: Path) -> None:
+    """Checks that points written by one process are read by another."""
+    path = tmp_path / "m1.points"
+    table = SharedPoints(path, capacity=8)
+    table.setdefault({"p1": 10.0, "p2": 3.0})
+
+    process = multiprocessing.get_context("spawn").Process(
+        target=_add_points,
+        args=(path,),
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    sequence, points = table.read(
+        lambda ids, values: dict(zip(ids.tolist(), values.tolist(), strict=True)),
+    )
+    assert points == {b"p1": 15.0, b"p2": 3.0, b"p9": 1.0}
+    assert sequence == table.sequence
+    assert sequence % 2 == 0
+    table.close()
+
+
+def test_failed_writes_leave_the_table_unchanged(tmp_path: Path) -> None:
+    """Checks that players are validated before the table is changed."""
+    table = SharedPoints(tmp_path / "m1.points", capacity=2)
+    sequence = table.setdefault({"p1": 1.0})
+    assert table.setdefault({"p1": 7.0}) == sequence
+
+    with pytest.raises(ValidationError):
+        table.add({"p1": 1.0, "p2": 1.0, "p3": 1.0})
+    with pytest.raises(ValidationError):
+        table.add({"x" * 33: 1.0})
+
+    assert table.sequence == sequence
+    assert table.read(lambda ids, points: points.tolist())[1] == [1.0]
+    table.close()
+
+
+@pytest.mark.anyio
+async def test_workers_follow_points_of_each_other(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that an event applied by one worker reranks teams of another."""
+    for user_id, captain in (("u1", 1), ("u2", 11)):
+        document = make_team("f1", user_id=user_id)
+        for player in document["players"]:
+            player["is_captain"] = player["player_id"] == f"p{captain}"
+        await fantasy_team_store.insert_team(document)
+    first_tables = SharedMatches(tmp_path, capacity=64)
+    second_tables = SharedMatches(tmp_path, capacity=64)
+    first = LiveMatches(100, first_tables)
+    second = LiveMatches(100, second_tables)
+    first_match = await first.get("m1", fantasy_team_store)
+    second_match = await second.get("m1", fantasy_team_store)
+    assert second.sync() == []
+
+    changed = first_match.apply_points({"p1": 20.0})
+    assert len(changed) == 2
+    assert second.sync() == [("m1", changed)]
+    assert second_match.leaderboard.top(2) == first_match.leaderboard.top(2)
+    assert second_match.leaderboard.rank(("u1", "f1")) == 1
+
+    assert first_match.sync() == []
+    first_tables.close()
+    second_tables.close()
@@ -0,0 +1,112 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from playground_fantasymanager.services.leaderboard import LiveMatches, LiveSnapshots
+from playground_fantasymanager.services.leaderboard.snapshot import (
+    HEADER,
+    dump_snapshot,
+    load_snapshot,
+)
+from playground_fantasymanager.services.scoring import MatchScorer
+from playground_fantasymanager.services.store import (
+    FantasyTeamStore,
+    InMemoryFantasyTeamStore,
+)
+from tests.utils import make_team
+
+
+def _scorer() -> MatchScorer:
+    scorer = MatchScorer()
+    for user_id in ("u1", "u2", "u3"):
+        scorer.add_document((user_id, "f1"), make_team("f1", user_id=user_id))
+    scorer.set_points("p1", 40.0)
+    return scorer
+
+
+def test_snapshots_restore_scorers(tmp_path: Path) -> None:
+    """Checks that a mapped snapshot scores like the scorer it was taken of."""
+    scorer = _scorer()
+    path = tmp_path / "m1.snapshot"
+    path.write_bytes(dump_snapshot("m1", scorer, (3, 42)))
+
+    match_id, restored, watermark = load_snapshot(path, max_age=60)
+    assert match_id == "m1"
+    assert watermark == (3, 42)
+    assert restored.team_keys == scorer.team_keys
+    np.testing.assert_allclose(restored.totals(), scorer.totals())
+
+    # Changes stay in the worker, the file is mapped copy-on-write.
+    restored.apply_events({"p1": 10.0, "p99": 1.0})
+    restored.add_team(("u4", "f1"), [f"p{i}" for i in range(1, 12)])
+    assert len(restored) == 4
+    _, again, _ = load_snapshot(path, max_age=60)
+    np.testing.assert_allclose(again.totals(), scorer.totals())
+
+
+def test_unusable_snapshots_are_ignored(tmp_path: Path) -> None:
+    """Checks that corrupt and old snapshots aren't used."""
+    snapshots = LiveSnapshots(tmp_path, max_age=60)
+    assert snapshots.load("m1") is None
+
+    snapshot = bytearray(dump_snapshot("m1", _scorer(), (3, 0)))
+    snapshot[HEADER.itemsize] ^= 1
+    snapshots.save("m1", bytes(snapshot))
+    assert snapshots.load("m1") is None
+
+    snapshots.save("m1", dump_snapshot("m1", _scorer(), (3, 0)))
+    assert snapshots.load("m1") is not None
+    assert LiveSnapshots(tmp_path, max_age=-1).load("m1") is None
+
+
+@pytest.mark.anyio
+async def test_live_matches_restart_warm(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that live matches are restored from snapshots of changed matches."""
+    for user_id in ("u1", "u2"):
+        await fantasy_team_store.insert_team(make_team("f1", user_id=user_id))
+    snapshots = LiveSnapshots(tmp_path, max_age=60)
+    live_matches = LiveMatches(100, snapshots=snapshots)
+    match = await live_matches.get("m1", fantasy_team_store)
+    match.apply_points({"p11": 30.0})
+    await live_matches.get("m2", fantasy_team_store)
+
+    dumped = live_matches.dump_changed()
+    assert [match_id for match_id, _ in dumped] == ["m1"]
+    assert live_matches.dump_changed() == []
+    for match_id, snapshot in dumped:
+        snapshots.save(match_id, snapshot)
+
+    restarted = LiveMatches(100, snapshots=snapshots)
+    assert await restarted.restore_all(fantasy_team_store) == 1
+    assert restarted.dump_changed() == []
+    restored = await restarted.get("m1", InMemoryFantasyTeamStore())
+    assert restored.leaderboard.top(2) == match.leaderboard.top(2)
+
+
+@pytest.mark.anyio
+async def test_snapshots_of_changed_teams_are_reconciled(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that teams changed after a snapshot come from the store."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    snapshots = LiveSnapshots(tmp_path, max_age=60)
+    live_matches = LiveMatches(100, snapshots=snapshots)
+    match = await live_matches.get("m1", fantasy_team_store)
+    match.apply_points({"p11": 30.0})
+    for match_id, snapshot in live_matches.dump_changed():
+        snapshots.save(match_id, snapshot)
+    await fantasy_team_store.insert_team(make_team("f2"))
+
+    restarted = LiveMatches(100, snapshots=snapshots)
+    assert await restarted.restore_all(fantasy_team_store) == 0
+    restored = await restarted.get("m1", fantasy_team_store)
+    total = match.leaderboard.score(("u1", "f1"))
+    assert restored.leaderboard.top(2) == [
+        (1, ("u1", "f1"), total),
+        (1, ("u1", "f2"), total),
+    ]
@@ -0,0 +1,301 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from starlette import status
+
+from playground_fantasymanager.exceptions.base import ConflictError, ValidationError
+from playground_fantasymanager.services.store import FantasyTeamStore
+from playground_fantasymanager.services.store.base import initial_version
+from playground_fantasymanager.services.store.dependency import get_fantasy_team_store
+from playground_fantasymanager.services.writebehind import UpdateLog, WriteBehindStore
+from tests.utils import make_team
+
+
+def _players(captain: int) -> List[Dict[str, Any]]:
+    players = make_team("f1")["players"]
+    for player in players:
+        player["is_captain"] = player["player_id"] == f"p{captain}"
+        del player["credits"], player["points_earned"]
+    return players
+
+
+@pytest.mark.anyio
+async def test_updates_of_a_team_are_coalesced(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that only the last buffered update is stored, with its version."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    stored_version = await fantasy_team_store.get_version("u1", "m1", "f1")
+    store = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    for captain in (3, 4, 5):
+        assert await store.update_players("u1", "m1", "f1", _players(captain))
+    assert not await store.update_players("u1", "m1", "f2", _players(3))
+    assert store.pending == 1
+
+    buffered = await store.get_team("u1", "m1", "f1")
+    assert buffered is not None
+    assert buffered["players"][4]["is_captain"]
+    assert buffered["players"][4]["points_earned"] == 5.0
+    assert await store.get_version("u1", "m1", "f1") == buffered["version"]
+    assert await fantasy_team_store.get_version("u1", "m1", "f1") == stored_version
+    listed = await store.list_teams("u1", "m1", 10, fields=["player_id", "is_captain"])
+    assert listed[0]["players"][4] == {"player_id": "p5", "is_captain": True}
+
+    await store.flush()
+    assert store.pending == 0
+    assert await fantasy_team_store.get_team("u1", "m1", "f1") == buffered
+    # Only the segment started by the flush is left.
+    assert len(list(tmp_path.glob("*.log"))) == 1
+
+
+@pytest.mark.anyio
+async def test_updates_are_recovered_from_the_log(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that updates of a stopped worker are stored by the next one."""
+    for team_id in ("f1", "f2"):
+        await fantasy_team_store.insert_team(make_team(team_id))
+    stopped = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, True), 100)
+    await stopped.update_players("u1", "m1", "f1", _players(7))
+    await stopped.update_players("u1", "m1", "f2", _players(8))
+    await stopped.delete_team("u1", "m1", "f2")
+    version = await stopped.get_version("u1", "m1", "f1")
+    stopped.log.close()
+    with next(tmp_path.glob("*.log")).open("ab") as segment:
+        segment.write(b'{"matchId": "m1", "us')
+
+    store = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    assert store.recover() == 1
+    await store.flush()
+
+    stored = await fantasy_team_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][6]["is_captain"]
+    assert stored["version"] == version
+    assert len(list(tmp_path.glob("*.log"))) == 1
+
+
+@pytest.mark.anyio
+async def test_concurrent_updates_share_a_sync(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that updates are acknowledged after one sync of the log."""
+    team_ids = ("f1", "f2", "f3")
+    for team_id in team_ids:
+        await fantasy_team_store.insert_team(make_team(team_id))
+    store = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, True), 100)
+    synced: List[int] = []
+    monkeypatch.setattr(os, "fsync", lambda fd: synced.append(fd))
+
+    acknowledged = await asyncio.gather(
+        *(
+            store.update_players("u1", "m1", team_id, _players(2))
+            for team_id in team_ids
+        ),
+    )
+    assert acknowledged == [True, True, True]
+    assert len(synced) == 1
+
+    assert await store.update_players("u1", "m1", "f1", _players(3))
+    assert len(synced) == 2
+
+
+@pytest.mark.anyio
+async def test_failed_flushes_keep_updates(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that updates stay buffered and logged when the store fails."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    store = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 1)
+    await store.update_players("u1", "m1", "f1", _players(2))
+    assert store.full.is_set()
+
+    async def fail(*args: Any) -> List[bool]:
+        raise ConnectionError("Store is down")
+
+    monkeypatch.setattr(fantasy_team_store, "bulk_update_players", fail)
+    with pytest.raises(ConnectionError):
+        await store.flush()
+    assert store.pending == 1
+    assert len(list(tmp_path.glob("*.log"))) == 2
+
+    monkeypatch.undo()
+    await store.flush()
+    stored = await fantasy_team_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][1]["is_captain"]
+    assert len(list(tmp_path.glob("*.log"))) == 1
+
+
+@pytest.mark.anyio
+async def test_unstorable_updates_are_not_kept(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that invalid updates are refused and never hold back others."""
+    for team_id in ("f1", "f2"):
+        await fantasy_team_store.insert_team(make_team(team_id))
+    store = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    players = _players(3)
+    with pytest.raises(ValidationError):
+        await store.update_players("u1", "m1", "f1", [*players, players[0]])
+    assert store.pending == 0
+    assert next(tmp_path.glob("*.log")).read_bytes() == b""
+
+    # Updates logged by an older worker are stored without the invalid one.
+    version = initial_version()
+    stopped = UpdateLog(tmp_path, False)
+    stopped.append(
+        [
+            {
+                "matchId": "m1",
+                "userId": "u1",
+                "fantasyTeamId": team_id,
+                "players": team_players,
+                "version": version,
+            }
+            for team_id, team_players, version in (
+                ("f1", [*players, players[0]], version),
+                ("f2", players, version),
+            )
+        ],
+    )
+    stopped.close()
+    assert store.recover() == 2
+    await store.flush()
+    assert store.pending == 0
+    assert await fantasy_team_store.get_version("u1", "m1", "f2") == version
+    assert await fantasy_team_store.get_version("u1", "m1", "f1") != version
+    assert len(list(tmp_path.glob("*.log"))) == 1
+
+
+@pytest.mark.anyio
+async def test_locking_a_match_stores_its_updates(
+    tmp_path: Path,
+    fastapi_app: FastAPI,
+    client: AsyncClient,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that a match is flushed by itself when it locks."""
+    for match_id in ("m1", "m2"):
+        await fantasy_team_store.insert_team(make_team("f1", match_id=match_id))
+    store = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    fastapi_app.dependency_overrides[get_fantasy_team_store] = lambda: store
+    for match_id in ("m1", "m2"):
+        url = fastapi_app.url_path_for(
+            "update_fantasy_team_players",
+            userId="u1",
+            matchId=match_id,
+            fantasyTeamId="f1",
+        )
+        response = await client.put(url, json=_players(9))
+        assert response.status_code == status.HTTP_200_OK
+
+    response = await client.post(
+        fastapi_app.url_path_for("flush_match_fantasy_teams", matchId="m1"),
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert store.pending == 1
+    for match_id, captain in (("m1", True), ("m2", False)):
+        stored = await fantasy_team_store.get_team("u1", match_id, "f1")
+        assert stored is not None
+        assert stored["players"][8]["is_captain"] is captain
+
+
+@pytest.mark.anyio
+async def test_locks_reach_every_worker(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that a match locked by one worker is locked for the others."""
+    for match_id in ("m1", "m2"):
+        await fantasy_team_store.insert_team(make_team("f1", match_id=match_id))
+    first = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    second = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    for match_id in ("m1", "m2"):
+        await second.update_players("u1", match_id, "f1", _players(9))
+
+    await first.lock_match("m1")
+    with pytest.raises(ConflictError):
+        await second.update_players("u1", "m1", "f1", _players(4))
+    await second.flush_locked()
+    assert second.pending == 1
+    stored = await fantasy_team_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][8]["is_captain"]
+
+    await second.flush_locked()
+    assert second.pending == 1
+    assert await second.update_players("u1", "m2", "f1", _players(4))
+
+
+@pytest.mark.anyio
+async def test_expired_locks_reopen_matches(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+) -> None:
+    """Checks that markers of expired locks are deleted and reopen their match."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    log = UpdateLog(tmp_path, False, lock_seconds=60)
+    store = WriteBehindStore(fantasy_team_store, log, 100)
+    await store.lock_match("m1")
+    with pytest.raises(ConflictError):
+        await store.update_players("u1", "m1", "f1", _players(4))
+
+    log.lock_seconds = 0
+    await store.flush_locked()
+    assert not list(tmp_path.glob("*.locked"))
+    assert await store.update_players("u1", "m1", "f1", _players(4))
+
+
+@pytest.mark.anyio
+async def test_late_flushes_keep_newer_updates(
+    tmp_path: Path,
+    fantasy_team_store: FantasyTeamStore,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Checks that a worker flushing last doesn't undo newer updates of others."""
+    await fantasy_team_store.insert_team(make_team("f1"))
+    first = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    second = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    await first.update_players("u1", "m1", "f1", _players(3))
+    await second.update_players("u1", "m1", "f1", _players(7))
+    version = await second.get_version("u1", "m1", "f1")
+    await second.flush()
+    await first.flush()
+
+    stored = await fantasy_team_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][6]["is_captain"]
+    assert stored["version"] == version
+    assert first.pending == 0
+
+    # Updates the store didn't apply to an older team are kept and logged.
+    await first.update_players("u1", "m1", "f1", _players(5))
+
+    async def lose_race(*args: Any) -> List[bool]:
+        return [False]
+
+    monkeypatch.setattr(fantasy_team_store, "bulk_update_players", lose_race)
+    await first.flush()
+    assert first.pending == 1
+    monkeypatch.undo()
+
+    recovered = WriteBehindStore(fantasy_team_store, UpdateLog(tmp_path, False), 100)
+    first.log.close()
+    assert recovered.recover() == 1
+    await recovered.flush()
+    stored = await fantasy_team_store.get_team("u1", "m1", "f1")
+    assert stored is not None
+    assert stored["players"][4]["is_captain"]
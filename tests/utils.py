@@ -0,0 +1,44 @@
+from typing import Any, Dict
+
+
+def make_team(
+    fantasy_team_id: str,
+    user_id: str = "u1",
+    match_id: str = "m1",
+) -> Dict[str, Any]:
+    """
+    Build a fantasy team document.
+
+    :param fantasy_team_id: id of the fantasy team.
+    :param user_id: id of the user.
+    :param match_id: id of the match.
+    :return: fantasy team document.
+    """
+    return {
+        "userId": user_id,
+        "matchId": match_id,
+        "fantasyTeamId": fantasy_team_id,
+        "teams": [
+            {
+                "team_id": team_id,
+                "name": team_id.upper(),
+                "number_of_players": 0,
+                "team_image_url": None,
+            }
+            for team_id in ("t1", "t2")
+        ],
+        "players": [
+            {
+                "player_id": f"p{i}",
+                "player_name": f"Player {i}",
+                "player_image_url": None,
+                "is_captain": i == 1,
+                "is_vice_captain": i == 2,
+                "credits": 9.0,
+                "points_earned": float(i),
+                "position": "bat",
+                "team_id": "t1" if i <= 6 else "t2",
+            }
+            for i in range(1, 12)
+        ],
+    }